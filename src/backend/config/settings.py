@@ -25,10 +25,14 @@ MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
 MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "sustainatrend")
 VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", str(DATA_DIR / "vector_db"))
 VECTOR_DB_COLLECTION = os.getenv("VECTOR_DB_COLLECTION", "sustainatrend_vectors")
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "10"))
 
 # API settings
 API_VERSION = "v1"
 API_PREFIX = f"/api/{API_VERSION}"
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 
 # Security settings
@@ -14,11 +14,17 @@ class MongoDB:
     db = None
 
     @classmethod
-    async def connect_to_database(cls, mongodb_url: str, db_name: str):
+    async def connect_to_database(cls, mongodb_url: str, db_name: str,
+                                  max_pool_size: int = 100, min_pool_size: int = 0):
+        """Open one pooled client shared by every request for the app's lifetime"""
         try:
-            cls.client = AsyncIOMotorClient(mongodb_url)
+            cls.client = AsyncIOMotorClient(
+                mongodb_url,
+                maxPoolSize=max_pool_size,
+                minPoolSize=min_pool_size
+            )
             cls.db = cls.client[db_name]
-            logger.info("Connected to MongoDB.")
+            logger.info(f"Connected to MongoDB (pool size {min_pool_size}-{max_pool_size}).")
         except Exception as e:
             logger.error(f"Could not connect to MongoDB: {e}")
             raise
@@ -27,6 +33,8 @@ class MongoDB:
     async def close_database_connection(cls):
         if cls.client:
             cls.client.close()
+            cls.client = None
+            cls.db = None
             logger.info("Closed MongoDB connection.")
 
 class Repository(Generic[T]):
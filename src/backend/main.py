@@ -6,26 +6,54 @@ This is the main entry point for the SustainaTrend backend application.
 
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
 from datetime import datetime
-import logging
 import traceback
 import webbrowser
 import threading
 import time
 
 # Import routers
-from routes.sustainability import router as sustainability_router
+from backend.routes.sustainability import router as sustainability_router
+from backend.routes.metrics import router as metrics_router
+
+from backend.config.settings import (
+    API_PREFIX, MONGODB_URI, MONGODB_DB_NAME, MONGODB_MAX_POOL_SIZE, MONGODB_MIN_POOL_SIZE
+)
+from backend.database.mongodb import MongoDB
+from backend.repositories.metric_repository import MetricRepository
+from backend.utils.responses import FastJSONResponse
+from backend.middleware.logging import RequestLoggingMiddleware, metrics_endpoint
 
 # Configure logging
-from config.logging import get_logger
+from backend.config.logging import get_logger
 logger = get_logger("main")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the pooled MongoDB client once at startup and close it at shutdown"""
+    await MongoDB.connect_to_database(
+        MONGODB_URI,
+        MONGODB_DB_NAME,
+        max_pool_size=MONGODB_MAX_POOL_SIZE,
+        min_pool_size=MONGODB_MIN_POOL_SIZE
+    )
+    try:
+        await MetricRepository().ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Could not ensure metrics indexes: {str(e)}")
+    try:
+        yield
+    finally:
+        await MongoDB.close_database_connection()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="SustainaTrend Platform API",
     description="API for sustainability metrics, analytics, and ethical AI compliance",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS
@@ -37,9 +65,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics and sampled request logging
+app.add_middleware(RequestLoggingMiddleware)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
 # Include routers
 app.include_router(sustainability_router)
 logger.info("Included Sustainability routes in FastAPI app")
+app.include_router(metrics_router, prefix=API_PREFIX)
+logger.info("Included Metrics routes in FastAPI app")
 
 @app.get("/health")
 async def health_check():
@@ -80,7 +114,7 @@ async def get_metrics():
                 "timestamp": datetime.now().isoformat()
             }
         ]
-            return metrics
+        return metrics
     except Exception as e:
         error_traceback = traceback.format_exc()
         logger.error(f"Failed to fetch metrics: {str(e)}")
@@ -104,7 +138,7 @@ if __name__ == "__main__":
     
     # Start the server
     uvicorn.run(
-        "main:app",
+        "backend.main:app",
         host="127.0.0.1",  # Changed from 0.0.0.0 to 127.0.0.1 for better local access
         port=8000,
         reload=True,
@@ -1,76 +1,176 @@
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+import os
+import random
 import time
 import uuid
+from typing import Optional
+
+from prometheus_client import CollectorRegistry, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
 from backend.utils.logger import logger
-from typing import Optional, Callable
-from starlette.types import ASGIApp
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
+# Fraction of successful requests that get a log line; errors are always logged
+LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "0.01"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Requests that did not match a route share one label to keep cardinality bounded
+UNMATCHED_ROUTE = "__unmatched__"
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, method and status",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being processed",
+    ["method"],
+    registry=REGISTRY
+)
+REQUEST_SIZE = Histogram(
+    "http_request_size_bytes",
+    "HTTP request body size by route template and method",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+    registry=REGISTRY
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size by route template, method and status",
+    ["method", "route", "status"],
+    buckets=SIZE_BUCKETS,
+    registry=REGISTRY
+)
+
+
+def _route_template(scope: Scope) -> str:
+    """The matched route's path template, e.g. /api/v1/companies/{company_id}"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Expose the collected metrics in Prometheus text format"""
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+class RequestLoggingMiddleware:
+    """
+    Records latency, in-flight and size metrics for every request and logs a
+    sampled subset of them.
+
+    Written as a plain ASGI middleware rather than BaseHTTPMiddleware so
+    responses are streamed through untouched; the only per-request work is a
+    few histogram observations. Successful requests are logged at
+    ``log_sample_rate``; 4xx/5xx responses and exceptions are always logged.
+    """
+
+    def __init__(self, app: ASGIApp, log_sample_rate: Optional[float] = None):
+        self.app = app
+        self.log_sample_rate = LOG_SAMPLE_RATE if log_sample_rate is None else log_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next: Callable):
         request_id = str(uuid.uuid4())
-        start_time = time.time()
+        method = scope["method"]
+        start_time = time.perf_counter()
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = time.perf_counter() - start_time
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-request-id", request_id.encode("latin-1")),
+                    (b"x-process-time", str(process_time).encode("latin-1"))
+                ]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        error: Optional[Exception] = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            in_progress.dec()
+            process_time = time.perf_counter() - start_time
+            route = _route_template(scope)
+            status = str(status_code)
 
-        # Add request_id to request state
-        request.state.request_id = request_id
+            REQUEST_LATENCY.labels(method, route, status).observe(process_time)
+            RESPONSE_SIZE.labels(method, route, status).observe(response_size)
+            request_size = self._request_size(scope)
+            if request_size is not None:
+                REQUEST_SIZE.labels(method, route).observe(request_size)
 
-        # Extract useful request information
+            if error is not None or status_code >= 400 or random.random() < self.log_sample_rate:
+                self._log(scope, request_id, route, status_code, process_time, response_size, error)
+
+    @staticmethod
+    def _request_size(scope: Scope) -> Optional[int]:
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    def _log(self, scope: Scope, request_id: str, route: str, status_code: int,
+             process_time: float, response_size: int, error: Optional[Exception]):
+        request = Request(scope)
         request_info = {
             "request_id": request_id,
-            "method": request.method,
+            "method": scope["method"],
             "url": str(request.url),
+            "route": route,
             "client_host": request.client.host if request.client else None,
             "user_agent": request.headers.get("user-agent"),
             "referer": request.headers.get("referer"),
+            "status_code": status_code,
+            "response_size": response_size,
+            "process_time_ms": round(process_time * 1000, 2),
+            "sample_rate": self.log_sample_rate
         }
 
-        # Log request details
-        logger.info(
-            "Incoming request",
-            extra={
-                "extra_data": request_info
-            }
-        )
-
-        try:
-            # Process the request
-            response = await call_next(request)
-            process_time = time.time() - start_time
-
-            # Log response details
-            response_info = {
-                **request_info,
-                "status_code": response.status_code,
-                "process_time_ms": round(process_time * 1000, 2)
-            }
-
-            log_level = "error" if response.status_code >= 500 else "warning" if response.status_code >= 400 else "info"
-            getattr(logger, log_level)(
-                "Request completed",
-                extra={
-                    "extra_data": response_info
-                }
-            )
-
-            # Add request ID and timing headers
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Process-Time"] = str(process_time)
-            return response
-
-        except Exception as e:
-            process_time = time.time() - start_time
+        if error is not None:
             logger.error(
                 "Request failed",
                 extra={
                     "extra_data": {
                         **request_info,
-                        "error": str(e),
-                        "process_time_ms": round(process_time * 1000, 2)
+                        "error": str(error)
                     }
                 },
-                exc_info=True
+                exc_info=error
             )
-            raise
\ No newline at end of file
+            return
+
+        log_level = "error" if status_code >= 500 else "warning" if status_code >= 400 else "info"
+        getattr(logger, log_level)(
+            "Request completed",
+            extra={
+                "extra_data": request_info
+            }
+        )
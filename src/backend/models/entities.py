@@ -100,4 +100,11 @@ class Trend(BaseModel):
     class Config:
         allow_population_by_field_name = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str} 
\ No newline at end of file
+        json_encoders = {ObjectId: str}
+
+class MetricCreate(BaseModel):
+    name: str
+    category: str
+    value: float
+    unit: str
+    metric_metadata: Optional[Dict] = None
@@ -0,0 +1,52 @@
+from typing import List, Optional, Dict, Any
+from bson import ObjectId
+from pymongo import ASCENDING
+from ..database.mongodb import Repository
+
+class MetricRepository(Repository[Dict[str, Any]]):
+    """Metrics as plain dicts, so list endpoints skip per-row model conversion"""
+
+    def __init__(self):
+        super().__init__("metrics", dict)
+
+    async def ensure_indexes(self) -> None:
+        # Serves both the category filter and the _id keyset sort
+        await self.collection.create_index([("category", ASCENDING), ("_id", ASCENDING)])
+
+    async def list_page(
+        self,
+        category: Optional[str] = None,
+        after: Optional[ObjectId] = None,
+        limit: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Return one keyset page ordered by _id.
+
+        ``after`` is the ``next_after`` value of the previous page, so each page
+        is a single index range scan regardless of how deep the client pages.
+        """
+        query: Dict[str, Any] = {}
+        if category:
+            query["category"] = category
+        if after is not None:
+            query["_id"] = {"$gt": after}
+        projection = {field: True for field in fields} if fields else None
+
+        cursor = self.collection.find(query, projection=projection)
+        cursor = cursor.sort("_id", ASCENDING).limit(limit + 1)
+        docs = await cursor.to_list(length=limit + 1)
+
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        for doc in docs:
+            doc["id"] = str(doc.pop("_id"))
+        return {
+            "items": docs,
+            "next_after": docs[-1]["id"] if has_more else None
+        }
+
+    async def create_metric(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        metric = await self.create(data)
+        metric["id"] = str(metric.pop("_id"))
+        return metric
@@ -1,54 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Optional
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
+from bson import ObjectId
 
-from backend.database import get_db
-from backend.models import MetricModel, MetricCreate, Metric
+from backend.config.settings import API_PAGE_SIZE, API_MAX_PAGE_SIZE
+from backend.models.entities import MetricCreate
+from backend.repositories.metric_repository import MetricRepository
+from backend.services.predictive_analytics import invalidate_cached_results
 from backend.utils.logger import logger
+from backend.utils.responses import FastJSONResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
-@router.get("/metrics", response_model=List[Metric])
+def get_metric_repository() -> MetricRepository:
+    return MetricRepository()
+
+@router.get("/metrics")
 async def get_metrics(
     category: Optional[str] = None,
+    after: Optional[str] = Query(None, description="next_after value from the previous page"),
+    limit: int = Query(API_PAGE_SIZE, ge=1, le=API_MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    repository: MetricRepository = Depends(get_metric_repository)
 ):
     """
-    Get all metrics or filter by category
+    Get a page of metrics, optionally filtered by category
     """
-    try:
-        logger.info(
-            "Fetching metrics",
-            extra={
-                "category": category
-            }
+    if after is not None and not ObjectId.is_valid(after):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
         )
-        metrics = []
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
 
-        with get_db() as db:
-            query = db.query(MetricModel)
-            if category:
-                query = query.filter(MetricModel.category == category)
-
-            db_metrics = query.all()
-
-            for db_metric in db_metrics:
-                try:
-                    metric_dict = db_metric.to_dict()
-                    metric = Metric(**metric_dict)
-                    metrics.append(metric)
-                except Exception as conversion_error:
-                    logger.error(
-                        "Error converting metric",
-                        extra={
-                            "metric_id": db_metric.id,
-                            "error": str(conversion_error)
-                        },
-                        exc_info=True
-                    )
-                    # Continue processing other metrics
-                    continue
-
-        return metrics
+    try:
+        page = await repository.list_page(
+            category=category,
+            after=ObjectId(after) if after else None,
+            limit=limit,
+            fields=field_list
+        )
+        return FastJSONResponse(page)
     except Exception as e:
         logger.error(
             "Error fetching metrics",
@@ -63,9 +54,10 @@ async def get_metrics(
             detail=f"Failed to fetch metrics: {str(e)}"
         )
 
-@router.post("/metrics", response_model=Metric, status_code=status.HTTP_201_CREATED)
+@router.post("/metrics", status_code=status.HTTP_201_CREATED)
 async def create_metric(
     metric: MetricCreate,
+    repository: MetricRepository = Depends(get_metric_repository)
 ):
     """
     Create a new metric
@@ -78,21 +70,14 @@ async def create_metric(
             }
         )
 
-        with get_db() as db:
-            db_metric = MetricModel(
-                name=metric.name,
-                category=metric.category,
-                value=metric.value,
-                unit=metric.unit,
-                metric_metadata=metric.metric_metadata or {}
-            )
-
-            db.add(db_metric)
-            db.commit()
-            db.refresh(db_metric)
+        data = metric.model_dump()
+        data["metric_metadata"] = data["metric_metadata"] or {}
+        created = await repository.create_metric(data)
 
-            metric_dict = db_metric.to_dict()
-            return Metric(**metric_dict)
+        # Forecasts and materiality assessments computed before this metric are stale
+        metadata = data["metric_metadata"]
+        invalidate_cached_results(metadata.get("company_name") or metadata.get("company"))
+        return FastJSONResponse(created, status_code=status.HTTP_201_CREATED)
     except Exception as e:
         logger.error(
             "Error creating metric",
@@ -105,4 +90,4 @@ async def create_metric(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create metric: {str(e)}"
-        )
\ No newline at end of file
+        )
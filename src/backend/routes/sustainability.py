@@ -9,11 +9,11 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 
-from services.ai_analysis import analyze_sustainability
-from services.monetization import monetize_data
-from services.strategy_ai import apa_ai_consultant
-from services.storytelling_ai import generate_sustainability_story
-from services.predictive_analytics import (
+from ..services.ai_analysis import analyze_sustainability
+from ..services.monetization import monetize_data
+from ..services.strategy_ai import apa_ai_consultant
+from ..services.storytelling_ai import generate_sustainability_story
+from ..services.predictive_analytics import (
     predict_sustainability_trends, 
     perform_materiality_assessment
 )
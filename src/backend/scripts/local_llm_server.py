@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Local Stand-in LLM Server for SustainaTrend
+
+Serves a minimal OpenAI-compatible ``/v1/chat/completions`` endpoint with a
+fixed, configurable latency and deterministic JSON answers, so the ethical AI
+evaluation engine can be exercised and benchmarked without provider keys or
+cost. Every request is counted, which makes cache hits and single-flight
+de-duplication visible on ``/stats``.
+
+Usage:
+    python local_llm_server.py --port 8089 --latency 2.0
+    LLM_EVAL_BASE_URL=http://127.0.0.1:8089/v1 python your_benchmark.py
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("local_llm_server")
+
+
+def build_answer(prompt: str) -> str:
+    """Deterministic JSON answer shaped like the prompt asks for"""
+    seed = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8], 16)
+    if '"score"' in prompt:
+        return json.dumps({
+            "score": 40 + seed % 60,
+            "risk_areas": [f"Stand-in risk area {seed % 7}"],
+            "recommendations": [f"Stand-in recommendation {seed % 11}"]
+        })
+    return json.dumps({
+        "general_explanation": f"Stand-in explanation {seed % 1000}"
+    })
+
+
+class LocalLLMHandler(BaseHTTPRequestHandler):
+    latency = 1.0
+    requests_served = 0
+    counter_lock = threading.Lock()
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        prompt = "\n".join(m.get('content', '') for m in body.get('messages', []))
+
+        with LocalLLMHandler.counter_lock:
+            LocalLLMHandler.requests_served += 1
+        time.sleep(self.latency)
+
+        answer = build_answer(prompt)
+        self._send_json({
+            "id": f"chatcmpl-local-{LocalLLMHandler.requests_served}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get('model', 'local'),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(answer.split()),
+                      "total_tokens": len(prompt.split()) + len(answer.split())}
+        })
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self._send_json({"requests_served": LocalLLMHandler.requests_served})
+        else:
+            self.send_error(404)
+
+    def _send_json(self, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stand-in LLM server")
+    parser.add_argument("--host", default=os.getenv('LOCAL_LLM_HOST', '127.0.0.1'), help="Interface to bind")
+    parser.add_argument("--port", type=int, default=int(os.getenv('LOCAL_LLM_PORT', '8089')), help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds to wait before answering each request")
+    args = parser.parse_args()
+
+    LocalLLMHandler.latency = args.latency
+    server = ThreadingHTTPServer((args.host, args.port), LocalLLMHandler)
+    logger.info(f"Local LLM server listening on http://{args.host}:{args.port}/v1 (latency {args.latency}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
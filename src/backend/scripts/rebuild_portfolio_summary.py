@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Portfolio Summary Rebuild Utility for TrendSense Platform
+
+Recomputes the materialized VC/PE portfolio overview from the latest ESG and
+carbon imports and publishes it as a new summary version. Use it to recover
+after a failed import hook or to correct drift from incremental updates.
+
+Usage:
+    python rebuild_portfolio_summary.py
+    python rebuild_portfolio_summary.py --mongodb-uri mongodb://localhost:27017 --db-name trendsense
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+
+# Add the parent directory to the path so we can import the service
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.trendsense.vc_pe.data_manager import DataManager
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("portfolio_summary_rebuild")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the materialized VC/PE portfolio overview")
+    parser.add_argument("--mongodb-uri", default=os.getenv('MONGODB_URI', 'mongodb://localhost:27017'),
+                        help="MongoDB connection URI")
+    parser.add_argument("--db-name", default=os.getenv('MONGODB_DATABASE', 'trendsense'),
+                        help="MongoDB database name")
+    args = parser.parse_args()
+
+    data_manager = DataManager(args.mongodb_uri, args.db_name)
+    overview = data_manager.rebuild_portfolio_summary()
+    if not overview.get('success'):
+        logger.error(f"Portfolio summary rebuild failed: {overview.get('message')}")
+        sys.exit(1)
+
+    logger.info(f"Published portfolio summary version {overview['summary_version']}")
+    print(json.dumps(overview, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
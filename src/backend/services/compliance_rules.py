@@ -0,0 +1,532 @@
+"""
+Compliance Rule Engine
+
+Declarative indicator rules for the rule-based regulatory checks in the
+ethical AI module. Every regulation is described by rules (indicator terms
+and optional regex patterns) plus scoring checks, and all of them are
+evaluated against one shared hit table per document. The text is
+lower-cased once and every indicator term of every rule is found in a
+single Aho-Corasick pass, so adding a regulation adds rules and checks here
+but no further passes over the text.
+
+Without pyahocorasick the hit table falls back to one C-level substring
+search per distinct indicator, done lazily and at most once per indicator.
+
+Terms keep the substring semantics of the original checks: a term matches
+wherever it occurs in the lower-cased text, including inside longer words.
+Evidence offsets index that lower-cased text, which lines up with the
+original except for the rare characters whose lower case is longer.
+"""
+
+import re
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Single-pass multi-term matching
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    logger.warning("pyahocorasick not available. Compliance indicators will be searched one by one.")
+
+# Offsets kept as evidence per matched indicator
+MAX_EVIDENCE_OFFSETS = 10
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Named set of indicator terms and regex patterns"""
+    id: str
+    terms: Tuple[str, ...] = ()
+    patterns: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class ScoreCheck:
+    """
+    One scored check of a report regulation.
+
+    The check passes when at least ``min_terms`` distinct indicators of
+    ``rule`` (all of them with ``require_all``) were found. With ``when`` set
+    the check only applies if that rule matched at all.
+    """
+    rule: str
+    hit: int
+    miss: int
+    risk: str
+    recommendation: str
+    min_terms: int = 1
+    require_all: bool = False
+    when: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ReportRegulation:
+    baseline: int
+    checks: Tuple[ScoreCheck, ...]
+
+
+@dataclass(frozen=True)
+class Requirement:
+    """
+    One requirement of an analysis regulation.
+
+    Satisfied when every key in ``keys`` is present in the analysis and
+    ``rule`` (if any) matched; ``invert`` makes a match a violation instead.
+    """
+    requirement: str
+    description: str
+    recommendation: str
+    rule: Optional[str] = None
+    keys: Tuple[str, ...] = ()
+    invert: bool = False
+
+
+@dataclass(frozen=True)
+class AnalysisRegulation:
+    """
+    Requirements of one analysis regulation. Recommendations are listed in
+    ``check_order`` (indexes into ``requirements``), which defaults to the
+    order of the requirements themselves.
+    """
+    requirements: Tuple[Requirement, ...]
+    partial_at: int
+    check_order: Tuple[int, ...] = ()
+
+
+class HitTable:
+    """
+    Indicator hits of one text, shared by every regulation evaluated on it.
+
+    With the matcher's automaton, every term's offsets come from one pass
+    made when the table is created. Otherwise (and for regex patterns)
+    indicators are searched lazily and memoized, so an indicator used by
+    several rules is only searched once.
+    """
+
+    def __init__(self, matcher: "RuleMatcher", text: str):
+        self.matcher = matcher
+        self.text = text.lower()
+        self.offsets: Dict[str, List[int]] = matcher.find_terms(self.text)
+        self.terms_complete = matcher.automaton is not None
+
+    def find(self, indicator: str) -> List[int]:
+        """First offsets of an indicator in the text (empty when absent)"""
+        offsets = self.offsets.get(indicator)
+        if offsets is None:
+            if self.terms_complete and indicator not in self.matcher.patterns:
+                return []
+            offsets = self._search(indicator)
+            self.offsets[indicator] = offsets
+        return offsets
+
+    def _search(self, indicator: str) -> List[int]:
+        pattern = self.matcher.patterns.get(indicator)
+        if pattern is not None:
+            offsets = []
+            for match in pattern.finditer(self.text):
+                offsets.append(match.start())
+                if len(offsets) == MAX_EVIDENCE_OFFSETS:
+                    break
+            return offsets
+
+        offsets = []
+        position = self.text.find(indicator)
+        while position != -1 and len(offsets) < MAX_EVIDENCE_OFFSETS:
+            offsets.append(position)
+            position = self.text.find(indicator, position + 1)
+        return offsets
+
+    def any(self, rule_id: str) -> bool:
+        return any(self.find(i) for i in self.matcher.rules[rule_id])
+
+    def all(self, rule_id: str) -> bool:
+        return all(self.find(i) for i in self.matcher.rules[rule_id])
+
+    def matched(self, rule_id: str) -> List[str]:
+        """Distinct indicators of a rule that occur in the text"""
+        return [i for i in self.matcher.rules[rule_id] if self.find(i)]
+
+    def evidence(self, rule_id: str) -> List[Dict[str, Any]]:
+        """Matched indicators of a rule with the offsets of their first occurrences"""
+        return [{'indicator': i, 'offsets': self.find(i)} for i in self.matched(rule_id)]
+
+
+class RuleMatcher:
+    """
+    Compiled rule set; ``scan`` prepares the shared hit table of one text.
+
+    All indicator terms are compiled into one Aho-Corasick automaton (when
+    pyahocorasick is available and ``use_automaton`` is set), which reports
+    every occurrence of every term, overlapping ones included, in one pass.
+    """
+
+    def __init__(self, rules: Sequence[Rule], use_automaton: bool = AHOCORASICK_AVAILABLE):
+        self.rules: Dict[str, Tuple[str, ...]] = {}
+        self.patterns: Dict[str, re.Pattern] = {}
+        terms = set()
+        for rule in rules:
+            rule_terms = tuple(t.lower() for t in rule.terms)
+            terms.update(rule_terms)
+            self.rules[rule.id] = rule_terms + tuple(rule.patterns)
+            for pattern in rule.patterns:
+                self.patterns[pattern] = re.compile(pattern, re.IGNORECASE)
+
+        self.automaton = None
+        if use_automaton and terms:
+            self.automaton = ahocorasick.Automaton()
+            for term in terms:
+                self.automaton.add_word(term, (term, len(term) - 1))
+            self.automaton.make_automaton()
+
+    def find_terms(self, text: str) -> Dict[str, List[int]]:
+        """First offsets of every term in a lower-cased text, in one pass; empty without the automaton"""
+        offsets: Dict[str, List[int]] = {}
+        if self.automaton is None:
+            return offsets
+        for end, (term, length) in self.automaton.iter(text):
+            found = offsets.get(term)
+            if found is None:
+                offsets[term] = [end - length]
+            elif len(found) < MAX_EVIDENCE_OFFSETS:
+                found.append(end - length)
+        return offsets
+
+    def scan(self, text: str) -> HitTable:
+        return HitTable(self, text)
+
+
+# Indicator rules shared by all regulations
+RULES = [
+    # CSRD report checks
+    Rule('csrd.double_materiality', terms=("materiality assessment", "double materiality")),
+    Rule('csrd.environmental_topics', terms=("climate change", "pollution", "water", "biodiversity", "resource use")),
+    Rule('csrd.social_topics', terms=("workforce", "human rights", "communities", "consumers")),
+    Rule('csrd.governance_topics', terms=("governance", "business conduct", "ethics", "risk management")),
+    Rule('csrd.forward_looking', terms=("target", "goal", "commitment", "plan")),
+    # GDPR report checks
+    Rule('gdpr.personal_data', terms=("personal data", "personally identifiable", "personal information")),
+    Rule('gdpr.protection_measures', terms=("data protection", "anonymized", "pseudonymized", "consent", "data minimization")),
+    Rule('gdpr.processing_transparency', terms=("data processing", "transparency")),
+    Rule('gdpr.data_subject_rights', terms=("right to access", "right to erasure", "right to rectification", "data subject rights")),
+    Rule('gdpr.legal_basis', terms=("legal basis", "legitimate interest", "consent for", "contractual necessity")),
+    # AI transparency report checks
+    Rule('ai.usage', terms=("ai", "artificial intelligence", "machine learning", "algorithm", "automated analysis")),
+    Rule('ai.transparency_disclosure', terms=("model", "methodology", "explainable ai", "xai", "ai transparency")),
+    Rule('ai.decision_explanation', terms=("explainable", "explanation", "how we determined", "analysis process")),
+    Rule('ai.confidence_levels', terms=("confidence level", "certainty", "uncertainty", "probability", "likelihood")),
+    Rule('ai.bias_mitigation', terms=("bias mitigation", "fairness", "ethical ai", "ai ethics", "algorithmic bias")),
+    Rule('ai.human_oversight', terms=("human oversight", "human review", "human in the loop", "human verification")),
+    # CSRD analysis checks
+    Rule('analysis.csrd.materiality', terms=("materiality", "material")),
+    Rule('analysis.csrd.environmental', terms=("climate", "emissions", "pollution", "water", "biodiversity", "resource")),
+    Rule('analysis.csrd.social', terms=("workforce", "employee", "community", "social", "human rights", "consumer")),
+    Rule('analysis.csrd.governance', terms=("governance", "business conduct", "risk", "controls", "ethics")),
+    Rule('analysis.csrd.forward_looking', terms=("target", "goal", "commitment", "future", "plan", "scenario")),
+    # SEC analysis checks
+    Rule('analysis.sec.climate_risk', terms=("climate risk", "climate-related risk", "climate change risk")),
+    Rule('analysis.sec.ghg_emissions', terms=("greenhouse gas", "ghg emissions", "scope 1", "scope 2", "carbon emissions")),
+    Rule('analysis.sec.risk_management', terms=("risk management", "climate strategy", "mitigation measures", "adaptation measures")),
+    Rule('analysis.sec.financial_impact', terms=("financial impact", "financial risk", "financial consequence", "financial assessment")),
+    Rule('analysis.sec.attestation', terms=("attestation", "assurance", "verification", "audit", "certified")),
+    # IFRS analysis checks
+    Rule('analysis.ifrs.general', terms=("ifrs s1", "general requirements", "sustainability-related financial information")),
+    Rule('analysis.ifrs.climate', terms=("ifrs s2", "climate-related disclosures", "climate risk", "climate opportunity")),
+    Rule('analysis.ifrs.materiality', terms=("materiality assessment", "enterprise value", "material information")),
+    Rule('analysis.ifrs.connected', terms=("connected information", "financial statements", "connection to financial")),
+    Rule('analysis.ifrs.fair_presentation', terms=("fair presentation", "complete", "neutral", "accurate", "balanced view")),
+    # GRI analysis checks
+    Rule('analysis.gri.universal', terms=("gri 1", "gri 2", "gri 3", "universal standards", "foundation", "general disclosures")),
+    Rule('analysis.gri.material_topics', terms=("material topic", "materiality assessment", "materiality analysis")),
+    Rule('analysis.gri.topic_specific', terms=("topic standard", "topic-specific", "gri 3", "management approach")),
+    Rule('analysis.gri.stakeholders', terms=("stakeholder engagement", "stakeholder consultation", "stakeholder input")),
+    Rule('analysis.gri.principles', terms=("reporting principle", "accuracy", "balance", "clarity", "comparability", "completeness")),
+    # GDPR analysis checks
+    Rule('analysis.gdpr.personal_data', terms=("name", "email", "phone", "address", "person", "individual")),
+    Rule('analysis.gdpr.data_subject_rights', terms=("data subject", "rights", "access right", "rectification", "erasure")),
+    # AI transparency analysis checks
+    Rule('analysis.ai.model', terms=("model",)),
+    Rule('analysis.ai.confidence', terms=("confidence", "certainty", "probability", "likelihood", "uncertainty")),
+    Rule('analysis.ai.oversight', terms=("review", "oversight", "human", "analyst", "verified", "approved")),
+]
+
+# Scored checks of sustainability report text
+REPORT_REGULATIONS: Dict[str, ReportRegulation] = {
+    "CSRD": ReportRegulation(baseline=60, checks=(
+        ScoreCheck('csrd.double_materiality', 10, -10,
+                   "Missing double materiality assessment",
+                   "Include a double materiality assessment that covers both financial materiality and impact materiality"),
+        ScoreCheck('csrd.environmental_topics', 5, -5,
+                   "Insufficient coverage of environmental topics",
+                   "Expand coverage of environmental topics to include climate change, pollution, water, biodiversity, and resource use",
+                   min_terms=3),
+        ScoreCheck('csrd.social_topics', 5, -5,
+                   "Insufficient coverage of social topics",
+                   "Expand coverage of social topics to include workforce, affected communities, and consumers/end-users",
+                   min_terms=2),
+        ScoreCheck('csrd.governance_topics', 5, -5,
+                   "Insufficient coverage of governance topics",
+                   "Expand coverage of governance topics to include business conduct, internal controls, and risk management",
+                   min_terms=2),
+        ScoreCheck('csrd.forward_looking', 5, -5,
+                   "Missing forward-looking information",
+                   "Include forward-looking information such as targets, commitments, and plans"),
+    )),
+    "GDPR": ReportRegulation(baseline=70, checks=(
+        ScoreCheck('gdpr.protection_measures', 0, -15,
+                   "Personal data mentioned without adequate protection measures",
+                   "Ensure all personal data is properly anonymized or has explicit consent for processing",
+                   when='gdpr.personal_data'),
+        ScoreCheck('gdpr.processing_transparency', 10, -10,
+                   "Lack of transparency in data processing",
+                   "Include clear explanation of how data is processed in compliance with GDPR transparency requirements",
+                   require_all=True),
+        ScoreCheck('gdpr.data_subject_rights', 10, -10,
+                   "No mention of data subject rights",
+                   "Include acknowledgment of data subject rights (access, rectification, erasure) in the report"),
+        ScoreCheck('gdpr.legal_basis', 10, -10,
+                   "No clear legal basis for data processing",
+                   "Specify the legal basis for all data processing activities mentioned in the report"),
+    )),
+    "AI Transparency": ReportRegulation(baseline=50, checks=(
+        ScoreCheck('ai.transparency_disclosure', 15, -15,
+                   "AI use without transparency disclosure",
+                   "Disclose AI models and methods used in sustainability assessments",
+                   when='ai.usage'),
+        ScoreCheck('ai.decision_explanation', 15, -10,
+                   "Lack of explanation for AI-driven decisions",
+                   "Provide explanations for how AI-driven conclusions were reached"),
+        ScoreCheck('ai.confidence_levels', 10, -5,
+                   "No confidence levels for AI predictions",
+                   "Include confidence levels or uncertainty metrics for AI-generated insights"),
+        ScoreCheck('ai.bias_mitigation', 15, -15,
+                   "No mention of AI bias mitigation",
+                   "Include information on how AI bias is detected and mitigated in sustainability assessments"),
+        ScoreCheck('ai.human_oversight', 10, -10,
+                   "No mention of human oversight for AI systems",
+                   "Clarify human oversight processes for AI-generated sustainability assessments"),
+    )),
+}
+
+# Requirement checks of AI-generated analysis results
+ANALYSIS_REGULATIONS: Dict[str, AnalysisRegulation] = {
+    # Materiality is listed first but checked (and recommended) after the topic checks
+    "CSRD": AnalysisRegulation(partial_at=3, check_order=(1, 2, 3, 0, 4), requirements=(
+        Requirement("Double Materiality Assessment",
+                    "Assessment includes both financial materiality and impact materiality",
+                    "Include a double materiality assessment that covers both financial impact and impact on people and environment",
+                    rule='analysis.csrd.materiality'),
+        Requirement("Environmental Topics",
+                    "Covers climate change, pollution, water, biodiversity, and resource use",
+                    "Include analysis of environmental topics: climate change, pollution, water, biodiversity, resource use",
+                    rule='analysis.csrd.environmental'),
+        Requirement("Social Topics",
+                    "Addresses workforce topics, affected communities, and consumers/end-users",
+                    "Address social topics: workforce conditions, affected communities, consumer impacts",
+                    rule='analysis.csrd.social'),
+        Requirement("Governance Topics",
+                    "Covers business conduct, internal controls, and risk management",
+                    "Include governance topics: business conduct, internal controls, risk management",
+                    rule='analysis.csrd.governance'),
+        Requirement("Forward-Looking Information",
+                    "Includes targets, commitments, and future scenarios",
+                    "Include forward-looking information: targets, commitments, future scenarios",
+                    rule='analysis.csrd.forward_looking'),
+    )),
+    "SEC": AnalysisRegulation(partial_at=3, requirements=(
+        Requirement("Climate Risk Disclosure",
+                    "Disclosure of material climate-related risks",
+                    "Include disclosure of material climate-related risks",
+                    rule='analysis.sec.climate_risk'),
+        Requirement("GHG Emissions Reporting",
+                    "Reporting of Scope 1 and Scope 2 GHG emissions",
+                    "Include reporting of Scope 1 and Scope 2 GHG emissions",
+                    rule='analysis.sec.ghg_emissions'),
+        Requirement("Climate Risk Management",
+                    "Description of processes for managing climate-related risks",
+                    "Describe processes for identifying, assessing, and managing climate-related risks",
+                    rule='analysis.sec.risk_management'),
+        Requirement("Financial Impact Assessment",
+                    "Assessment of financial impacts of climate-related risks",
+                    "Include assessment of financial impacts of climate-related risks",
+                    rule='analysis.sec.financial_impact'),
+        Requirement("Attestation Requirements",
+                    "Appropriate attestation of reported information",
+                    "Include information on attestation of reported climate-related information",
+                    rule='analysis.sec.attestation'),
+    )),
+    "IFRS": AnalysisRegulation(partial_at=3, requirements=(
+        Requirement("General Requirements",
+                    "Compliance with IFRS S1 General Requirements",
+                    "Include disclosure in accordance with IFRS S1 General Requirements",
+                    rule='analysis.ifrs.general'),
+        Requirement("Climate Disclosures",
+                    "Compliance with IFRS S2 Climate-related Disclosures",
+                    "Include climate-related disclosures in accordance with IFRS S2",
+                    rule='analysis.ifrs.climate'),
+        Requirement("Materiality Assessment",
+                    "Enterprise value-focused materiality assessment",
+                    "Include enterprise value-focused materiality assessment",
+                    rule='analysis.ifrs.materiality'),
+        Requirement("Connected Information",
+                    "Connection between sustainability and financial information",
+                    "Connect sustainability information to financial information",
+                    rule='analysis.ifrs.connected'),
+        Requirement("Fair Presentation",
+                    "Fair presentation of sustainability-related risks and opportunities",
+                    "Ensure fair presentation of sustainability-related risks and opportunities",
+                    rule='analysis.ifrs.fair_presentation'),
+    )),
+    "GRI": AnalysisRegulation(partial_at=3, requirements=(
+        Requirement("Universal Standards",
+                    "Disclosure of GRI 1, 2, and 3 information",
+                    "Include disclosures in accordance with GRI Universal Standards",
+                    rule='analysis.gri.universal'),
+        Requirement("Material Topics",
+                    "Identification and disclosure of material topics",
+                    "Identify and disclose material topics according to GRI Standards",
+                    rule='analysis.gri.material_topics'),
+        Requirement("Topic-Specific Disclosures",
+                    "Detailed reporting on material topics using GRI topic standards",
+                    "Include topic-specific disclosures for each material topic",
+                    rule='analysis.gri.topic_specific'),
+        Requirement("Stakeholder Engagement",
+                    "Disclosure of stakeholder engagement processes",
+                    "Disclose stakeholder engagement processes and outcomes",
+                    rule='analysis.gri.stakeholders'),
+        Requirement("Reporting Principles",
+                    "Adherence to GRI reporting principles",
+                    "Demonstrate adherence to GRI reporting principles",
+                    rule='analysis.gri.principles'),
+    )),
+    "GDPR": AnalysisRegulation(partial_at=2, requirements=(
+        Requirement("Personal Data Minimization",
+                    "Analysis doesn't include unnecessary personal data",
+                    "Remove or anonymize personal data in the analysis",
+                    rule='analysis.gdpr.personal_data', invert=True),
+        Requirement("Data Processing Transparency",
+                    "Clear explanation of how data is processed",
+                    "Include metadata on data processing methods and sources",
+                    keys=("_explanation_metadata",)),
+        Requirement("Right to Explanation",
+                    "Ability to explain automated decisions",
+                    "Add explanations for how analysis conclusions were reached",
+                    keys=("_explanations",)),
+        Requirement("Data Subject Rights",
+                    "Respect for access, rectification, erasure rights",
+                    "Include acknowledgment of data subject rights in the analysis documentation",
+                    rule='analysis.gdpr.data_subject_rights'),
+    )),
+    "AI Transparency": AnalysisRegulation(partial_at=2, requirements=(
+        Requirement("Model Disclosure",
+                    "Disclosure of AI models and methods used",
+                    "Include disclosure of AI models and methods used in the analysis",
+                    rule='analysis.ai.model', keys=("_explanation_metadata",)),
+        Requirement("Decision Explanation",
+                    "Explanation of how AI reached conclusions",
+                    "Add explanations for how conclusions were reached by the AI system",
+                    keys=("_explanations",)),
+        Requirement("Confidence Levels",
+                    "Indication of confidence/uncertainty in results",
+                    "Include confidence levels or uncertainty metrics for key findings",
+                    rule='analysis.ai.confidence'),
+        Requirement("Human Oversight",
+                    "Clear indication of human review/oversight",
+                    "Add clear indication of human review/oversight in the analysis process",
+                    rule='analysis.ai.oversight'),
+    )),
+}
+
+MATCHER = RuleMatcher(RULES)
+
+
+def scan_text(text: str) -> HitTable:
+    """Shared hit table of a report text for every regulation"""
+    return MATCHER.scan(text)
+
+
+def scan_analysis(analysis_result: Dict[str, Any]) -> HitTable:
+    """Shared hit table of the text form of an analysis result, as the analysis checks read it"""
+    return MATCHER.scan(str(analysis_result))
+
+
+def evaluate_report_regulation(regulation: str, hits: HitTable
+                               ) -> Tuple[int, List[str], List[str], Dict[str, List[Dict[str, Any]]]]:
+    """
+    Score one regulation from a report's hit table.
+
+    Returns (score, risk_areas, recommendations, evidence) where evidence maps
+    each rule the score depends on to its matched indicators and offsets.
+    """
+    spec = REPORT_REGULATIONS[regulation]
+    score = spec.baseline
+    risk_areas: List[str] = []
+    recommendations: List[str] = []
+    evidence: Dict[str, List[Dict[str, Any]]] = {}
+
+    for check in spec.checks:
+        if check.when is not None:
+            evidence[check.when] = hits.evidence(check.when)
+            if not evidence[check.when]:
+                continue
+        evidence[check.rule] = hits.evidence(check.rule)
+        if check.require_all:
+            passed = hits.all(check.rule)
+        else:
+            passed = len(evidence[check.rule]) >= check.min_terms
+
+        if passed:
+            score += check.hit
+        else:
+            score += check.miss
+            risk_areas.append(check.risk)
+            recommendations.append(check.recommendation)
+
+    # Ensure score is within 0-100 range
+    score = max(0, min(100, score))
+    return score, risk_areas, recommendations, evidence
+
+
+def evaluate_analysis_regulation(regulation: str, hits: HitTable,
+                                 analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Check one regulation's requirements against an analysis result's hit table"""
+    spec = ANALYSIS_REGULATIONS[regulation]
+    requirements = [
+        {
+            "requirement": requirement.requirement,
+            "description": requirement.description,
+            "satisfied": False
+        }
+        for requirement in spec.requirements
+    ]
+    recommendations = []
+
+    for index in spec.check_order or range(len(spec.requirements)):
+        requirement = spec.requirements[index]
+        satisfied = all(key in analysis_result for key in requirement.keys)
+        if requirement.rule is not None:
+            matched = hits.any(requirement.rule)
+            satisfied = not matched if requirement.invert else satisfied and matched
+        requirements[index]["satisfied"] = satisfied
+        if not satisfied:
+            recommendations.append(requirement.recommendation)
+
+    satisfied_count = sum(1 for req in requirements if req["satisfied"])
+    if satisfied_count == len(requirements):
+        compliance_level = "Compliant"
+    elif satisfied_count >= spec.partial_at:
+        compliance_level = "Partially compliant"
+    else:
+        compliance_level = "Non-compliant"
+
+    return {
+        "compliance_level": compliance_level,
+        "requirements": requirements,
+        "recommendations": recommendations
+    }
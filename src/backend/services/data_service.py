@@ -4,6 +4,10 @@ Provides data operations using MongoDB and vector database
 """
 import logging
 import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_mongodb_db, get_vector_db
@@ -11,14 +15,29 @@ from config.database import get_mongodb_db, get_vector_db
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Vectors per vector database write
+VECTOR_BATCH_SIZE = 500
+
 class DataService:
     """Service for data operations using MongoDB and vector database"""
     
-    def __init__(self):
+    def __init__(self, vector_batch_size=VECTOR_BATCH_SIZE, hot_cache_size=512, hot_cache_ttl=60):
         """Initialize data service with database connections"""
         self.db = get_mongodb_db()
         self.vector_db = get_vector_db()
         
+        # Pending vector writes, flushed in batches
+        self.vector_batch_size = vector_batch_size
+        self._vector_buffer = []
+        self._vector_lock = threading.Lock()
+        self._batching = threading.local()
+        
+        # Small LRU of recently hydrated documents; 0 disables it
+        self.hot_cache_size = hot_cache_size
+        self.hot_cache_ttl = hot_cache_ttl
+        self._hot_cache = OrderedDict()
+        self._hot_cache_lock = threading.Lock()
+        
         if not self.db:
             logger.warning("MongoDB connection not available. Some features may be limited.")
         
@@ -82,6 +101,7 @@ class DataService:
                 {"_id": ObjectId(document_id)},
                 {"$set": updates}
             )
+            self._forget_hot_document(collection, document_id)
             
             if result.modified_count > 0:
                 return {"success": True, "modified_count": result.modified_count}
@@ -98,6 +118,7 @@ class DataService:
         
         try:
             result = self.db[collection].delete_one({"_id": ObjectId(document_id)})
+            self._forget_hot_document(collection, document_id)
             
             if result.deleted_count > 0:
                 return {"success": True, "deleted_count": result.deleted_count}
@@ -145,34 +166,131 @@ class DataService:
         if not self.vector_db:
             return {"success": False, "error": "Vector database connection not available"}
         
+        if getattr(self._batching, "active", False):
+            return self.buffer_vector(vector_id, vector, metadata)
+        
         try:
-            # Ensure metadata is a dictionary
-            if metadata is None:
-                metadata = {}
-            
-            # Add timestamp
-            metadata["timestamp"] = datetime.now().isoformat()
-            
-            # Upsert vector
-            self.vector_db.upsert(vectors=[(vector_id, vector, metadata)])
+            self._upsert_vectors([self._vector_entry(vector_id, vector, metadata)])
             
             return {"success": True, "vector_id": vector_id}
         except Exception as e:
             logger.error(f"Error adding vector: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def query_vectors(self, query_vector, top_k=10, filter=None):
-        """Query vectors from the vector database"""
+    def add_vectors(self, items):
+        """
+        Add many vectors with as few vector database writes as possible
+        
+        Args:
+            items: Iterable of (vector_id, vector, metadata) tuples
+        """
         if not self.vector_db:
             return {"success": False, "error": "Vector database connection not available"}
         
         try:
-            # Query vectors
-            results = self.vector_db.query(
+            batch = []
+            written = 0
+            for vector_id, vector, metadata in items:
+                batch.append(self._vector_entry(vector_id, vector, metadata))
+                if len(batch) >= self.vector_batch_size:
+                    self._upsert_vectors(batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                self._upsert_vectors(batch)
+                written += len(batch)
+            
+            return {"success": True, "count": written}
+        except Exception as e:
+            logger.error(f"Error adding vectors: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    def buffer_vector(self, vector_id, vector, metadata=None):
+        """Queue a vector for the next batched write, flushing when the batch is full"""
+        if not self.vector_db:
+            return {"success": False, "error": "Vector database connection not available"}
+        
+        with self._vector_lock:
+            self._vector_buffer.append(self._vector_entry(vector_id, vector, metadata))
+            full = len(self._vector_buffer) >= self.vector_batch_size
+        
+        if full:
+            return self.flush_vectors()
+        return {"success": True, "vector_id": vector_id, "buffered": True}
+    
+    def flush_vectors(self):
+        """Write all queued vectors to the vector database"""
+        with self._vector_lock:
+            batch, self._vector_buffer = self._vector_buffer, []
+        
+        if not batch:
+            return {"success": True, "count": 0}
+        
+        try:
+            for start in range(0, len(batch), self.vector_batch_size):
+                self._upsert_vectors(batch[start:start + self.vector_batch_size])
+            return {"success": True, "count": len(batch)}
+        except Exception as e:
+            logger.error(f"Error flushing {len(batch)} vectors: {str(e)}")
+            return {"success": False, "error": str(e), "count": 0}
+    
+    @contextmanager
+    def vector_batch(self):
+        """Buffer this thread's add_vector calls in the block and flush them together on exit"""
+        already_active = getattr(self._batching, "active", False)
+        self._batching.active = True
+        try:
+            yield self
+        finally:
+            self._batching.active = already_active
+            if not already_active:
+                self.flush_vectors()
+    
+    def _vector_entry(self, vector_id, vector, metadata):
+        """Normalize one vector write"""
+        metadata = dict(metadata) if metadata else {}
+        metadata["timestamp"] = datetime.now().isoformat()
+        if hasattr(vector, "tolist"):
+            vector = vector.tolist()
+        return (vector_id, vector, metadata)
+    
+    def _upsert_vectors(self, entries):
+        """Write one batch using the connected store's API (Pinecone-style index or Chroma collection)"""
+        if hasattr(self.vector_db, "describe_index_stats"):
+            self.vector_db.upsert(vectors=entries)
+        else:
+            ids, embeddings, metadatas = zip(*entries)
+            self.vector_db.upsert(
+                ids=list(ids),
+                embeddings=list(embeddings),
+                metadatas=list(metadatas)
+            )
+    
+    def _query_store(self, query_vector, top_k, filter):
+        """Run one similarity query using the connected store's API (Pinecone-style index or Chroma collection)"""
+        if hasattr(query_vector, "tolist"):
+            query_vector = query_vector.tolist()
+        if hasattr(self.vector_db, "describe_index_stats"):
+            return self.vector_db.query(
                 vector=query_vector,
                 top_k=top_k,
-                filter=filter
+                filter=filter,
+                include_metadata=True
             )
+        return self.vector_db.query(
+            query_embeddings=[query_vector],
+            n_results=top_k,
+            where=filter or None
+        )
+    
+    def query_vectors(self, query_vector, top_k=10, filter=None):
+        """Query vectors from the vector database"""
+        if not self.vector_db:
+            return {"success": False, "error": "Vector database connection not available"}
+        
+        try:
+            # Query vectors
+            results = self._query_store(query_vector, top_k, filter)
             
             return {"success": True, "results": results}
         except Exception as e:
@@ -220,35 +338,99 @@ class DataService:
             "vector_id": vector_id
         }
     
-    def semantic_search(self, collection, query_vector, filter=None, top_k=10):
-        """Perform semantic search using vector database and return full documents from MongoDB"""
+    def semantic_search(self, collection, query_vector, filter=None, top_k=10, projection=None):
+        """
+        Perform semantic search using vector database and return full documents from MongoDB
+        
+        Documents are returned in similarity order. Pass a projection to fetch
+        only the fields the caller needs.
+        """
         if not self.vector_db:
             return {"success": False, "error": "Vector database connection not available"}
         
         try:
             # Query vectors
-            vector_results = self.vector_db.query(
-                vector=query_vector,
-                top_k=top_k,
-                filter=filter
-            )
+            vector_results = self._query_store(query_vector, top_k, filter)
             
-            # Extract document IDs from vector results
+            # Extract document IDs from vector results, best match first
             document_ids = []
-            for match in vector_results.matches:
-                if "document_id" in match.metadata:
-                    document_ids.append(ObjectId(match.metadata["document_id"]))
+            for metadata in self._match_metadata(vector_results):
+                document_id = metadata.get("document_id")
+                if document_id and document_id not in document_ids:
+                    document_ids.append(document_id)
             
             if not document_ids:
                 return {"success": True, "documents": []}
             
-            # Fetch documents from MongoDB
-            documents = []
-            for doc in self.db[collection].find({"_id": {"$in": document_ids}}):
-                doc["_id"] = str(doc["_id"])
-                documents.append(doc)
-            
+            documents = self.hydrate_documents(collection, document_ids, projection)
             return {"success": True, "documents": documents}
         except Exception as e:
             logger.error(f"Error performing semantic search: {str(e)}")
-            return {"success": False, "error": str(e)} 
\ No newline at end of file
+            return {"success": False, "error": str(e)}
+    
+    def hydrate_documents(self, collection, document_ids, projection=None):
+        """
+        Fetch documents by ID in one round trip, preserving the order of document_ids
+        
+        Recently fetched documents are served from a small in-process cache.
+        """
+        projection_key = json.dumps(projection, sort_keys=True) if projection else ""
+        found = {}
+        missing = []
+        for document_id in document_ids:
+            document = self._get_hot_document(collection, document_id, projection_key)
+            if document is None:
+                missing.append(document_id)
+            else:
+                found[document_id] = document
+        
+        if missing and self.db is not None:
+            cursor = self.db[collection].find(
+                {"_id": {"$in": [ObjectId(document_id) for document_id in missing]}},
+                projection
+            )
+            for doc in cursor:
+                doc["_id"] = str(doc["_id"])
+                found[doc["_id"]] = doc
+                self._put_hot_document(collection, doc["_id"], projection_key, dict(doc))
+        
+        return [found[document_id] for document_id in document_ids if document_id in found]
+    
+    @staticmethod
+    def _match_metadata(results):
+        """Metadata of query matches in rank order, for Pinecone-style and Chroma results"""
+        if hasattr(results, "matches"):
+            return [match.metadata or {} for match in results.matches]
+        if isinstance(results, dict) and results.get("metadatas"):
+            return [metadata or {} for metadata in results["metadatas"][0]]
+        return []
+    
+    # Hot document cache
+    
+    def _get_hot_document(self, collection, document_id, projection_key):
+        if not self.hot_cache_size:
+            return None
+        key = (collection, document_id, projection_key)
+        with self._hot_cache_lock:
+            cached = self._hot_cache.get(key)
+            if cached is None:
+                return None
+            document, stored_at = cached
+            if time.time() - stored_at > self.hot_cache_ttl:
+                del self._hot_cache[key]
+                return None
+            self._hot_cache.move_to_end(key)
+            return dict(document)
+    
+    def _put_hot_document(self, collection, document_id, projection_key, document):
+        if not self.hot_cache_size:
+            return
+        with self._hot_cache_lock:
+            self._hot_cache[(collection, document_id, projection_key)] = (document, time.time())
+            while len(self._hot_cache) > self.hot_cache_size:
+                self._hot_cache.popitem(last=False)
+    
+    def _forget_hot_document(self, collection, document_id):
+        with self._hot_cache_lock:
+            for key in [k for k in self._hot_cache if k[0] == collection and k[1] == str(document_id)]:
+                del self._hot_cache[key]
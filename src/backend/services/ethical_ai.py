@@ -15,13 +15,22 @@ The module provides:
 4. Documentation generation for audit trails
 """
 
-import os
 import json
 import logging
 import random
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 
+from .compliance_rules import (
+    HitTable,
+    scan_text,
+    scan_analysis,
+    evaluate_report_regulation,
+    evaluate_analysis_regulation
+)
+from .llm_evaluation import get_evaluation_engine
+from .result_cache import content_hash
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,7 +38,6 @@ logger = logging.getLogger(__name__)
 # Try to import AI libraries (with proper fallbacks)
 try:
     import openai
-    from langchain_community.chat_models import ChatOpenAI
     from langchain_community.chains import LLMChain
     AI_LIBRARIES_AVAILABLE = True
     logger.info("AI libraries loaded successfully for ethical AI compliance")
@@ -62,9 +70,9 @@ def generate_explanation(analysis_result: Dict[str, Any], detail_level: str = "m
     }
     
     # Check if we can use advanced AI for explanations
-    openai_api_key = os.getenv('OPENAI_API_KEY')
+    engine = get_evaluation_engine()
     
-    if openai_api_key and AI_LIBRARIES_AVAILABLE:
+    if engine.available:
         try:
             # Structure the result for explanation
             content_to_explain = json.dumps(analysis_result, indent=2)
@@ -88,9 +96,8 @@ def generate_explanation(analysis_result: Dict[str, Any], detail_level: str = "m
             and values containing the explanations.
             """
             
-            # Use OpenAI for explanation generation
-            llm = ChatOpenAI(model="gpt-4-turbo", temperature=0.2)
-            response = llm.invoke(prompt).content
+            # Use the LLM for explanation generation (cached per analysis content)
+            response = engine.evaluate(prompt, document_hash=content_hash(analysis_result))
             
             # Parse explanation and integrate with original result
             try:
@@ -270,6 +277,9 @@ def check_regulatory_compliance(analysis_result: Dict[str, Any],
     """
     Check if an AI-generated analysis meets regulatory compliance requirements.
     
+    The analysis is scanned once for every regulation's indicators and each
+    regulation is then checked against the shared hit table.
+    
     Args:
         analysis_result: The AI-generated analysis
         regulations: List of regulations to check compliance against
@@ -288,576 +298,97 @@ def check_regulatory_compliance(analysis_result: Dict[str, Any],
         "recommendations": []
     }
     
-    # Check CSRD compliance if requested
-    if "CSRD" in regulations:
-        csrd_check = check_csrd_compliance(analysis_result)
-        compliance_report["compliance_results"]["CSRD"] = csrd_check
-        
-        if csrd_check["compliance_level"] in ["Non-compliant", "Partially compliant"]:
-            compliance_report["overall_compliance"] = "Partially compliant"
-            compliance_report["recommendations"].extend(csrd_check["recommendations"])
+    hits = scan_analysis(analysis_result)
     
-    # Check SEC compliance if requested
-    if "SEC" in regulations:
-        sec_check = check_sec_compliance(analysis_result)
-        compliance_report["compliance_results"]["SEC"] = sec_check
+    # Check requested regulations, then AI transparency requirements
+    checked = [r for r in ["CSRD", "SEC", "IFRS", "GRI", "GDPR"] if r in regulations]
+    for regulation in checked + ["AI Transparency"]:
+        check = evaluate_analysis_regulation(regulation, hits, analysis_result)
+        compliance_report["compliance_results"][regulation] = check
         
-        if sec_check["compliance_level"] in ["Non-compliant", "Partially compliant"]:
+        if check["compliance_level"] in ["Non-compliant", "Partially compliant"]:
             compliance_report["overall_compliance"] = "Partially compliant"
-            compliance_report["recommendations"].extend(sec_check["recommendations"])
-    
-    # Check IFRS compliance if requested
-    if "IFRS" in regulations:
-        ifrs_check = check_ifrs_compliance(analysis_result)
-        compliance_report["compliance_results"]["IFRS"] = ifrs_check
-        
-        if ifrs_check["compliance_level"] in ["Non-compliant", "Partially compliant"]:
-            compliance_report["overall_compliance"] = "Partially compliant"
-            compliance_report["recommendations"].extend(ifrs_check["recommendations"])
-    
-    # Check GRI compliance if requested
-    if "GRI" in regulations:
-        gri_check = check_gri_compliance(analysis_result)
-        compliance_report["compliance_results"]["GRI"] = gri_check
-        
-        if gri_check["compliance_level"] in ["Non-compliant", "Partially compliant"]:
-            compliance_report["overall_compliance"] = "Partially compliant"
-            compliance_report["recommendations"].extend(gri_check["recommendations"])
-    
-    # Check GDPR compliance if requested
-    if "GDPR" in regulations:
-        gdpr_check = check_gdpr_compliance(analysis_result)
-        compliance_report["compliance_results"]["GDPR"] = gdpr_check
-        
-        if gdpr_check["compliance_level"] in ["Non-compliant", "Partially compliant"]:
-            compliance_report["overall_compliance"] = "Partially compliant"
-            compliance_report["recommendations"].extend(gdpr_check["recommendations"])
-    
-    # Check AI transparency requirements
-    ai_transparency_check = check_ai_transparency(analysis_result)
-    compliance_report["compliance_results"]["AI Transparency"] = ai_transparency_check
-    
-    if ai_transparency_check["compliance_level"] in ["Non-compliant", "Partially compliant"]:
-        compliance_report["overall_compliance"] = "Partially compliant"
-        compliance_report["recommendations"].extend(ai_transparency_check["recommendations"])
+            compliance_report["recommendations"].extend(check["recommendations"])
     
     return compliance_report
 
-def check_csrd_compliance(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+def check_csrd_compliance(analysis_result: Dict[str, Any], hits: Optional[HitTable] = None) -> Dict[str, Any]:
     """
     Check compliance with Corporate Sustainability Reporting Directive (CSRD).
     
     Args:
         analysis_result: The AI-generated analysis
+        hits: Indicator hits of the analysis, if already scanned
         
     Returns:
         Dictionary with CSRD compliance results
     """
-    # Define CSRD requirements
-    csrd_requirements = [
-        {
-            "requirement": "Double Materiality Assessment",
-            "description": "Assessment includes both financial materiality and impact materiality",
-            "satisfied": False
-        },
-        {
-            "requirement": "Environmental Topics",
-            "description": "Covers climate change, pollution, water, biodiversity, and resource use",
-            "satisfied": False
-        },
-        {
-            "requirement": "Social Topics", 
-            "description": "Addresses workforce topics, affected communities, and consumers/end-users",
-            "satisfied": False
-        },
-        {
-            "requirement": "Governance Topics",
-            "description": "Covers business conduct, internal controls, and risk management",
-            "satisfied": False
-        },
-        {
-            "requirement": "Forward-Looking Information",
-            "description": "Includes targets, commitments, and future scenarios",
-            "satisfied": False
-        }
-    ]
-    
-    # Check if requirements are satisfied
-    compliance_level = "Non-compliant"
-    recommendations = []
-    
-    # Check environmental topics
-    if any(topic.lower() in str(analysis_result).lower() for topic in 
-           ["climate", "emissions", "pollution", "water", "biodiversity", "resource"]):
-        csrd_requirements[1]["satisfied"] = True
-    else:
-        recommendations.append("Include analysis of environmental topics: climate change, pollution, water, biodiversity, resource use")
-    
-    # Check social topics
-    if any(topic.lower() in str(analysis_result).lower() for topic in 
-           ["workforce", "employee", "community", "social", "human rights", "consumer"]):
-        csrd_requirements[2]["satisfied"] = True
-    else:
-        recommendations.append("Address social topics: workforce conditions, affected communities, consumer impacts")
-    
-    # Check governance topics
-    if any(topic.lower() in str(analysis_result).lower() for topic in 
-           ["governance", "business conduct", "risk", "controls", "ethics"]):
-        csrd_requirements[3]["satisfied"] = True
-    else:
-        recommendations.append("Include governance topics: business conduct, internal controls, risk management")
-    
-    # Check materiality
-    if "materiality" in str(analysis_result).lower() or "material" in str(analysis_result).lower():
-        csrd_requirements[0]["satisfied"] = True
-    else:
-        recommendations.append("Include a double materiality assessment that covers both financial impact and impact on people and environment")
-    
-    # Check forward-looking information
-    if any(topic.lower() in str(analysis_result).lower() for topic in 
-           ["target", "goal", "commitment", "future", "plan", "scenario"]):
-        csrd_requirements[4]["satisfied"] = True
-    else:
-        recommendations.append("Include forward-looking information: targets, commitments, future scenarios")
-    
-    # Determine overall compliance level
-    satisfied_count = sum(1 for req in csrd_requirements if req["satisfied"])
-    if satisfied_count == len(csrd_requirements):
-        compliance_level = "Compliant"
-    elif satisfied_count >= 3:
-        compliance_level = "Partially compliant"
-    
-    return {
-        "compliance_level": compliance_level,
-        "requirements": csrd_requirements,
-        "recommendations": recommendations
-    }
+    return evaluate_analysis_regulation("CSRD", hits or scan_analysis(analysis_result), analysis_result)
 
-def check_sec_compliance(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+def check_sec_compliance(analysis_result: Dict[str, Any], hits: Optional[HitTable] = None) -> Dict[str, Any]:
     """
     Check compliance with SEC climate disclosure requirements.
     
     Args:
         analysis_result: The AI-generated analysis
+        hits: Indicator hits of the analysis, if already scanned
         
     Returns:
         Dictionary with SEC compliance results
     """
-    # Define SEC requirements
-    sec_requirements = [
-        {
-            "requirement": "Climate Risk Disclosure",
-            "description": "Disclosure of material climate-related risks",
-            "satisfied": False
-        },
-        {
-            "requirement": "GHG Emissions Reporting",
-            "description": "Reporting of Scope 1 and Scope 2 GHG emissions",
-            "satisfied": False
-        },
-        {
-            "requirement": "Climate Risk Management",
-            "description": "Description of processes for managing climate-related risks",
-            "satisfied": False
-        },
-        {
-            "requirement": "Financial Impact Assessment",
-            "description": "Assessment of financial impacts of climate-related risks",
-            "satisfied": False
-        },
-        {
-            "requirement": "Attestation Requirements",
-            "description": "Appropriate attestation of reported information",
-            "satisfied": False
-        }
-    ]
-    
-    # Check if requirements are satisfied
-    compliance_level = "Non-compliant"
-    recommendations = []
-    
-    # Check climate risk disclosure
-    if any(term.lower() in str(analysis_result).lower() for term in 
-           ["climate risk", "climate-related risk", "climate change risk"]):
-        sec_requirements[0]["satisfied"] = True
-    else:
-        recommendations.append("Include disclosure of material climate-related risks")
-    
-    # Check GHG emissions reporting
-    ghg_terms = ["greenhouse gas", "ghg emissions", "scope 1", "scope 2", "carbon emissions"]
-    if any(term.lower() in str(analysis_result).lower() for term in ghg_terms):
-        sec_requirements[1]["satisfied"] = True
-    else:
-        recommendations.append("Include reporting of Scope 1 and Scope 2 GHG emissions")
-    
-    # Check climate risk management
-    management_terms = ["risk management", "climate strategy", "mitigation measures", "adaptation measures"]
-    if any(term.lower() in str(analysis_result).lower() for term in management_terms):
-        sec_requirements[2]["satisfied"] = True
-    else:
-        recommendations.append("Describe processes for identifying, assessing, and managing climate-related risks")
-    
-    # Check financial impact assessment
-    financial_terms = ["financial impact", "financial risk", "financial consequence", "financial assessment"]
-    if any(term.lower() in str(analysis_result).lower() for term in financial_terms):
-        sec_requirements[3]["satisfied"] = True
-    else:
-        recommendations.append("Include assessment of financial impacts of climate-related risks")
-    
-    # Check attestation requirements
-    attestation_terms = ["attestation", "assurance", "verification", "audit", "certified"]
-    if any(term.lower() in str(analysis_result).lower() for term in attestation_terms):
-        sec_requirements[4]["satisfied"] = True
-    else:
-        recommendations.append("Include information on attestation of reported climate-related information")
-    
-    # Determine overall compliance level
-    satisfied_count = sum(1 for req in sec_requirements if req["satisfied"])
-    if satisfied_count == len(sec_requirements):
-        compliance_level = "Compliant"
-    elif satisfied_count >= 3:
-        compliance_level = "Partially compliant"
-    
-    return {
-        "compliance_level": compliance_level,
-        "requirements": sec_requirements,
-        "recommendations": recommendations
-    }
+    return evaluate_analysis_regulation("SEC", hits or scan_analysis(analysis_result), analysis_result)
 
-def check_ifrs_compliance(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+def check_ifrs_compliance(analysis_result: Dict[str, Any], hits: Optional[HitTable] = None) -> Dict[str, Any]:
     """
     Check compliance with IFRS Sustainability Disclosure Standards.
     
     Args:
         analysis_result: The AI-generated analysis
+        hits: Indicator hits of the analysis, if already scanned
         
     Returns:
         Dictionary with IFRS compliance results
     """
-    # Define IFRS requirements
-    ifrs_requirements = [
-        {
-            "requirement": "General Requirements",
-            "description": "Compliance with IFRS S1 General Requirements",
-            "satisfied": False
-        },
-        {
-            "requirement": "Climate Disclosures",
-            "description": "Compliance with IFRS S2 Climate-related Disclosures",
-            "satisfied": False
-        },
-        {
-            "requirement": "Materiality Assessment",
-            "description": "Enterprise value-focused materiality assessment",
-            "satisfied": False
-        },
-        {
-            "requirement": "Connected Information",
-            "description": "Connection between sustainability and financial information",
-            "satisfied": False
-        },
-        {
-            "requirement": "Fair Presentation",
-            "description": "Fair presentation of sustainability-related risks and opportunities",
-            "satisfied": False
-        }
-    ]
-    
-    # Check if requirements are satisfied
-    compliance_level = "Non-compliant"
-    recommendations = []
-    
-    # Check general requirements
-    general_terms = ["ifrs s1", "general requirements", "sustainability-related financial information"]
-    if any(term.lower() in str(analysis_result).lower() for term in general_terms):
-        ifrs_requirements[0]["satisfied"] = True
-    else:
-        recommendations.append("Include disclosure in accordance with IFRS S1 General Requirements")
-    
-    # Check climate disclosures
-    climate_terms = ["ifrs s2", "climate-related disclosures", "climate risk", "climate opportunity"]
-    if any(term.lower() in str(analysis_result).lower() for term in climate_terms):
-        ifrs_requirements[1]["satisfied"] = True
-    else:
-        recommendations.append("Include climate-related disclosures in accordance with IFRS S2")
-    
-    # Check materiality assessment
-    materiality_terms = ["materiality assessment", "enterprise value", "material information"]
-    if any(term.lower() in str(analysis_result).lower() for term in materiality_terms):
-        ifrs_requirements[2]["satisfied"] = True
-    else:
-        recommendations.append("Include enterprise value-focused materiality assessment")
-    
-    # Check connected information
-    connected_terms = ["connected information", "financial statements", "connection to financial"]
-    if any(term.lower() in str(analysis_result).lower() for term in connected_terms):
-        ifrs_requirements[3]["satisfied"] = True
-    else:
-        recommendations.append("Connect sustainability information to financial information")
-    
-    # Check fair presentation
-    fair_terms = ["fair presentation", "complete", "neutral", "accurate", "balanced view"]
-    if any(term.lower() in str(analysis_result).lower() for term in fair_terms):
-        ifrs_requirements[4]["satisfied"] = True
-    else:
-        recommendations.append("Ensure fair presentation of sustainability-related risks and opportunities")
-    
-    # Determine overall compliance level
-    satisfied_count = sum(1 for req in ifrs_requirements if req["satisfied"])
-    if satisfied_count == len(ifrs_requirements):
-        compliance_level = "Compliant"
-    elif satisfied_count >= 3:
-        compliance_level = "Partially compliant"
-    
-    return {
-        "compliance_level": compliance_level,
-        "requirements": ifrs_requirements,
-        "recommendations": recommendations
-    }
+    return evaluate_analysis_regulation("IFRS", hits or scan_analysis(analysis_result), analysis_result)
 
-def check_gri_compliance(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+def check_gri_compliance(analysis_result: Dict[str, Any], hits: Optional[HitTable] = None) -> Dict[str, Any]:
     """
     Check compliance with Global Reporting Initiative (GRI) Standards.
     
     Args:
         analysis_result: The AI-generated analysis
+        hits: Indicator hits of the analysis, if already scanned
         
     Returns:
         Dictionary with GRI compliance results
     """
-    # Define GRI requirements
-    gri_requirements = [
-        {
-            "requirement": "Universal Standards",
-            "description": "Disclosure of GRI 1, 2, and 3 information",
-            "satisfied": False
-        },
-        {
-            "requirement": "Material Topics",
-            "description": "Identification and disclosure of material topics",
-            "satisfied": False
-        },
-        {
-            "requirement": "Topic-Specific Disclosures",
-            "description": "Detailed reporting on material topics using GRI topic standards",
-            "satisfied": False
-        },
-        {
-            "requirement": "Stakeholder Engagement",
-            "description": "Disclosure of stakeholder engagement processes",
-            "satisfied": False
-        },
-        {
-            "requirement": "Reporting Principles",
-            "description": "Adherence to GRI reporting principles",
-            "satisfied": False
-        }
-    ]
-    
-    # Check if requirements are satisfied
-    compliance_level = "Non-compliant"
-    recommendations = []
-    
-    # Check universal standards
-    universal_terms = ["gri 1", "gri 2", "gri 3", "universal standards", "foundation", "general disclosures"]
-    if any(term.lower() in str(analysis_result).lower() for term in universal_terms):
-        gri_requirements[0]["satisfied"] = True
-    else:
-        recommendations.append("Include disclosures in accordance with GRI Universal Standards")
-    
-    # Check material topics
-    material_terms = ["material topic", "materiality assessment", "materiality analysis"]
-    if any(term.lower() in str(analysis_result).lower() for term in material_terms):
-        gri_requirements[1]["satisfied"] = True
-    else:
-        recommendations.append("Identify and disclose material topics according to GRI Standards")
-    
-    # Check topic-specific disclosures
-    topic_terms = ["topic standard", "topic-specific", "gri 3", "management approach"]
-    if any(term.lower() in str(analysis_result).lower() for term in topic_terms):
-        gri_requirements[2]["satisfied"] = True
-    else:
-        recommendations.append("Include topic-specific disclosures for each material topic")
-    
-    # Check stakeholder engagement
-    stakeholder_terms = ["stakeholder engagement", "stakeholder consultation", "stakeholder input"]
-    if any(term.lower() in str(analysis_result).lower() for term in stakeholder_terms):
-        gri_requirements[3]["satisfied"] = True
-    else:
-        recommendations.append("Disclose stakeholder engagement processes and outcomes")
-    
-    # Check reporting principles
-    principle_terms = ["reporting principle", "accuracy", "balance", "clarity", "comparability", "completeness"]
-    if any(term.lower() in str(analysis_result).lower() for term in principle_terms):
-        gri_requirements[4]["satisfied"] = True
-    else:
-        recommendations.append("Demonstrate adherence to GRI reporting principles")
-    
-    # Determine overall compliance level
-    satisfied_count = sum(1 for req in gri_requirements if req["satisfied"])
-    if satisfied_count == len(gri_requirements):
-        compliance_level = "Compliant"
-    elif satisfied_count >= 3:
-        compliance_level = "Partially compliant"
-    
-    return {
-        "compliance_level": compliance_level,
-        "requirements": gri_requirements,
-        "recommendations": recommendations
-    }
+    return evaluate_analysis_regulation("GRI", hits or scan_analysis(analysis_result), analysis_result)
 
-def check_gdpr_compliance(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+def check_gdpr_compliance(analysis_result: Dict[str, Any], hits: Optional[HitTable] = None) -> Dict[str, Any]:
     """
     Check compliance with GDPR data privacy requirements.
     
     Args:
         analysis_result: The AI-generated analysis
+        hits: Indicator hits of the analysis, if already scanned
         
     Returns:
         Dictionary with GDPR compliance results
     """
-    # Define GDPR requirements for AI analysis
-    gdpr_requirements = [
-        {
-            "requirement": "Personal Data Minimization",
-            "description": "Analysis doesn't include unnecessary personal data",
-            "satisfied": True  # Assuming no personal data by default
-        },
-        {
-            "requirement": "Data Processing Transparency",
-            "description": "Clear explanation of how data is processed",
-            "satisfied": False
-        },
-        {
-            "requirement": "Right to Explanation",
-            "description": "Ability to explain automated decisions",
-            "satisfied": False
-        },
-        {
-            "requirement": "Data Subject Rights",
-            "description": "Respect for access, rectification, erasure rights",
-            "satisfied": False
-        }
-    ]
-    
-    # Check if requirements are satisfied
-    compliance_level = "Non-compliant"
-    recommendations = []
-    
-    # Check for personal data (potential violation)
-    personal_data_indicators = ["name", "email", "phone", "address", "person", "individual"]
-    if any(indicator in str(analysis_result).lower() for indicator in personal_data_indicators):
-        gdpr_requirements[0]["satisfied"] = False
-        recommendations.append("Remove or anonymize personal data in the analysis")
-    
-    # Check for transparency in data processing
-    if "_explanation_metadata" in analysis_result:
-        gdpr_requirements[1]["satisfied"] = True
-    else:
-        recommendations.append("Include metadata on data processing methods and sources")
-    
-    # Check for right to explanation
-    if "_explanations" in analysis_result:
-        gdpr_requirements[2]["satisfied"] = True
-    else:
-        recommendations.append("Add explanations for how analysis conclusions were reached")
-    
-    # Check for data subject rights acknowledgment
-    data_rights_indicators = ["data subject", "rights", "access right", "rectification", "erasure"]
-    if any(indicator in str(analysis_result).lower() for indicator in data_rights_indicators):
-        gdpr_requirements[3]["satisfied"] = True
-    else:
-        recommendations.append("Include acknowledgment of data subject rights in the analysis documentation")
-    
-    # Determine overall compliance level
-    satisfied_count = sum(1 for req in gdpr_requirements if req["satisfied"])
-    if satisfied_count == len(gdpr_requirements):
-        compliance_level = "Compliant"
-    elif satisfied_count >= 2:
-        compliance_level = "Partially compliant"
-    
-    return {
-        "compliance_level": compliance_level,
-        "requirements": gdpr_requirements,
-        "recommendations": recommendations
-    }
+    return evaluate_analysis_regulation("GDPR", hits or scan_analysis(analysis_result), analysis_result)
 
-def check_ai_transparency(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+def check_ai_transparency(analysis_result: Dict[str, Any], hits: Optional[HitTable] = None) -> Dict[str, Any]:
     """
     Check compliance with AI transparency and explainability requirements.
     
     Args:
         analysis_result: The AI-generated analysis
+        hits: Indicator hits of the analysis, if already scanned
         
     Returns:
         Dictionary with AI transparency compliance results
     """
-    # Define AI transparency requirements
-    transparency_requirements = [
-        {
-            "requirement": "Model Disclosure",
-            "description": "Disclosure of AI models and methods used",
-            "satisfied": False
-        },
-        {
-            "requirement": "Decision Explanation",
-            "description": "Explanation of how AI reached conclusions",
-            "satisfied": False
-        },
-        {
-            "requirement": "Confidence Levels",
-            "description": "Indication of confidence/uncertainty in results",
-            "satisfied": False
-        },
-        {
-            "requirement": "Human Oversight",
-            "description": "Clear indication of human review/oversight",
-            "satisfied": False
-        }
-    ]
-    
-    # Check if requirements are satisfied
-    compliance_level = "Non-compliant"
-    recommendations = []
-    
-    # Check for model disclosure
-    if "_explanation_metadata" in analysis_result and "model" in str(analysis_result).lower():
-        transparency_requirements[0]["satisfied"] = True
-    else:
-        recommendations.append("Include disclosure of AI models and methods used in the analysis")
-    
-    # Check for decision explanation
-    if "_explanations" in analysis_result:
-        transparency_requirements[1]["satisfied"] = True
-    else:
-        recommendations.append("Add explanations for how conclusions were reached by the AI system")
-    
-    # Check for confidence levels
-    confidence_indicators = ["confidence", "certainty", "probability", "likelihood", "uncertainty"]
-    if any(indicator in str(analysis_result).lower() for indicator in confidence_indicators):
-        transparency_requirements[2]["satisfied"] = True
-    else:
-        recommendations.append("Include confidence levels or uncertainty metrics for key findings")
-    
-    # Check for human oversight indication
-    oversight_indicators = ["review", "oversight", "human", "analyst", "verified", "approved"]
-    if any(indicator in str(analysis_result).lower() for indicator in oversight_indicators):
-        transparency_requirements[3]["satisfied"] = True
-    else:
-        recommendations.append("Add clear indication of human review/oversight in the analysis process")
-    
-    # Determine overall compliance level
-    satisfied_count = sum(1 for req in transparency_requirements if req["satisfied"])
-    if satisfied_count == len(transparency_requirements):
-        compliance_level = "Compliant"
-    elif satisfied_count >= 2:
-        compliance_level = "Partially compliant"
-    
-    return {
-        "compliance_level": compliance_level,
-        "requirements": transparency_requirements,
-        "recommendations": recommendations
-    }
+    return evaluate_analysis_regulation("AI Transparency", hits or scan_analysis(analysis_result), analysis_result)
 
 def generate_compliance_documentation(analysis_result: Dict[str, Any], 
                                      compliance_report: Dict[str, Any]) -> Dict[str, Any]:
@@ -968,55 +499,114 @@ def analyze_sustainability_report_compliance(report_text: str,
     }
     
     # Check if we can use AI for advanced analysis
-    openai_api_key = os.getenv('OPENAI_API_KEY')
+    engine = get_evaluation_engine()
     
-    if openai_api_key and AI_LIBRARIES_AVAILABLE:
-        try:
-            # Create prompt for analysis
-            prompt = f"""
-            Analyze this sustainability report for compliance with:
-            - CSRD (Corporate Sustainability Reporting Directive)
-            - GDPR Data Privacy
-            - AI Transparency & Bias Mitigation
+    if engine.available:
+        compliance_analysis.update(perform_ai_compliance_analysis(report_text, regulations, engine))
+    else:
+        # Use rule-based analysis when AI isn't available
+        compliance_analysis.update(perform_rule_based_compliance_analysis(report_text, regulations))
+    
+    return compliance_analysis
+
+REGULATION_PROMPT_NAMES = {
+    "CSRD": "CSRD (Corporate Sustainability Reporting Directive)",
+    "GDPR": "GDPR Data Privacy",
+    "AI Transparency": "AI Transparency & Bias Mitigation"
+}
+
+def build_regulation_prompt(report_text: str, regulation: str) -> str:
+    """
+    Build the LLM prompt that checks a report against a single regulation.
+    
+    Args:
+        report_text: The sustainability report text
+        regulation: Regulation to check compliance against
+        
+    Returns:
+        Prompt text
+    """
+    return f"""
+            Analyze this sustainability report for compliance with {REGULATION_PROMPT_NAMES.get(regulation, regulation)}.
             
             Report text:
             {report_text[:2000]}... [truncated]
             
-            Provide a detailed analysis including:
-            1. Compliance scores (0-100) for each regulation
+            Provide:
+            1. A compliance score (0-100)
             2. Identified risk areas
             3. Specific recommendations for improvement
-            4. Detailed analysis of each compliance area
             
-            Format your response as a structured JSON.
+            Format your response as JSON with the keys "score", "risk_areas" and "recommendations".
             """
-            
-            # Use OpenAI for analysis
-            llm = ChatOpenAI(model="gpt-4-turbo", temperature=0.2)
-            response = llm.invoke(prompt).content
-            
-            # Parse the response
-            try:
-                ai_analysis = json.loads(response)
-                compliance_analysis.update(ai_analysis)
-            except json.JSONDecodeError:
-                # Fallback to rule-based analysis
-                compliance_analysis.update(perform_rule_based_compliance_analysis(report_text, regulations))
-                
-        except Exception as e:
-            logger.error(f"Error in AI-based compliance analysis: {str(e)}")
-            # Fallback to rule-based analysis
-            compliance_analysis.update(perform_rule_based_compliance_analysis(report_text, regulations))
-    else:
-        # Use rule-based analysis when AI isn't available
-        compliance_analysis.update(perform_rule_based_compliance_analysis(report_text, regulations))
+
+def perform_ai_compliance_analysis(report_text: str, regulations: List[str], engine=None) -> Dict[str, Any]:
+    """
+    Perform LLM-based compliance analysis with one concurrent call per regulation.
     
-    return compliance_analysis
+    Responses are cached per report, identical in-flight calls are shared, and
+    any regulation whose call fails, misses the deadline or returns invalid
+    JSON falls back to the rule-based analysis.
+    
+    Args:
+        report_text: The sustainability report text
+        regulations: List of regulations to check compliance against
+        engine: Evaluation engine to use (defaults to the shared engine)
+        
+    Returns:
+        Dictionary with compliance analysis results
+    """
+    engine = engine or get_evaluation_engine()
+    checked = [r for r in regulations if r in REGULATION_PROMPT_NAMES and r != "AI Transparency"]
+    checked.append("AI Transparency")
+    
+    document_hash = content_hash(report_text)
+    responses = engine.evaluate_many(
+        {regulation: build_regulation_prompt(report_text, regulation) for regulation in checked},
+        document_hash=document_hash
+    )
+    
+    analysis = {
+        "compliance_scores": {},
+        "risk_areas": [],
+        "recommendations": [],
+        "detailed_analysis": {}
+    }
+    fallback = []
+    hits = None
+    for regulation in checked:
+        try:
+            result = json.loads(responses[regulation]) if responses[regulation] else None
+            score = result["score"]
+            risks = list(result.get("risk_areas", []))
+            recommendations = list(result.get("recommendations", []))
+        except (json.JSONDecodeError, TypeError, KeyError, AttributeError):
+            result = None
+        if result is None:
+            fallback.append(regulation)
+            hits = hits or scan_text(report_text)
+            score, risks, recommendations, _ = evaluate_report_regulation(regulation, hits)
+        
+        analysis["compliance_scores"][regulation] = score
+        analysis["risk_areas"].extend(risks)
+        analysis["recommendations"].extend(recommendations)
+        analysis["detailed_analysis"][regulation] = {
+            "score": score,
+            "risk_areas": risks,
+            "recommendations": recommendations
+        }
+    
+    if fallback:
+        logger.info(f"Used rule-based compliance analysis for {', '.join(fallback)}")
+    return analysis
 
 def perform_rule_based_compliance_analysis(report_text: str, regulations: List[str]) -> Dict[str, Any]:
     """
     Perform rule-based compliance analysis when AI isn't available.
     
+    The report is scanned once for every regulation's indicators; each
+    regulation is then scored from the shared hit table.
+    
     Args:
         report_text: The sustainability report text
         regulations: List of regulations to check compliance against
@@ -1031,241 +621,59 @@ def perform_rule_based_compliance_analysis(report_text: str, regulations: List[s
         "detailed_analysis": {}
     }
     
-    # Check CSRD compliance
-    if "CSRD" in regulations:
-        csrd_score, csrd_risks, csrd_recommendations = analyze_csrd_compliance(report_text)
-        analysis["compliance_scores"]["CSRD"] = csrd_score
-        analysis["risk_areas"].extend(csrd_risks)
-        analysis["recommendations"].extend(csrd_recommendations)
-        analysis["detailed_analysis"]["CSRD"] = {
-            "score": csrd_score,
-            "risk_areas": csrd_risks,
-            "recommendations": csrd_recommendations
-        }
-    
-    # Check GDPR compliance
-    if "GDPR" in regulations:
-        gdpr_score, gdpr_risks, gdpr_recommendations = analyze_gdpr_compliance(report_text)
-        analysis["compliance_scores"]["GDPR"] = gdpr_score
-        analysis["risk_areas"].extend(gdpr_risks)
-        analysis["recommendations"].extend(gdpr_recommendations)
-        analysis["detailed_analysis"]["GDPR"] = {
-            "score": gdpr_score,
-            "risk_areas": gdpr_risks,
-            "recommendations": gdpr_recommendations
+    hits = scan_text(report_text)
+    
+    # Check requested regulations, then AI Transparency compliance
+    checked = [r for r in ["CSRD", "GDPR"] if r in regulations]
+    for regulation in checked + ["AI Transparency"]:
+        score, risks, recommendations, evidence = evaluate_report_regulation(regulation, hits)
+        analysis["compliance_scores"][regulation] = score
+        analysis["risk_areas"].extend(risks)
+        analysis["recommendations"].extend(recommendations)
+        analysis["detailed_analysis"][regulation] = {
+            "score": score,
+            "risk_areas": risks,
+            "recommendations": recommendations,
+            "evidence": evidence
         }
     
-    # Check AI Transparency compliance
-    ai_score, ai_risks, ai_recommendations = analyze_ai_transparency_compliance(report_text)
-    analysis["compliance_scores"]["AI Transparency"] = ai_score
-    analysis["risk_areas"].extend(ai_risks)
-    analysis["recommendations"].extend(ai_recommendations)
-    analysis["detailed_analysis"]["AI Transparency"] = {
-        "score": ai_score,
-        "risk_areas": ai_risks,
-        "recommendations": ai_recommendations
-    }
-    
     return analysis
 
-def analyze_csrd_compliance(report_text: str) -> tuple:
+def analyze_csrd_compliance(report_text: str, hits: Optional[HitTable] = None) -> tuple:
     """
     Analyze CSRD compliance using rule-based methods.
     
     Args:
         report_text: The sustainability report text
+        hits: Indicator hits of the report, if already scanned
         
     Returns:
         Tuple of (compliance_score, risk_areas, recommendations)
     """
-    report_text_lower = report_text.lower()
-    
-    # Initialize score and findings
-    score = 60  # Start with a baseline score
-    risk_areas = []
-    recommendations = []
-    
-    # Check for key CSRD requirements
-    
-    # 1. Double materiality assessment
-    if "materiality assessment" in report_text_lower or "double materiality" in report_text_lower:
-        score += 10
-    else:
-        score -= 10
-        risk_areas.append("Missing double materiality assessment")
-        recommendations.append("Include a double materiality assessment that covers both financial materiality and impact materiality")
-    
-    # 2. Environmental topics
-    env_topics = ["climate change", "pollution", "water", "biodiversity", "resource use"]
-    env_coverage = sum(1 for topic in env_topics if topic in report_text_lower)
-    if env_coverage >= 3:
-        score += 5
-    else:
-        score -= 5
-        risk_areas.append("Insufficient coverage of environmental topics")
-        recommendations.append("Expand coverage of environmental topics to include climate change, pollution, water, biodiversity, and resource use")
-    
-    # 3. Social topics
-    social_topics = ["workforce", "human rights", "communities", "consumers"]
-    social_coverage = sum(1 for topic in social_topics if topic in report_text_lower)
-    if social_coverage >= 2:
-        score += 5
-    else:
-        score -= 5
-        risk_areas.append("Insufficient coverage of social topics")
-        recommendations.append("Expand coverage of social topics to include workforce, affected communities, and consumers/end-users")
-    
-    # 4. Governance topics
-    gov_topics = ["governance", "business conduct", "ethics", "risk management"]
-    gov_coverage = sum(1 for topic in gov_topics if topic in report_text_lower)
-    if gov_coverage >= 2:
-        score += 5
-    else:
-        score -= 5
-        risk_areas.append("Insufficient coverage of governance topics")
-        recommendations.append("Expand coverage of governance topics to include business conduct, internal controls, and risk management")
-    
-    # 5. Forward-looking information
-    if any(term in report_text_lower for term in ["target", "goal", "commitment", "plan"]):
-        score += 5
-    else:
-        score -= 5
-        risk_areas.append("Missing forward-looking information")
-        recommendations.append("Include forward-looking information such as targets, commitments, and plans")
-    
-    # Ensure score is within 0-100 range
-    score = max(0, min(100, score))
-    
-    return score, risk_areas, recommendations
+    return evaluate_report_regulation("CSRD", hits or scan_text(report_text))[:3]
 
-def analyze_gdpr_compliance(report_text: str) -> tuple:
+def analyze_gdpr_compliance(report_text: str, hits: Optional[HitTable] = None) -> tuple:
     """
     Analyze GDPR compliance using rule-based methods.
     
     Args:
         report_text: The sustainability report text
+        hits: Indicator hits of the report, if already scanned
         
     Returns:
         Tuple of (compliance_score, risk_areas, recommendations)
     """
-    report_text_lower = report_text.lower()
-    
-    # Initialize score and findings
-    score = 70  # Start with a baseline score
-    risk_areas = []
-    recommendations = []
-    
-    # Check for key GDPR concerns
-    
-    # 1. Personal data handling
-    personal_data_terms = ["personal data", "personally identifiable", "personal information"]
-    if any(term in report_text_lower for term in personal_data_terms):
-        # Check if proper data protection measures are mentioned
-        protection_terms = ["data protection", "anonymized", "pseudonymized", "consent", "data minimization"]
-        if not any(term in report_text_lower for term in protection_terms):
-            score -= 15
-            risk_areas.append("Personal data mentioned without adequate protection measures")
-            recommendations.append("Ensure all personal data is properly anonymized or has explicit consent for processing")
-    
-    # 2. Transparency in data processing
-    if "data processing" in report_text_lower and "transparency" in report_text_lower:
-        score += 10
-    else:
-        score -= 10
-        risk_areas.append("Lack of transparency in data processing")
-        recommendations.append("Include clear explanation of how data is processed in compliance with GDPR transparency requirements")
-    
-    # 3. Data subject rights
-    rights_terms = ["right to access", "right to erasure", "right to rectification", "data subject rights"]
-    if any(term in report_text_lower for term in rights_terms):
-        score += 10
-    else:
-        score -= 10
-        risk_areas.append("No mention of data subject rights")
-        recommendations.append("Include acknowledgment of data subject rights (access, rectification, erasure) in the report")
-    
-    # 4. Data processing legal basis
-    legal_basis_terms = ["legal basis", "legitimate interest", "consent for", "contractual necessity"]
-    if any(term in report_text_lower for term in legal_basis_terms):
-        score += 10
-    else:
-        score -= 10
-        risk_areas.append("No clear legal basis for data processing")
-        recommendations.append("Specify the legal basis for all data processing activities mentioned in the report")
-    
-    # Ensure score is within 0-100 range
-    score = max(0, min(100, score))
-    
-    return score, risk_areas, recommendations
+    return evaluate_report_regulation("GDPR", hits or scan_text(report_text))[:3]
 
-def analyze_ai_transparency_compliance(report_text: str) -> tuple:
+def analyze_ai_transparency_compliance(report_text: str, hits: Optional[HitTable] = None) -> tuple:
     """
     Analyze AI transparency compliance using rule-based methods.
     
     Args:
         report_text: The sustainability report text
+        hits: Indicator hits of the report, if already scanned
         
     Returns:
         Tuple of (compliance_score, risk_areas, recommendations)
     """
-    report_text_lower = report_text.lower()
-    
-    # Initialize score and findings
-    score = 50  # Start with a baseline score
-    risk_areas = []
-    recommendations = []
-    
-    # Check for key AI transparency requirements
-    
-    # 1. AI usage disclosure
-    ai_terms = ["ai", "artificial intelligence", "machine learning", "algorithm", "automated analysis"]
-    if any(term in report_text_lower for term in ai_terms):
-        # If AI is mentioned, look for transparency measures
-        transparency_terms = ["model", "methodology", "explainable ai", "xai", "ai transparency"]
-        if any(term in report_text_lower for term in transparency_terms):
-            score += 15
-        else:
-            score -= 15
-            risk_areas.append("AI use without transparency disclosure")
-            recommendations.append("Disclose AI models and methods used in sustainability assessments")
-    
-    # 2. Decision explanation
-    explanation_terms = ["explainable", "explanation", "how we determined", "analysis process"]
-    if any(term in report_text_lower for term in explanation_terms):
-        score += 15
-    else:
-        score -= 10
-        risk_areas.append("Lack of explanation for AI-driven decisions")
-        recommendations.append("Provide explanations for how AI-driven conclusions were reached")
-    
-    # 3. Confidence levels
-    confidence_terms = ["confidence level", "certainty", "uncertainty", "probability", "likelihood"]
-    if any(term in report_text_lower for term in confidence_terms):
-        score += 10
-    else:
-        score -= 5
-        risk_areas.append("No confidence levels for AI predictions")
-        recommendations.append("Include confidence levels or uncertainty metrics for AI-generated insights")
-    
-    # 4. Bias mitigation
-    bias_terms = ["bias mitigation", "fairness", "ethical ai", "ai ethics", "algorithmic bias"]
-    if any(term in report_text_lower for term in bias_terms):
-        score += 15
-    else:
-        score -= 15
-        risk_areas.append("No mention of AI bias mitigation")
-        recommendations.append("Include information on how AI bias is detected and mitigated in sustainability assessments")
-    
-    # 5. Human oversight
-    oversight_terms = ["human oversight", "human review", "human in the loop", "human verification"]
-    if any(term in report_text_lower for term in oversight_terms):
-        score += 10
-    else:
-        score -= 10
-        risk_areas.append("No mention of human oversight for AI systems")
-        recommendations.append("Clarify human oversight processes for AI-generated sustainability assessments")
-    
-    # Ensure score is within 0-100 range
-    score = max(0, min(100, score))
-    
-    return score, risk_areas, recommendations
\ No newline at end of file
+    return evaluate_report_regulation("AI Transparency", hits or scan_text(report_text))[:3]
@@ -0,0 +1,252 @@
+"""
+Forecasting Engine for Sustainability Metrics
+Fits every metric series of a request in one batched least-squares solve
+instead of one pandas filter and scikit-learn model per series.
+"""
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from statistics import NormalDist
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIN_OBSERVATIONS = 3
+HORIZON_STEP_DAYS = 30
+PARALLEL_THRESHOLD = int(os.getenv('FORECAST_PARALLEL_THRESHOLD', '5000'))
+
+# Keeps the normal equations solvable for degenerate series (e.g. all points on one day)
+_RIDGE = 1e-9
+
+
+@dataclass
+class SeriesPanel:
+    """Metric series pivoted into aligned, NaN-padded (series x observation) arrays"""
+    names: np.ndarray
+    categories: np.ndarray
+    units: np.ndarray
+    days: np.ndarray          # days since each series' first observation
+    values: np.ndarray
+    mask: np.ndarray          # True where an observation exists
+    counts: np.ndarray
+    last_dates: List[Any]
+
+
+@dataclass
+class ForecastResult:
+    """Per-series forecasts for a panel, aligned with its ``names``"""
+    panel: SeriesPanel
+    horizon_days: np.ndarray  # (series, periods) days since first observation
+    predicted: np.ndarray     # (series, periods)
+    intervals: np.ndarray     # (series, periods) half-width of the prediction interval
+    slopes: np.ndarray        # trend coefficient on standardized time, as LinearRegression reports it
+    means: np.ndarray
+    current_values: np.ndarray  # last finite observation of each series (NaN if none)
+    r2: np.ndarray
+
+    def prediction_dates(self, index: int, forecast_periods: int) -> List[Any]:
+        last_date = self.panel.last_dates[index]
+        return [last_date + timedelta(days=HORIZON_STEP_DAYS * i) for i in range(1, forecast_periods + 1)]
+
+
+def pivot_metrics(metrics: List[Dict[str, Any]]) -> SeriesPanel:
+    """Pivot a flat list of metric records into one aligned panel in a single pass"""
+    df = pd.DataFrame(metrics)
+    try:
+        timestamps = pd.to_datetime(df['timestamp'])
+    except (TypeError, ValueError):
+        # Series recorded with differing formats or offsets
+        timestamps = pd.to_datetime(df['timestamp'], format='mixed', utc=True)
+    df = df.assign(
+        timestamp=timestamps,
+        value=pd.to_numeric(df['value'])
+    ).sort_values(['name', 'timestamp'], kind='stable')
+
+    codes, names = pd.factorize(df['name'], sort=False)
+    position = df.groupby(codes, sort=False).cumcount().to_numpy()
+    counts = np.bincount(codes, minlength=len(names))
+    first_rows = np.flatnonzero(position == 0)
+    last_rows = np.flatnonzero(np.r_[codes[1:] != codes[:-1], True])
+
+    series_count, width = len(names), int(counts.max()) if len(counts) else 0
+    timestamp_values = df['timestamp'].values
+    first_ts = timestamp_values[first_rows]
+    days = np.full((series_count, width), np.nan)
+    values = np.full((series_count, width), np.nan)
+    elapsed = (timestamp_values - first_ts[codes]) // np.timedelta64(1, 'D')
+    days[codes, position] = elapsed.astype(float)
+    values[codes, position] = df['value'].to_numpy(dtype=float)
+
+    def column(name: str, rows: np.ndarray) -> np.ndarray:
+        if name not in df.columns:
+            return np.full(len(rows), None, dtype=object)
+        return df[name].to_numpy(dtype=object)[rows]
+
+    return SeriesPanel(
+        names=np.asarray(names, dtype=object),
+        categories=column('category', first_rows),
+        units=column('unit', first_rows),
+        days=days,
+        values=values,
+        mask=~np.isnan(values),
+        counts=counts,
+        last_dates=list(df['timestamp'].iloc[last_rows])
+    )
+
+
+def _design(t: np.ndarray, raw_days: np.ndarray, seasonal_period_days: Optional[float],
+            harmonics: int) -> np.ndarray:
+    """Stack intercept, standardized time and optional Fourier terms along a last axis"""
+    columns = [np.ones_like(t), t]
+    if seasonal_period_days:
+        for k in range(1, harmonics + 1):
+            angle = 2 * np.pi * k * raw_days / seasonal_period_days
+            columns.extend([np.sin(angle), np.cos(angle)])
+    return np.stack(columns, axis=-1)
+
+
+def _fit_block(days: np.ndarray, values: np.ndarray, mask: np.ndarray, horizon_days: np.ndarray,
+               z: float, seasonal_period_days: Optional[float], harmonics: int
+               ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Batched OLS over a block of series.
+
+    Returns predictions, prediction-interval half widths, the standardized-time
+    coefficient and R^2 for every series in the block.
+    """
+    weights = mask.astype(float)
+    n = weights.sum(axis=1)
+    safe_days = np.where(mask, days, 0.0)
+    y = np.where(mask, values, 0.0)
+
+    # Standardize time per series exactly like StandardScaler (population std, 1 when constant)
+    mean_t = safe_days.sum(axis=1) / n
+    std_t = np.sqrt((weights * (safe_days - mean_t[:, None]) ** 2).sum(axis=1) / n)
+    std_t = np.where(std_t > 0, std_t, 1.0)
+    t = (safe_days - mean_t[:, None]) / std_t[:, None]
+    t_future = (horizon_days - mean_t[:, None]) / std_t[:, None]
+
+    X = _design(t, safe_days, seasonal_period_days, harmonics) * weights[..., None]
+    X_future = _design(t_future, horizon_days, seasonal_period_days, harmonics)
+    k = X.shape[-1]
+
+    xtx = np.einsum('sni,snj->sij', X, X) + _RIDGE * np.eye(k)
+    xty = np.einsum('sni,sn->si', X, y)
+    xtx_inv = np.linalg.inv(xtx)
+    coef = np.einsum('sij,sj->si', xtx_inv, xty)
+
+    residuals = (y - np.einsum('sni,si->sn', X, coef)) * weights
+    rss = (residuals ** 2).sum(axis=1)
+    mean_y = y.sum(axis=1) / n
+    tss = (weights * (y - mean_y[:, None]) ** 2).sum(axis=1)
+    r2 = np.where(tss > 0, 1 - rss / np.where(tss > 0, tss, 1), np.where(rss > 0, 0.0, 1.0))
+
+    sigma2 = rss / np.maximum(n - k, 1)
+    leverage = np.einsum('shi,sij,shj->sh', X_future, xtx_inv, X_future)
+    predicted = np.einsum('shi,si->sh', X_future, coef)
+    intervals = z * np.sqrt(sigma2[:, None] * (1 + leverage))
+    return predicted, intervals, coef[:, 1], r2
+
+
+class ForecastEngine:
+    """
+    Vectorized multi-series trend forecaster.
+
+    All series are pivoted into one panel and their linear trends (plus optional
+    seasonal Fourier terms) are fitted with a single batched normal-equation
+    solve. Prediction intervals use the closed-form OLS variance, which widens
+    with distance from the observed window. Panels above ``parallel_threshold``
+    series are split across a process pool.
+    """
+
+    def __init__(self, seasonal_period_days: Optional[float] = None, harmonics: int = 1,
+                 workers: Optional[int] = None, parallel_threshold: int = PARALLEL_THRESHOLD):
+        self.seasonal_period_days = seasonal_period_days
+        self.harmonics = harmonics
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+
+    def forecast(self, metrics: List[Dict[str, Any]], forecast_periods: int,
+                 prediction_interval: float = 0.95) -> Optional[ForecastResult]:
+        """Forecast every series with at least MIN_OBSERVATIONS points"""
+        if not metrics:
+            return None
+        panel = pivot_metrics(metrics)
+        keep = panel.counts >= MIN_OBSERVATIONS
+        if not keep.any():
+            return None
+        panel = self._select(panel, keep)
+
+        last_days = np.nanmax(panel.days, axis=1)
+        steps = HORIZON_STEP_DAYS * np.arange(1, forecast_periods + 1)
+        horizon_days = last_days[:, None] + steps[None, :]
+        z = NormalDist().inv_cdf(0.5 + prediction_interval / 2)
+
+        predicted = np.empty((len(panel.names), forecast_periods))
+        intervals = np.empty_like(predicted)
+        slopes = np.empty(len(panel.names))
+        r2 = np.empty(len(panel.names))
+
+        # Seasonal terms need more observations than coefficients; the rest get a plain trend
+        seasonal_k = 2 + 2 * self.harmonics if self.seasonal_period_days else 2
+        seasonal = panel.counts > seasonal_k
+        for rows, period in ((seasonal, self.seasonal_period_days), (~seasonal, None)):
+            if not rows.any():
+                continue
+            block = self._fit(panel.days[rows], panel.values[rows], panel.mask[rows],
+                              horizon_days[rows], z, period)
+            predicted[rows], intervals[rows], slopes[rows], r2[rows] = block
+
+        return ForecastResult(
+            panel=panel,
+            horizon_days=horizon_days,
+            predicted=predicted,
+            intervals=intervals,
+            slopes=slopes,
+            means=np.nanmean(panel.values, axis=1),
+            current_values=self._last_finite(panel),
+            r2=r2
+        )
+
+    def _fit(self, days, values, mask, horizon_days, z, period):
+        args = (z, period, self.harmonics)
+        if len(days) < self.parallel_threshold or self.workers == 1:
+            return _fit_block(days, values, mask, horizon_days, *args)
+
+        workers = self.workers or os.cpu_count() or 1
+        splits = np.array_split(np.arange(len(days)), workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_fit_block, days[idx], values[idx], mask[idx], horizon_days[idx], *args)
+                for idx in splits if len(idx)
+            ]
+            blocks = [future.result() for future in futures]
+        return tuple(np.concatenate(parts) for parts in zip(*blocks))
+
+    @staticmethod
+    def _last_finite(panel: SeriesPanel) -> np.ndarray:
+        """Value of each series' last observation that is not NaN"""
+        width = panel.mask.shape[1]
+        last = width - 1 - np.argmax(panel.mask[:, ::-1], axis=1)
+        values = panel.values[np.arange(len(last)), last]
+        return np.where(panel.mask.any(axis=1), values, np.nan)
+
+    @staticmethod
+    def _select(panel: SeriesPanel, keep: np.ndarray) -> SeriesPanel:
+        return SeriesPanel(
+            names=panel.names[keep],
+            categories=panel.categories[keep],
+            units=panel.units[keep],
+            days=panel.days[keep],
+            values=panel.values[keep],
+            mask=panel.mask[keep],
+            counts=panel.counts[keep],
+            last_dates=[d for d, k in zip(panel.last_dates, keep) if k]
+        )
@@ -0,0 +1,186 @@
+"""
+LLM Evaluation Engine
+
+Runs LLM evaluation prompts (explanations, per-regulation compliance checks)
+with response caching, bounded concurrency and request de-duplication:
+
+- Responses are cached under a hash of model, temperature, document hash and
+  prompt, in memory and on disk (see ``ResultCache``), so re-analyzing the
+  same report is free.
+- Calls run on a shared thread pool whose size is the concurrency limit, so
+  the regulations of one report are evaluated in parallel without flooding
+  the provider when many reports arrive at once.
+- Identical prompts that are already in flight share one call (single flight).
+- ``evaluate_many`` waits up to an overall deadline; prompts that miss it
+  come back as None so callers can fall back to rule-based results, while
+  the late responses still land in the cache.
+
+Set ``LLM_EVAL_BASE_URL`` to point the engine at any OpenAI-compatible
+endpoint, e.g. ``scripts/local_llm_server.py`` for tests and benchmarks.
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from .result_cache import ResultCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+try:
+    from langchain_community.chat_models import ChatOpenAI
+    LANGCHAIN_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_AVAILABLE = False
+    logger.warning("LangChain not available. LLM evaluations will be disabled.")
+
+LLM_EVAL_MODEL = os.getenv('LLM_EVAL_MODEL', 'gpt-4-turbo')
+LLM_EVAL_BASE_URL = os.getenv('LLM_EVAL_BASE_URL')
+LLM_EVAL_CONCURRENCY = int(os.getenv('LLM_EVAL_CONCURRENCY', '4'))
+LLM_EVAL_DEADLINE = float(os.getenv('LLM_EVAL_DEADLINE', '60'))
+
+
+class EvaluationEngine:
+    """Cached, concurrent, de-duplicated LLM prompt evaluation"""
+
+    def __init__(self, model: str = LLM_EVAL_MODEL, temperature: float = 0.2,
+                 max_concurrency: int = LLM_EVAL_CONCURRENCY, deadline: float = LLM_EVAL_DEADLINE,
+                 base_url: Optional[str] = LLM_EVAL_BASE_URL, cache: Optional[ResultCache] = None,
+                 client_factory: Optional[Callable[[], Any]] = None):
+        self.model = model
+        self.temperature = temperature
+        self.deadline = deadline
+        self.base_url = base_url
+        self.cache = cache if cache is not None else ResultCache('llm_evaluations')
+        self.client_factory = client_factory or self._default_client
+        self._custom_client = client_factory is not None
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='llm-eval')
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'calls': 0, 'cache_hits': 0, 'deduplicated': 0, 'errors': 0, 'deadline_misses': 0}
+
+    @property
+    def available(self) -> bool:
+        """Whether an LLM endpoint is configured"""
+        if self._custom_client:
+            return True
+        return LANGCHAIN_AVAILABLE and bool(os.getenv('OPENAI_API_KEY') or self.base_url)
+
+    def key(self, prompt: str, document_hash: Optional[str] = None) -> str:
+        return self.cache.key(self.model, self.temperature, document_hash, prompt)
+
+    def submit(self, prompt: str, document_hash: Optional[str] = None) -> Future:
+        """Return a future for the response, served from cache or a shared in-flight call"""
+        key = self.key(prompt, document_hash)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count('cache_hits')
+            future: Future = Future()
+            future.set_result(cached)
+            return future
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._count('deduplicated')
+                return future
+            future = self.executor.submit(self._call, key, prompt, document_hash)
+            self._inflight[key] = future
+        future.add_done_callback(lambda _, key=key: self._forget(key))
+        return future
+
+    def evaluate(self, prompt: str, document_hash: Optional[str] = None,
+                 timeout: Optional[float] = None) -> str:
+        """Evaluate one prompt; raises on provider errors or when the deadline passes"""
+        return self.submit(prompt, document_hash).result(timeout=timeout or self.deadline)
+
+    def evaluate_many(self, prompts: Dict[str, str], document_hash: Optional[str] = None,
+                      deadline: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """
+        Evaluate named prompts concurrently under one overall deadline.
+
+        Returns the response for every name, or None where the call failed or
+        did not finish in time.
+        """
+        futures = {name: self.submit(prompt, document_hash) for name, prompt in prompts.items()}
+        done, _ = wait(futures.values(), timeout=deadline or self.deadline)
+
+        results: Dict[str, Optional[str]] = {}
+        for name, future in futures.items():
+            if future not in done:
+                self._count('deadline_misses')
+                logger.warning(f"LLM evaluation for {name} missed the deadline")
+                results[name] = None
+            elif future.exception() is not None:
+                logger.error(f"LLM evaluation for {name} failed: {str(future.exception())}")
+                results[name] = None
+            else:
+                results[name] = future.result()
+        return results
+
+    def invalidate(self, document_hash: Optional[str] = None) -> None:
+        """Drop cached responses for one document, or all of them"""
+        self.cache.invalidate(document_hash)
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        with self._inflight_lock:
+            stats['in_flight'] = len(self._inflight)
+        stats['cache'] = self.cache.get_stats()
+        stats['timestamp'] = datetime.now().isoformat()
+        return stats
+
+    def _call(self, key: str, prompt: str, document_hash: Optional[str]) -> str:
+        self._count('calls')
+        try:
+            response = self._get_client().invoke(prompt).content
+        except Exception:
+            self._count('errors')
+            raise
+        self.cache.set(key, response, tag=document_hash)
+        return response
+
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                self._client = self.client_factory()
+            return self._client
+
+    def _default_client(self):
+        if not LANGCHAIN_AVAILABLE:
+            raise RuntimeError("LangChain is not installed")
+        kwargs = {'model': self.model, 'temperature': self.temperature, 'request_timeout': self.deadline}
+        if self.base_url:
+            kwargs['openai_api_base'] = self.base_url
+            kwargs['openai_api_key'] = os.getenv('OPENAI_API_KEY', 'local')
+        return ChatOpenAI(**kwargs)
+
+    def _forget(self, key: str) -> None:
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+
+_engine: Optional[EvaluationEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_evaluation_engine() -> EvaluationEngine:
+    """Process-wide engine, so the concurrency limit and in-flight table are shared"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = EvaluationEngine()
+        return _engine
@@ -6,10 +6,10 @@ and identify emerging trends before they materialize.
 import os
 import json
 import logging
-import numpy as np
 from datetime import datetime, timedelta
 import random
 from typing import List, Dict, Any, Optional, Tuple
+from .result_cache import ResultCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,15 +19,44 @@ logger = logging.getLogger(__name__)
 try:
     from langchain_community.chat_models import ChatOpenAI
     from langchain.chains import RetrievalQA
-    import pandas as pd
-    from sklearn.linear_model import LinearRegression
-    from sklearn.preprocessing import StandardScaler
+    from .forecasting import ForecastEngine
     ADVANCED_ANALYTICS_AVAILABLE = True
     logger.info("Advanced analytics libraries loaded successfully")
 except ImportError:
     logger.warning("Advanced analytics libraries not available. Using mock predictions.")
     ADVANCED_ANALYTICS_AVAILABLE = False
 
+# Metrics where a decreasing value is an improvement
+REDUCTION_POSITIVE_METRICS = ["Carbon Emissions", "Energy Consumption", "Water Usage"]
+
+# Bump when model logic changes so cached results from older versions are ignored
+FORECAST_MODEL_VERSION = "batched-ols-1"
+MATERIALITY_MODEL = "gpt-4-turbo"
+
+forecast_cache = ResultCache("forecasts")
+materiality_cache = ResultCache("materiality")
+
+def _canonical_metrics(metrics: Optional[List[Dict[str, Any]]]) -> Optional[List[str]]:
+    """Order-independent representation of metric records for cache keys"""
+    if metrics is None:
+        return None
+    return sorted(json.dumps(m, sort_keys=True, default=str) for m in metrics)
+
+def invalidate_cached_results(company_name: Optional[str] = None) -> None:
+    """
+    Expire cached analytics when new metric data lands
+
+    Forecasts are keyed by the metric records they were fitted on, so new
+    data never hits an old forecast; they are only expired wholesale.
+
+    Args:
+        company_name (str): Only expire this company's materiality assessments;
+            all cached results are expired when omitted
+    """
+    if company_name is None:
+        forecast_cache.invalidate()
+    materiality_cache.invalidate(company_name)
+
 def predict_sustainability_trends(
     metrics: List[Dict[str, Any]], 
     forecast_periods: int = 3,
@@ -60,15 +89,29 @@ def predict_sustainability_trends(
 def generate_ml_predictions(
     metrics: List[Dict[str, Any]], 
     forecast_periods: int,
-    prediction_interval: float
+    prediction_interval: float,
+    seasonal_period_days: Optional[float] = None,
+    workers: Optional[int] = None
 ) -> Dict[str, Any]:
     """Generate predictions using machine learning models"""
-    logger.info("Using ML models for predictive analytics")
+    cache_key = forecast_cache.key(
+        _canonical_metrics(metrics),
+        {
+            "forecast_periods": forecast_periods,
+            "prediction_interval": prediction_interval,
+            "seasonal_period_days": seasonal_period_days,
+            "model": FORECAST_MODEL_VERSION
+        }
+    )
+    cached = forecast_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Returning cached ML predictions")
+        if cached.get("ai_insights") is not None:
+            return cached
+        return _add_ai_insights(cache_key, cached, store=False)
     
-    # Convert metrics to pandas DataFrame for analysis
-    df = pd.DataFrame(metrics)
+    logger.info("Using ML models for predictive analytics")
     
-    # Group by metric name and category
     predictions = {
         "forecast_date": datetime.now().isoformat(),
         "forecast_periods": forecast_periods,
@@ -76,79 +119,67 @@ def generate_ml_predictions(
         "predictions": []
     }
     
-    # Get unique metric names
-    metric_names = df['name'].unique()
+    # Fit every metric series in one batched solve
+    engine = ForecastEngine(seasonal_period_days=seasonal_period_days, workers=workers)
+    forecast = engine.forecast(metrics, forecast_periods, prediction_interval)
+    if forecast is None:
+        predictions["ai_insights"] = generate_ai_insights(predictions["predictions"])
+        return predictions
     
-    for name in metric_names:
-        # Filter data for this metric
-        metric_data = df[df['name'] == name].sort_values('timestamp')
-        
-        if len(metric_data) < 3:  # Skip if not enough data points
-            continue
-            
-        # Extract values and convert to numerical format
-        values = pd.to_numeric(metric_data['value'])
-        timestamps = pd.to_datetime(metric_data['timestamp'])
-        
-        # Create time-based features (days since first measurement)
-        first_date = timestamps.min()
-        X = np.array([(t - first_date).days for t in timestamps]).reshape(-1, 1)
-        y = values.values
-        
-        # Train a linear regression model
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        model = LinearRegression()
-        model.fit(X_scaled, y)
-        
-        # Generate future dates for predictions
-        last_date = timestamps.max()
-        future_dates = [last_date + timedelta(days=30*i) for i in range(1, forecast_periods+1)]
-        future_X = np.array([(t - first_date).days for t in future_dates]).reshape(-1, 1)
-        future_X_scaled = scaler.transform(future_X)
-        
-        # Make predictions
-        predicted_values = model.predict(future_X_scaled)
-        
-        # Calculate confidence intervals (simplified approach)
-        residuals = y - model.predict(X_scaled)
-        residual_std = np.std(residuals)
-        z_score = 1.96  # For ~95% confidence interval
-        confidence_interval = z_score * residual_std
-        
+    panel = forecast.panel
+    for i, name in enumerate(panel.names):
         # Determine trend direction and strength
-        slope = model.coef_[0]
-        trend_strength = abs(slope) / np.mean(y) if np.mean(y) != 0 else abs(slope)
-        trend_direction = "improving" if (slope < 0 and name in ["Carbon Emissions", "Energy Consumption", "Water Usage"]) or \
-                          (slope > 0 and name not in ["Carbon Emissions", "Energy Consumption", "Water Usage"]) else "worsening"
+        slope = forecast.slopes[i]
+        mean_value = forecast.means[i]
+        trend_strength = abs(slope) / mean_value if mean_value != 0 else abs(slope)
+        trend_direction = "improving" if (slope < 0 and name in REDUCTION_POSITIVE_METRICS) or \
+                          (slope > 0 and name not in REDUCTION_POSITIVE_METRICS) else "worsening"
         
         # Prepare prediction object
         metric_prediction = {
             "name": name,
-            "category": metric_data['category'].iloc[0],
-            "unit": metric_data['unit'].iloc[0],
-            "current_value": float(values.iloc[-1]),
-            "predicted_values": [float(v) for v in predicted_values],
-            "prediction_dates": [d.isoformat() for d in future_dates],
-            "confidence_intervals": [float(confidence_interval) for _ in range(forecast_periods)],
+            "category": panel.categories[i],
+            "unit": panel.units[i],
+            "current_value": float(forecast.current_values[i]),
+            "predicted_values": forecast.predicted[i].tolist(),
+            "prediction_dates": [d.isoformat() for d in forecast.prediction_dates(i, forecast_periods)],
+            "confidence_intervals": forecast.intervals[i].tolist(),
             "trend_direction": trend_direction,
             "trend_strength": float(min(1.0, trend_strength * 10)),  # Scale to 0-1
-            "model_accuracy": float(model.score(X_scaled, y))
+            "model_accuracy": float(forecast.r2[i])
         }
         
         predictions["predictions"].append(metric_prediction)
     
     # Add AI-powered insights if OpenAI is available
-    predictions["ai_insights"] = generate_ai_insights(predictions["predictions"])
+    return _add_ai_insights(cache_key, predictions, store=True)
+
+def _add_ai_insights(cache_key: str, predictions: Dict[str, Any], store: bool) -> Dict[str, Any]:
+    """
+    Attach AI insights to a forecast and cache it
     
+    Only model-generated insights are cached. When they are unavailable the
+    forecast is cached without them (if ``store``) and the mock insights are
+    added to the returned copy only, so a later hit asks the model again.
+    """
+    insights = request_ai_insights(predictions["predictions"])
+    if store or insights is not None:
+        predictions["ai_insights"] = insights
+        forecast_cache.set(cache_key, predictions)
+    predictions["ai_insights"] = insights if insights is not None else generate_mock_ai_insights(predictions["predictions"])
     return predictions
 
 def generate_ai_insights(predictions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Generate AI-powered insights based on predicted trends"""
+    insights = request_ai_insights(predictions)
+    return insights if insights is not None else generate_mock_ai_insights(predictions)
+
+def request_ai_insights(predictions: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    """Ask OpenAI for insights on predicted trends; None when it is unavailable or fails"""
     openai_api_key = os.getenv('OPENAI_API_KEY')
     
     if not openai_api_key or not ADVANCED_ANALYTICS_AVAILABLE or not predictions:
-        return generate_mock_ai_insights(predictions)
+        return None
     
     try:
         # Extract key information for the prompt
@@ -194,11 +225,11 @@ def generate_ai_insights(predictions: List[Dict[str, Any]]) -> List[Dict[str, An
             return response.get("insights", [])
         except (json.JSONDecodeError, AttributeError):
             logger.warning("Failed to parse AI insights response")
-            return generate_mock_ai_insights(predictions)
+            return None
     
     except Exception as e:
         logger.error(f"Error generating AI insights: {str(e)}")
-        return generate_mock_ai_insights(predictions)
+        return None
 
 def generate_mock_ai_insights(predictions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Generate mock AI insights when OpenAI is not available"""
@@ -428,6 +459,12 @@ def perform_materiality_assessment(
     openai_api_key = os.getenv('OPENAI_API_KEY')
     
     if openai_api_key and ADVANCED_ANALYTICS_AVAILABLE:
+        cache_key = materiality_cache.key(company_name, industry, _canonical_metrics(metrics), MATERIALITY_MODEL)
+        cached = materiality_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Returning cached materiality assessment for {company_name}")
+            return cached
+        
         try:
             # Use LangChain and OpenAI for materiality assessment
             prompt = f"""
@@ -467,14 +504,14 @@ def perform_materiality_assessment(
             Return at least 5 material topics, sorted by materiality score (highest first).
             """
             
-            llm = ChatOpenAI(model="gpt-4-turbo", temperature=0.3)
+            llm = ChatOpenAI(model=MATERIALITY_MODEL, temperature=0.3)
             response = RetrievalQA.from_chain_type(llm, chain_type="stuff").run(prompt)
             
             # Parse the response
             try:
-                if isinstance(response, str):
-                    return json.loads(response)
-                return response
+                assessment = json.loads(response) if isinstance(response, str) else response
+                materiality_cache.set(cache_key, assessment, tag=company_name)
+                return assessment
             except json.JSONDecodeError:
                 logger.warning("Failed to parse materiality assessment response")
                 return generate_mock_materiality_assessment(company_name, industry)
@@ -0,0 +1,283 @@
+"""
+Result Cache Service
+
+Content-addressed cache for expensive analytics results (forecasts,
+materiality assessments). Entries are keyed by a hash of the input data plus
+model parameters, kept in a small in-process LRU and persisted as JSON files
+so they survive restarts and are shared by every worker on the host. The
+files of each namespace are bounded by a byte budget with least recently used
+eviction.
+"""
+
+import os
+import copy
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_DIR = os.getenv(
+    'RESULT_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'sustainatrend_result_cache')
+)
+RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', str(7 * 24 * 3600)))
+# How long a memory entry is served before its generation is checked on disk again
+RESULT_CACHE_MEMORY_TTL = float(os.getenv('RESULT_CACHE_MEMORY_TTL', '30'))
+# Disk budget of each namespace
+RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+
+
+def content_hash(*parts: Any) -> str:
+    """Stable SHA-256 over JSON-serializable parts (dict key order does not matter)"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier (memory + disk) cache for one namespace of results.
+
+    Invalidation is generation based: every entry records the generation of its
+    namespace and of its optional tag (e.g. a company name) at write time.
+    ``invalidate`` bumps a generation on disk, so all workers treat older
+    entries as misses and delete them lazily on their next lookup; invalidating
+    the whole namespace deletes its files right away. Stale entries that are
+    never looked up again age out through the byte budget (``max_bytes``),
+    which evicts the least recently used files first. Memory hits
+    skip the disk for ``memory_ttl`` seconds after the entry was last checked,
+    so another worker's invalidation takes effect here within that time (this
+    process's own invalidations apply immediately).
+
+    Values are copied in and out, so callers may modify what they get.
+    """
+
+    def __init__(self, namespace: str, cache_dir: str = RESULT_CACHE_DIR,
+                 ttl: int = RESULT_CACHE_TTL, memory_entries: int = 256,
+                 memory_ttl: float = RESULT_CACHE_MEMORY_TTL, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.namespace = namespace
+        self.directory = os.path.join(cache_dir, namespace)
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.memory_ttl = memory_ttl
+        self.max_bytes = max_bytes
+        # key -> {'entry': cache entry, 'checked': monotonic time of the last generation check}
+        self.memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'invalidations': 0,
+                      'evictions': 0}
+
+    def key(self, *parts: Any) -> str:
+        """Build a cache key from input data and model parameters"""
+        return content_hash(self.namespace, *parts)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a copy of the cached value for a key, or None on a miss or stale entry"""
+        with self.lock:
+            remembered = self.memory.get(key)
+            if remembered is not None:
+                self.memory.move_to_end(key)
+                entry = remembered['entry']
+                if time.monotonic() - remembered['checked'] <= self.memory_ttl and not self._expired(entry):
+                    self.stats['memory_hits'] += 1
+                    return copy.deepcopy(entry['value'])
+
+        # Not in memory, or due for a generation check
+        tier = 'memory_hits'
+        if remembered is None:
+            entry = self._read_entry(key)
+            tier = 'disk_hits'
+
+        if entry is None or not self._is_fresh(entry):
+            if entry is not None:
+                self.delete(key)
+            with self.lock:
+                self.stats['misses'] += 1
+            return None
+
+        # The modification time doubles as the last access time for eviction
+        self._touch(self._entry_path(key))
+        with self.lock:
+            self.stats[tier] += 1
+            self._remember(key, entry)
+        return copy.deepcopy(entry['value'])
+
+    def set(self, key: str, value: Any, tag: Optional[str] = None) -> None:
+        """Store a JSON-serializable value in both tiers"""
+        entry = {
+            'created': time.time(),
+            'tag': tag,
+            'generation': self._generation(None),
+            'tag_generation': self._generation(tag) if tag else 0,
+            'value': copy.deepcopy(value)
+        }
+        self._write_json(self._entry_path(key), entry)
+        with self.lock:
+            self.stats['writes'] += 1
+            self._remember(key, entry)
+        self._evict()
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry from both tiers"""
+        with self.lock:
+            self.memory.pop(key, None)
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def invalidate(self, tag: Optional[str] = None) -> None:
+        """Expire every entry with a tag, or the whole namespace when no tag is given"""
+        self._write_json(self._generation_path(tag), self._generation(tag) + 1)
+        with self.lock:
+            self.stats['invalidations'] += 1
+            if tag is None:
+                self.memory.clear()
+            else:
+                for key in [k for k, m in self.memory.items() if m['entry'].get('tag') == tag]:
+                    del self.memory[key]
+        if tag is None:
+            # Every entry is stale now; tagged entries are only known by reading them, so they age out instead
+            for entry in self._entry_files():
+                self._remove_file(entry.path)
+        logger.info(f"Invalidated {self.namespace} results" + (f" for {tag}" if tag else ""))
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters for this process"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self.memory)
+        files = self._entry_files()
+        stats['disk_entries'] = len(files)
+        stats['disk_bytes'] = sum(self._file_size(entry) for entry in files)
+        stats['max_bytes'] = self.max_bytes
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        stats['timestamp'] = datetime.now().isoformat()
+        return stats
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get('created', 0) > self.ttl
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        if self._expired(entry):
+            return False
+        if entry.get('generation') != self._generation(None):
+            return False
+        tag = entry.get('tag')
+        return not tag or entry.get('tag_generation') == self._generation(tag)
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        # Caller holds the lock
+        self.memory[key] = {'entry': entry, 'checked': time.monotonic()}
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _generation_path(self, tag: Optional[str]) -> str:
+        name = content_hash(tag) if tag else '_namespace'
+        return os.path.join(self.directory, 'generations', name)
+
+    def _generation(self, tag: Optional[str]) -> int:
+        value = self._read_json(self._generation_path(tag))
+        return value if isinstance(value, int) else 0
+
+    def _entry_files(self) -> List[os.DirEntry]:
+        try:
+            shards = [entry for entry in os.scandir(self.directory)
+                      if entry.is_dir() and entry.name != 'generations']
+        except OSError:
+            return []
+        files = []
+        for shard in shards:
+            try:
+                files.extend(entry for entry in os.scandir(shard.path)
+                             if entry.is_file() and entry.name.endswith('.json'))
+            except OSError:
+                continue
+        return files
+
+    def _evict(self) -> None:
+        """Delete expired files, then least recently used ones until the namespace fits its byte budget"""
+        now = time.time()
+        files = []
+        for entry in self._entry_files():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            # Reads only move the modification time forward, so an old one means an expired entry
+            if now - stat.st_mtime > self.ttl:
+                self._remove_file(entry.path)
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if self._remove_file(path):
+                total -= size
+                with self.lock:
+                    self.stats['evictions'] += 1
+
+    @staticmethod
+    def _file_size(entry: os.DirEntry) -> int:
+        try:
+            return entry.stat().st_size
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove_file(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        try:
+            now = time.time()
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+
+    def _read_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._read_json(self._entry_path(key))
+        return entry if isinstance(entry, dict) and 'value' in entry else None
+
+    @staticmethod
+    def _read_json(path: str) -> Any:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(path: str, data: Any) -> None:
+        """Write atomically so concurrent workers never read a partial file"""
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write result cache file {path}: {str(e)}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -8,8 +8,9 @@ import json
 import pandas as pd
 import logging
 from datetime import datetime
-from typing import Dict, List, Union, Optional
+from typing import Dict, Iterator, List, Union, Optional
 from abc import ABC, abstractmethod
+from .import_engine import ImportEngine, CATEGORY, DATETIME, FLOAT
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,15 +18,35 @@ logger = logging.getLogger(__name__)
 
 class DataImporter(ABC):
     """Abstract base class for data importers"""
+
+    REQUIRED_COLUMNS: List[str] = []
+    COLUMN_TYPES: Dict[str, str] = {}
+    COLUMN_ALIASES: Dict[str, str] = {}
     
     def __init__(self, source_path: str):
         self.source_path = source_path
+        self.file_extension = os.path.splitext(source_path)[1].lower()
         self.data = None
+        self.from_cache = False
         self.metadata = {
             'import_date': datetime.now().isoformat(),
             'source': source_path,
             'status': 'pending'
         }
+        self.engine = ImportEngine(
+            self.COLUMN_TYPES,
+            self.COLUMN_ALIASES,
+            namespace=type(self).__name__
+        )
+
+    def read_file(self) -> bool:
+        """Read the data file in typed chunks, or from the columnar cache"""
+        try:
+            self.data, self.from_cache = self.engine.load(self.source_path)
+            return True
+        except Exception as e:
+            self.log_import_status(False, f"Error reading file: {str(e)}")
+            return False
 
     @abstractmethod
     def validate_data(self) -> bool:
@@ -46,6 +67,14 @@ class DataImporter(ABC):
         })
         logger.info(f"Data import {self.metadata['status']}: {message}")
 
+    def iter_chunks(self, chunk_size: int = 5000) -> Iterator[pd.DataFrame]:
+        """Yield the validated rows (one per company and period) in chunks"""
+        if self.data is None:
+            return
+        columns = [col for col in self.REQUIRED_COLUMNS if col in self.data.columns]
+        for start in range(0, len(self.data), chunk_size):
+            yield self.data.iloc[start:start + chunk_size][columns]
+
 class ESGDataImporter(DataImporter):
     """Handles ESG data imports from CSV/Excel files"""
     
@@ -57,29 +86,15 @@ class ESGDataImporter(DataImporter):
         'social_score',
         'governance_score'
     ]
-
-    def __init__(self, source_path: str):
-        super().__init__(source_path)
-        self.file_extension = os.path.splitext(source_path)[1].lower()
-
-    def read_file(self) -> bool:
-        """Read the data file based on its extension"""
-        try:
-            if self.file_extension == '.csv':
-                self.data = pd.read_csv(self.source_path)
-            elif self.file_extension in ['.xlsx', '.xls']:
-                self.data = pd.read_excel(self.source_path)
-            else:
-                raise ValueError(f"Unsupported file format: {self.file_extension}")
-            
-            # Handle column name differences
-            if 'company' in self.data.columns and 'company_name' not in self.data.columns:
-                self.data = self.data.rename(columns={'company': 'company_name'})
-                
-            return True
-        except Exception as e:
-            self.log_import_status(False, f"Error reading file: {str(e)}")
-            return False
+    COLUMN_TYPES = {
+        'company_name': CATEGORY,
+        'date': DATETIME,
+        'esg_score': FLOAT,
+        'environmental_score': FLOAT,
+        'social_score': FLOAT,
+        'governance_score': FLOAT
+    }
+    COLUMN_ALIASES = {'company': 'company_name'}
 
     def validate_data(self) -> bool:
         """Validate ESG data structure and content"""
@@ -92,22 +107,29 @@ class ESGDataImporter(DataImporter):
             self.log_import_status(False, f"Missing required columns: {missing_columns}")
             return False
 
-        # Validate data types
+        # Validate data types (already typed by the import engine, so usually a no-op)
         try:
-            self.data['date'] = pd.to_datetime(self.data['date'])
-            numeric_columns = [col for col in self.data.columns if 'score' in col]
-            self.data[numeric_columns] = self.data[numeric_columns].apply(pd.to_numeric)
+            if not pd.api.types.is_datetime64_any_dtype(self.data['date']):
+                self.data['date'] = pd.to_datetime(self.data['date'])
+            numeric_columns = [
+                col for col in self.data.columns
+                if 'score' in col and not pd.api.types.is_numeric_dtype(self.data[col])
+            ]
+            if numeric_columns:
+                self.data[numeric_columns] = self.data[numeric_columns].apply(pd.to_numeric)
             return True
         except Exception as e:
             self.log_import_status(False, f"Data validation error: {str(e)}")
             return False
 
-    def process_data(self) -> Dict:
+    def process_data(self, include_trends: bool = True) -> Dict:
         """Process ESG data into standardized format"""
         if not self.validate_data():
             return {}
 
         try:
+            grouped = self.data.groupby('company_name', sort=False, observed=True)
+            means = grouped[['environmental_score', 'social_score', 'governance_score']].mean()
             processed_data = {
                 'metadata': self.metadata,
                 'companies': self.data['company_name'].unique().tolist(),
@@ -116,15 +138,12 @@ class ESGDataImporter(DataImporter):
                     'end': self.data['date'].max().isoformat()
                 },
                 'metrics': {
-                    'esg_scores': self.data.groupby('company_name')['esg_score'].agg(['mean', 'min', 'max']).to_dict('index'),
-                    'environmental_scores': self.data.groupby('company_name')['environmental_score'].mean().to_dict(),
-                    'social_scores': self.data.groupby('company_name')['social_score'].mean().to_dict(),
-                    'governance_scores': self.data.groupby('company_name')['governance_score'].mean().to_dict()
+                    'esg_scores': grouped['esg_score'].agg(['mean', 'min', 'max']).to_dict('index'),
+                    'environmental_scores': means['environmental_score'].to_dict(),
+                    'social_scores': means['social_score'].to_dict(),
+                    'governance_scores': means['governance_score'].to_dict()
                 },
-                'trends': {
-                    company: self.data[self.data['company_name'] == company][['date', 'esg_score']].values.tolist()
-                    for company in self.data['company_name'].unique()
-                }
+                'trends': self._group_trends(grouped) if include_trends else {}
             }
             self.log_import_status(True, "Data processed successfully")
             return processed_data
@@ -132,6 +151,14 @@ class ESGDataImporter(DataImporter):
             self.log_import_status(False, f"Error processing data: {str(e)}")
             return {}
 
+    def _group_trends(self, grouped) -> Dict[str, List]:
+        """Build per-company [date, esg_score] series from one groupby pass"""
+        rows = self.data[['date', 'esg_score']].to_numpy(dtype=object)
+        return {
+            company: rows[positions].tolist()
+            for company, positions in grouped.indices.items()
+        }
+
 class CarbonDataImporter(DataImporter):
     """Handles carbon emissions and environmental impact data imports"""
     
@@ -144,32 +171,19 @@ class CarbonDataImporter(DataImporter):
         'energy_consumption',
         'renewable_energy_percentage'
     ]
-
-    def __init__(self, source_path: str):
-        super().__init__(source_path)
-        self.file_extension = os.path.splitext(source_path)[1].lower()
-
-    def read_file(self) -> bool:
-        """Read the carbon data file"""
-        try:
-            if self.file_extension == '.csv':
-                self.data = pd.read_csv(self.source_path)
-            elif self.file_extension in ['.xlsx', '.xls']:
-                self.data = pd.read_excel(self.source_path)
-            else:
-                raise ValueError(f"Unsupported file format: {self.file_extension}")
-            
-            # Handle column name differences
-            if 'company' in self.data.columns and 'company_name' not in self.data.columns:
-                self.data = self.data.rename(columns={'company': 'company_name'})
-                
-            if 'renewable_energy_pct' in self.data.columns and 'renewable_energy_percentage' not in self.data.columns:
-                self.data = self.data.rename(columns={'renewable_energy_pct': 'renewable_energy_percentage'})
-                
-            return True
-        except Exception as e:
-            self.log_import_status(False, f"Error reading file: {str(e)}")
-            return False
+    COLUMN_TYPES = {
+        'company_name': CATEGORY,
+        'date': DATETIME,
+        'scope1_emissions': FLOAT,
+        'scope2_emissions': FLOAT,
+        'scope3_emissions': FLOAT,
+        'energy_consumption': FLOAT,
+        'renewable_energy_percentage': FLOAT
+    }
+    COLUMN_ALIASES = {
+        'company': 'company_name',
+        'renewable_energy_pct': 'renewable_energy_percentage'
+    }
 
     def validate_data(self) -> bool:
         """Validate carbon data structure and content"""
@@ -184,12 +198,16 @@ class CarbonDataImporter(DataImporter):
 
         # Validate data types and ranges
         try:
-            numeric_columns = ['scope1_emissions', 'scope2_emissions', 'scope3_emissions', 
-                             'energy_consumption', 'renewable_energy_percentage']
-            self.data[numeric_columns] = self.data[numeric_columns].apply(pd.to_numeric)
+            numeric_columns = [
+                col for col in ['scope1_emissions', 'scope2_emissions', 'scope3_emissions',
+                                'energy_consumption', 'renewable_energy_percentage']
+                if not pd.api.types.is_numeric_dtype(self.data[col])
+            ]
+            if numeric_columns:
+                self.data[numeric_columns] = self.data[numeric_columns].apply(pd.to_numeric)
             
             # Validate percentage range
-            if not all(self.data['renewable_energy_percentage'].between(0, 100)):
+            if not self.data['renewable_energy_percentage'].between(0, 100).all():
                 self.log_import_status(False, "Renewable energy percentage must be between 0 and 100")
                 return False
                 
@@ -204,26 +222,25 @@ class CarbonDataImporter(DataImporter):
             return {}
 
         try:
+            totals = self.data.groupby('company_name', sort=False, observed=True).agg({
+                'scope1_emissions': 'sum',
+                'scope2_emissions': 'sum',
+                'scope3_emissions': 'sum',
+                'energy_consumption': 'sum',
+                'renewable_energy_percentage': 'mean'
+            })
+            totals = pd.DataFrame({
+                'total_emissions': totals['scope1_emissions'] + totals['scope2_emissions'] + totals['scope3_emissions'],
+                'scope1': totals['scope1_emissions'],
+                'scope2': totals['scope2_emissions'],
+                'scope3': totals['scope3_emissions'],
+                'energy_consumption': totals['energy_consumption'],
+                'renewable_percentage': totals['renewable_energy_percentage']
+            })
             processed_data = {
                 'metadata': self.metadata,
                 'companies': self.data['company_name'].unique().tolist(),
-                'emissions': {
-                    company: {
-                        'total_emissions': row['scope1_emissions'] + row['scope2_emissions'] + row['scope3_emissions'],
-                        'scope1': row['scope1_emissions'],
-                        'scope2': row['scope2_emissions'],
-                        'scope3': row['scope3_emissions'],
-                        'energy_consumption': row['energy_consumption'],
-                        'renewable_percentage': row['renewable_energy_percentage']
-                    }
-                    for company, row in self.data.groupby('company_name').agg({
-                        'scope1_emissions': 'sum',
-                        'scope2_emissions': 'sum',
-                        'scope3_emissions': 'sum',
-                        'energy_consumption': 'sum',
-                        'renewable_energy_percentage': 'mean'
-                    }).iterrows()
-                },
+                'emissions': totals.to_dict('index'),
                 'benchmarks': {
                     'average_emissions': {
                         'scope1': self.data['scope1_emissions'].mean(),
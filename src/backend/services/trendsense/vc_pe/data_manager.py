@@ -5,10 +5,12 @@ Handles data import processes and MongoDB integration
 
 import os
 import logging
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Union
 from datetime import datetime
 from pymongo import MongoClient
-from .data_import import ESGDataImporter, CarbonDataImporter
+from .data_import import DataImporter, ESGDataImporter, CarbonDataImporter
+from .import_store import ImportStore
+from .portfolio_summary import PortfolioSummary
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,6 +24,9 @@ class DataManager:
         self.db_name = db_name
         self.client = None
         self.db = None
+        self.esg_store = None
+        self.carbon_store = None
+        self.portfolio_summary = None
         self.connect_db()
 
     def connect_db(self) -> bool:
@@ -29,6 +34,12 @@ class DataManager:
         try:
             self.client = MongoClient(self.mongodb_uri)
             self.db = self.client[self.db_name]
+            self.esg_store = ImportStore(self.db, 'esg')
+            self.carbon_store = ImportStore(self.db, 'carbon')
+            self.portfolio_summary = PortfolioSummary(self.db, self.esg_store, self.carbon_store)
+            self.esg_store.ensure_indexes()
+            self.carbon_store.ensure_indexes()
+            self.portfolio_summary.ensure_indexes()
             logger.info(f"Successfully connected to MongoDB database: {self.db_name}")
             return True
         except Exception as e:
@@ -47,24 +58,30 @@ class DataManager:
                 return {'success': False, 'message': 'Failed to read ESG data file'}
 
             logger.info("Processing ESG data")
-            processed_data = importer.process_data()
+            # Per-company trends are persisted as period records, not in the summary
+            processed_data = importer.process_data(include_trends=False)
             if not processed_data:
                 logger.error("Failed to process ESG data")
                 return {'success': False, 'message': 'Failed to process ESG data'}
 
             # Store in MongoDB
             logger.info("Storing ESG data in MongoDB")
-            result = self.db.esg_data.insert_one({
-                'import_date': datetime.now(),
-                'source_file': file_path,
-                'data': processed_data
-            })
-            logger.info(f"ESG data stored with ID: {result.inserted_id}")
+            import_id = self._store_import(
+                self.esg_store,
+                importer,
+                self._esg_company_docs(processed_data),
+                {
+                    'companies_count': len(processed_data['companies']),
+                    'time_range': processed_data['time_range']
+                }
+            )
+            logger.info(f"ESG data stored with ID: {import_id}")
+            self._refresh_portfolio_summary()
 
             return {
                 'success': True,
                 'message': 'ESG data imported successfully',
-                'import_id': str(result.inserted_id),
+                'import_id': str(import_id),
                 'metrics': processed_data['metrics']
             }
 
@@ -91,17 +108,22 @@ class DataManager:
 
             # Store in MongoDB
             logger.info("Storing carbon data in MongoDB")
-            result = self.db.carbon_data.insert_one({
-                'import_date': datetime.now(),
-                'source_file': file_path,
-                'data': processed_data
-            })
-            logger.info(f"Carbon data stored with ID: {result.inserted_id}")
+            import_id = self._store_import(
+                self.carbon_store,
+                importer,
+                self._carbon_company_docs(processed_data),
+                {
+                    'companies_count': len(processed_data['companies']),
+                    'benchmarks': processed_data['benchmarks']
+                }
+            )
+            logger.info(f"Carbon data stored with ID: {import_id}")
+            self._refresh_portfolio_summary()
 
             return {
                 'success': True,
                 'message': 'Carbon data imported successfully',
-                'import_id': str(result.inserted_id),
+                'import_id': str(import_id),
                 'emissions': processed_data['emissions'],
                 'benchmarks': processed_data['benchmarks']
             }
@@ -110,18 +132,115 @@ class DataManager:
             logger.error(f"Error importing carbon data: {str(e)}")
             return {'success': False, 'message': f"Error importing carbon data: {str(e)}"}
 
-    def get_latest_esg_data(self, company_name: Optional[str] = None) -> Dict:
-        """Retrieve latest ESG data from MongoDB"""
+    def _store_import(self, store: ImportStore, importer: DataImporter,
+                      company_docs: Iterator[Dict], summary: Dict):
+        """Write an import as header, per-company and per-period documents"""
+        import_date = datetime.now()
+        import_id = store.begin_import(importer.source_path, importer.metadata, import_date)
         try:
-            query = {}
-            if company_name:
-                query['data.companies'] = company_name
+            summary['records_count'] = store.write_frames(
+                import_id, importer.iter_chunks(store.chunk_size)
+            )
+            store.write_companies(import_id, import_date, company_docs)
+            store.complete_import(import_id, summary)
+        except Exception:
+            store.abort_import(import_id)
+            raise
+        return import_id
+
+    @staticmethod
+    def _esg_company_docs(processed_data: Dict) -> Iterator[Dict]:
+        """Split processed ESG metrics into one document per company"""
+        metrics = processed_data['metrics']
+        for company in processed_data['companies']:
+            yield {
+                'company': company,
+                'metrics': {name: values.get(company) for name, values in metrics.items()}
+            }
+
+    @staticmethod
+    def _carbon_company_docs(processed_data: Dict) -> Iterator[Dict]:
+        """Split processed carbon emissions into one document per company"""
+        for company in processed_data['companies']:
+            yield {
+                'company': company,
+                'emissions': processed_data['emissions'].get(company, {})
+            }
 
-            latest_data = self.db.esg_data.find_one(
-                query,
-                sort=[('import_date', -1)]
+    def _company_docs(self, store: ImportStore, header: Dict, company_name: Optional[str],
+                      projection: Dict) -> Iterator[Dict]:
+        """Stream company documents of an import, or point-read a single one"""
+        if company_name is None:
+            return store.iter_companies(header['_id'], projection=projection)
+        company_doc = store.get_company(header['_id'], company_name, projection=projection)
+        return iter([company_doc] if company_doc else [])
+
+    def _build_esg_data(self, header: Dict, company_name: Optional[str] = None,
+                        include_trends: bool = True) -> Dict:
+        """Assemble the processed ESG data shape from the normalized collections"""
+        summary = header.get('summary', {})
+        data = {
+            'metadata': header.get('metadata', {}),
+            'companies': [],
+            'time_range': summary.get('time_range', {}),
+            'metrics': {},
+            'trends': {}
+        }
+        for company_doc in self._company_docs(self.esg_store, header, company_name,
+                                              {'_id': False, 'company': True, 'metrics': True}):
+            company = company_doc['company']
+            data['companies'].append(company)
+            for name, value in company_doc.get('metrics', {}).items():
+                data['metrics'].setdefault(name, {})[company] = value
+
+        if include_trends:
+            records = self.esg_store.iter_records(
+                header['_id'],
+                company_name,
+                projection={'_id': False, 'company': True, 'date': True, 'esg_score': True}
             )
+            for record in records:
+                data['trends'].setdefault(record['company'], []).append(
+                    [record.get('date'), record.get('esg_score')]
+                )
+        return data
+
+    def _build_carbon_data(self, header: Dict, company_name: Optional[str] = None) -> Dict:
+        """Assemble the processed carbon data shape from the normalized collections"""
+        summary = header.get('summary', {})
+        data = {
+            'metadata': header.get('metadata', {}),
+            'companies': [],
+            'emissions': {},
+            'benchmarks': summary.get('benchmarks', {})
+        }
+        for company_doc in self._company_docs(self.carbon_store, header, company_name,
+                                              {'_id': False, 'company': True, 'emissions': True}):
+            data['companies'].append(company_doc['company'])
+            data['emissions'][company_doc['company']] = company_doc.get('emissions', {})
+        return data
+
+    def _get_legacy_import(self, collection, company_name: Optional[str] = None) -> Optional[Dict]:
+        """Read an import stored as a single document by earlier versions"""
+        query = {}
+        if company_name:
+            query['data.companies'] = company_name
+        return collection.find_one(query, sort=[('import_date', -1)])
+
+    def get_latest_esg_data(self, company_name: Optional[str] = None,
+                            include_trends: bool = True) -> Dict:
+        """Retrieve latest ESG data from MongoDB"""
+        try:
+            header = self.esg_store.latest_import(company_name)
+            if header:
+                return {
+                    'success': True,
+                    'data': self._build_esg_data(header, include_trends=include_trends),
+                    'import_date': header['import_date'],
+                    'import_id': str(header['_id'])
+                }
 
+            latest_data = self._get_legacy_import(self.db.esg_data, company_name)
             if not latest_data:
                 return {'success': False, 'message': 'No ESG data found'}
 
@@ -138,15 +257,16 @@ class DataManager:
     def get_latest_carbon_data(self, company_name: Optional[str] = None) -> Dict:
         """Retrieve latest carbon emissions data from MongoDB"""
         try:
-            query = {}
-            if company_name:
-                query['data.companies'] = company_name
-
-            latest_data = self.db.carbon_data.find_one(
-                query,
-                sort=[('import_date', -1)]
-            )
+            header = self.carbon_store.latest_import(company_name)
+            if header:
+                return {
+                    'success': True,
+                    'data': self._build_carbon_data(header),
+                    'import_date': header['import_date'],
+                    'import_id': str(header['_id'])
+                }
 
+            latest_data = self._get_legacy_import(self.db.carbon_data, company_name)
             if not latest_data:
                 return {'success': False, 'message': 'No carbon data found'}
 
@@ -160,11 +280,36 @@ class DataManager:
             logger.error(f"Error retrieving carbon data: {str(e)}")
             return {'success': False, 'message': f"Error retrieving carbon data: {str(e)}"}
 
+    def _get_company_data(self, company_name: str) -> Dict:
+        """Fetch only one company's ESG and carbon documents from the latest imports"""
+        esg_header = self.esg_store.latest_import(company_name)
+        carbon_header = self.carbon_store.latest_import(company_name)
+        if not esg_header and not carbon_header:
+            return {
+                'esg': self.get_latest_esg_data(company_name),
+                'carbon': self.get_latest_carbon_data(company_name)
+            }
+
+        esg_data = {'success': False}
+        if esg_header:
+            esg_data = {
+                'success': True,
+                'data': self._build_esg_data(esg_header, company_name, include_trends=False)
+            }
+        carbon_data = {'success': False}
+        if carbon_header:
+            carbon_data = {
+                'success': True,
+                'data': self._build_carbon_data(carbon_header, company_name)
+            }
+        return {'esg': esg_data, 'carbon': carbon_data}
+
     def get_company_sustainability_profile(self, company_name: str) -> Dict:
         """Get comprehensive sustainability profile for a company"""
         try:
-            esg_data = self.get_latest_esg_data(company_name)
-            carbon_data = self.get_latest_carbon_data(company_name)
+            company_data = self._get_company_data(company_name)
+            esg_data = company_data['esg']
+            carbon_data = company_data['carbon']
 
             if not esg_data['success'] and not carbon_data['success']:
                 return {'success': False, 'message': 'No data found for company'}
@@ -190,7 +335,93 @@ class DataManager:
     def get_portfolio_overview(self) -> Dict:
         """Get overview of entire portfolio sustainability metrics"""
         try:
-            esg_data = self.get_latest_esg_data()
+            overview = self.portfolio_summary.get_overview()
+            if overview:
+                return overview
+
+            # First read after an upgrade: materialize from the normalized imports
+            overview = self.portfolio_summary.rebuild()
+            if overview:
+                return overview
+
+            # Only imports stored as single documents by earlier versions exist
+            return self._compute_portfolio_overview()
+
+        except Exception as e:
+            logger.error(f"Error generating portfolio overview: {str(e)}")
+            return {'success': False, 'message': f"Error generating portfolio overview: {str(e)}"}
+
+    def rebuild_portfolio_summary(self) -> Dict:
+        """Recompute and publish the materialized portfolio overview"""
+        try:
+            overview = self.portfolio_summary.rebuild()
+            if not overview:
+                return {'success': False, 'message': 'No portfolio data found'}
+            return overview
+        except Exception as e:
+            logger.error(f"Error rebuilding portfolio summary: {str(e)}")
+            return {'success': False, 'message': f"Error rebuilding portfolio summary: {str(e)}"}
+
+    def _refresh_portfolio_summary(self) -> None:
+        """Rebuild the summary after an import; the import itself already succeeded"""
+        try:
+            self.portfolio_summary.rebuild()
+        except Exception as e:
+            logger.error(f"Error refreshing portfolio summary: {str(e)}")
+
+    def update_company_metrics(self, company_name: str, esg_scores: Optional[Dict] = None,
+                               emissions: Optional[Dict] = None) -> Dict:
+        """Update one company's metrics in the latest imports and the portfolio summary"""
+        try:
+            previous, current = {}, {}
+            new_company = False
+
+            if esg_scores is not None:
+                header = self.esg_store.latest_import()
+                if not header:
+                    return {'success': False, 'message': 'No ESG data found'}
+                before = self.esg_store.update_company(
+                    header, company_name, {'metrics.esg_scores': esg_scores}
+                )
+                previous['esg_scores'] = (before or {}).get('metrics', {}).get('esg_scores')
+                current['esg_scores'] = esg_scores
+                new_company = before is None
+
+            if emissions is not None:
+                header = self.carbon_store.latest_import()
+                if not header:
+                    return {'success': False, 'message': 'No carbon data found'}
+                emissions = dict(emissions)
+                emissions.setdefault(
+                    'total_emissions',
+                    sum(emissions.get(scope, 0) for scope in ('scope1', 'scope2', 'scope3'))
+                )
+                before = self.carbon_store.update_company(
+                    header, company_name, {'emissions': emissions}
+                )
+                previous['total_emissions'] = (before or {}).get('emissions', {}).get('total_emissions')
+                current['total_emissions'] = emissions['total_emissions']
+
+            overview = None
+            if current:
+                overview = self.portfolio_summary.apply_company_update(
+                    company_name, previous, current, new_company=new_company
+                )
+
+            return {
+                'success': True,
+                'company_name': company_name,
+                'overview': overview
+            }
+
+        except Exception as e:
+            logger.error(f"Error updating company metrics: {str(e)}")
+            return {'success': False, 'message': f"Error updating company metrics: {str(e)}"}
+
+    def _compute_portfolio_overview(self) -> Dict:
+        """Compute the portfolio overview directly from the latest import data"""
+        try:
+            esg_data = self.get_latest_esg_data(include_trends=False)
             carbon_data = self.get_latest_carbon_data()
 
             if not esg_data['success'] and not carbon_data['success']:
@@ -0,0 +1,203 @@
+"""
+Import Engine for TrendSense Platform
+Chunked, typed file parsing with a columnar cache keyed by file content hash
+"""
+
+import os
+import hashlib
+import logging
+import tempfile
+import importlib.util
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Parquet cache support (pandas loads the engine itself when reading and writing)
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+if not PARQUET_AVAILABLE:
+    logging.warning("PyArrow not available. Import cache will be disabled.")
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+IMPORT_CACHE_DIR = os.getenv(
+    'TRENDSENSE_IMPORT_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'trendsense_import_cache')
+)
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Bump when the cached frame layout changes so stale entries are ignored
+CACHE_FORMAT_VERSION = 2
+
+# Column kinds understood by the engine
+CATEGORY = 'category'
+FLOAT = 'float'
+DATETIME = 'datetime'
+
+
+def file_hash(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, read in fixed-size blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ImportEngine:
+    """
+    Parses CSV/Excel imports into a compact, typed DataFrame.
+
+    CSV files are read in chunks with explicit dtypes and only the columns the
+    importer needs; each chunk is coerced and stored with categorical company
+    names, so memory is bounded by the typed column size rather than by Python
+    objects. The typed frame is cached as Parquet under the file's content
+    hash, so re-importing the same file skips parsing entirely.
+    """
+
+    SUPPORTED_EXTENSIONS = ['.csv', '.xlsx', '.xls']
+
+    def __init__(self, column_types: Dict[str, str], column_aliases: Optional[Dict[str, str]] = None,
+                 namespace: str = 'import', chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 cache_dir: Optional[str] = IMPORT_CACHE_DIR):
+        self.column_types = column_types
+        self.column_aliases = column_aliases or {}
+        self.namespace = namespace
+        self.chunk_rows = chunk_rows
+        self.cache_dir = cache_dir if PARQUET_AVAILABLE else None
+
+    def load(self, path: str) -> Tuple[pd.DataFrame, bool]:
+        """Return the typed frame for a file and whether it came from the cache"""
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in self.SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Unsupported file format: {extension}")
+
+        digest = file_hash(path) if self.cache_dir else None
+        if digest:
+            cached = self._read_cache(digest)
+            if cached is not None:
+                logger.info(f"Import cache hit for {path}")
+                return cached, True
+
+        if extension == '.csv':
+            frame = self._read_csv(path)
+        else:
+            frame = self._read_excel(path)
+
+        if digest:
+            self._write_cache(digest, frame)
+        return frame, False
+
+    def _wanted_columns(self) -> set:
+        return set(self.column_types) | set(self.column_aliases)
+
+    def _read_dtypes(self) -> Dict[str, str]:
+        """Explicit dtypes for the raw reader; dates are parsed after reading"""
+        dtypes = {}
+        for column, kind in self.column_types.items():
+            raw = 'float64' if kind == FLOAT else 'string'
+            dtypes[column] = raw
+            for alias, target in self.column_aliases.items():
+                if target == column:
+                    dtypes[alias] = raw
+        return dtypes
+
+    def _read_csv(self, path: str) -> pd.DataFrame:
+        wanted = self._wanted_columns()
+        reader = pd.read_csv(
+            path,
+            usecols=lambda column: column in wanted,
+            dtype=self._read_dtypes(),
+            chunksize=self.chunk_rows
+        )
+        return self._concat([self._coerce(chunk) for chunk in reader])
+
+    def _read_excel(self, path: str) -> pd.DataFrame:
+        wanted = self._wanted_columns()
+        frame = pd.read_excel(path, usecols=lambda column: column in wanted)
+        return self._coerce(frame)
+
+    def _coerce(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Apply column aliases and convert every known column to its kind"""
+        renames = {
+            alias: target for alias, target in self.column_aliases.items()
+            if alias in chunk.columns and target not in chunk.columns
+        }
+        if renames:
+            chunk = chunk.rename(columns=renames)
+
+        for column, kind in self.column_types.items():
+            if column not in chunk.columns:
+                continue
+            if kind == FLOAT:
+                chunk[column] = pd.to_numeric(chunk[column]).astype('float64')
+            elif kind == DATETIME:
+                chunk[column] = pd.to_datetime(chunk[column])
+            elif kind == CATEGORY:
+                chunk[column] = chunk[column].astype('category')
+        return chunk
+
+    @staticmethod
+    def _concat(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+        """Concatenate chunks, unifying per-chunk categories without an object detour"""
+        if not chunks:
+            return pd.DataFrame()
+        if len(chunks) == 1:
+            return chunks[0].reset_index(drop=True)
+
+        columns = list(chunks[0].columns)
+        categorical = [
+            column for column in columns
+            if isinstance(chunks[0][column].dtype, pd.CategoricalDtype)
+        ]
+        unified = {
+            column: union_categoricals([chunk[column] for chunk in chunks])
+            for column in categorical
+        }
+        frame = pd.concat(
+            [chunk.drop(columns=categorical) for chunk in chunks],
+            ignore_index=True
+        )
+        for column, values in unified.items():
+            frame[column] = values
+        return frame[columns]
+
+    def _cache_path(self, digest: str) -> str:
+        return os.path.join(
+            self.cache_dir,
+            f"{self.namespace}-{digest}-v{CACHE_FORMAT_VERSION}.parquet"
+        )
+
+    def _read_cache(self, digest: str) -> Optional[pd.DataFrame]:
+        path = self._cache_path(digest)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable import cache entry {path}: {str(e)}")
+            return None
+
+    def _write_cache(self, digest: str, frame: pd.DataFrame) -> None:
+        """Write the cache entry atomically so concurrent readers never see a partial file"""
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            os.close(fd)
+            frame.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, self._cache_path(digest))
+        except Exception as e:
+            logger.warning(f"Could not write import cache entry: {str(e)}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def invalidate(self, path: str) -> None:
+        """Drop the cached frame for a file"""
+        if not self.cache_dir:
+            return
+        cache_path = self._cache_path(file_hash(path))
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
@@ -0,0 +1,231 @@
+"""
+Import Storage for TrendSense Platform
+Normalized, chunked MongoDB layout for VC/PE data imports
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+STATUS_IN_PROGRESS = 'in_progress'
+STATUS_COMPLETE = 'complete'
+STATUS_FAILED = 'failed'
+
+
+def _to_native(value: Any) -> Any:
+    """Convert pandas/numpy values into BSON-encodable Python values"""
+    if isinstance(value, dict):
+        return {key: _to_native(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_native(item) for item in value]
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if value is pd.NaT:
+        return None
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+class ImportStore:
+    """
+    Stores one kind of import (e.g. 'esg', 'carbon') across three collections:
+
+    - ``<kind>_imports``: one header document per import with status and summary
+    - ``<kind>_companies``: one document per company per import with its aggregates
+    - ``<kind>_records``: one document per company and period (a source row)
+
+    Writes are chunked ``insert_many`` calls and reads stream cursors in batches,
+    so neither side ever holds a whole portfolio in a single document.
+    """
+
+    def __init__(self, db, kind: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.db = db
+        self.kind = kind
+        self.chunk_size = chunk_size
+        self.imports = db[f'{kind}_imports']
+        self.companies = db[f'{kind}_companies']
+        self.records = db[f'{kind}_records']
+
+    def ensure_indexes(self) -> None:
+        """Create the indexes the read paths rely on (idempotent)"""
+        self.imports.create_index([('status', ASCENDING), ('import_date', DESCENDING)])
+        self.companies.create_index([('import_id', ASCENDING), ('company', ASCENDING)])
+        self.companies.create_index([('company', ASCENDING), ('import_date', DESCENDING)])
+        self.records.create_index([
+            ('import_id', ASCENDING),
+            ('company', ASCENDING),
+            ('date', ASCENDING)
+        ])
+
+    def begin_import(self, source_file: str, metadata: Optional[Dict] = None,
+                     import_date: Optional[datetime] = None) -> ObjectId:
+        """Register a new import and return its id"""
+        result = self.imports.insert_one({
+            'import_date': import_date or datetime.now(),
+            'source_file': source_file,
+            'status': STATUS_IN_PROGRESS,
+            'metadata': _to_native(metadata or {})
+        })
+        return result.inserted_id
+
+    def write_frames(self, import_id: ObjectId, frames: Iterable[pd.DataFrame]) -> int:
+        """Bulk-insert row records from an iterable of DataFrame chunks"""
+        written = 0
+        for frame in frames:
+            written += self.write_records(import_id, self._frame_to_records(frame))
+        return written
+
+    def write_records(self, import_id: ObjectId, records: Iterable[Dict]) -> int:
+        """Bulk-insert row records in chunks of ``chunk_size``"""
+        written = 0
+        batch: List[Dict] = []
+        for record in records:
+            record = _to_native(record)
+            record['import_id'] = import_id
+            batch.append(record)
+            if len(batch) >= self.chunk_size:
+                self.records.insert_many(batch, ordered=False)
+                written += len(batch)
+                batch = []
+        if batch:
+            self.records.insert_many(batch, ordered=False)
+            written += len(batch)
+        return written
+
+    def write_companies(self, import_id: ObjectId, import_date: datetime,
+                        companies: Iterable[Dict]) -> int:
+        """Bulk-insert per-company aggregate documents in chunks"""
+        written = 0
+        batch: List[Dict] = []
+        for company_doc in companies:
+            company_doc = _to_native(company_doc)
+            company_doc.update({'import_id': import_id, 'import_date': import_date})
+            batch.append(company_doc)
+            if len(batch) >= self.chunk_size:
+                self.companies.insert_many(batch, ordered=False)
+                written += len(batch)
+                batch = []
+        if batch:
+            self.companies.insert_many(batch, ordered=False)
+            written += len(batch)
+        return written
+
+    def complete_import(self, import_id: ObjectId, summary: Dict) -> None:
+        """Mark an import as complete; readers only ever see complete imports"""
+        self.imports.update_one(
+            {'_id': import_id},
+            {'$set': {
+                'status': STATUS_COMPLETE,
+                'summary': _to_native(summary),
+                'completion_time': datetime.now()
+            }}
+        )
+
+    def abort_import(self, import_id: ObjectId) -> None:
+        """Mark an import as failed and remove any partially written rows"""
+        self.records.delete_many({'import_id': import_id})
+        self.companies.delete_many({'import_id': import_id})
+        self.imports.update_one({'_id': import_id}, {'$set': {'status': STATUS_FAILED}})
+
+    def get_import(self, import_id: ObjectId) -> Optional[Dict]:
+        """Fetch a single import header"""
+        return self.imports.find_one({'_id': import_id})
+
+    def latest_import(self, company_name: Optional[str] = None) -> Optional[Dict]:
+        """Fetch the newest complete import header, optionally one covering a company"""
+        if company_name is None:
+            return self.imports.find_one(
+                {'status': STATUS_COMPLETE},
+                sort=[('import_date', DESCENDING)]
+            )
+
+        cursor = self.companies.find(
+            {'company': company_name},
+            projection={'import_id': True},
+            sort=[('import_date', DESCENDING)],
+            batch_size=16
+        )
+        for company_doc in cursor:
+            header = self.imports.find_one({
+                '_id': company_doc['import_id'],
+                'status': STATUS_COMPLETE
+            })
+            if header:
+                return header
+        return None
+
+    def get_company(self, import_id: ObjectId, company_name: str,
+                    projection: Optional[Dict] = None) -> Optional[Dict]:
+        """Point-read one company's aggregates for an import"""
+        return self.companies.find_one(
+            {'import_id': import_id, 'company': company_name},
+            projection=projection
+        )
+
+    def update_company(self, header: Dict, company_name: str, fields: Dict) -> Optional[Dict]:
+        """Set fields on one company's document of an import; returns the previous document"""
+        return self.companies.find_one_and_update(
+            {'import_id': header['_id'], 'company': company_name},
+            {
+                '$set': _to_native(fields),
+                '$setOnInsert': {'import_date': header['import_date']}
+            },
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+
+    def iter_companies(self, import_id: ObjectId,
+                       projection: Optional[Dict] = None) -> Iterator[Dict]:
+        """Stream per-company aggregate documents for an import"""
+        return self.companies.find(
+            {'import_id': import_id},
+            projection=projection,
+            sort=[('company', ASCENDING)],
+            batch_size=self.chunk_size
+        )
+
+    def iter_records(self, import_id: ObjectId, company_name: Optional[str] = None,
+                     projection: Optional[Dict] = None) -> Iterator[Dict]:
+        """Stream row records for an import in (company, date) order"""
+        query: Dict[str, Any] = {'import_id': import_id}
+        if company_name is not None:
+            query['company'] = company_name
+        return self.records.find(
+            query,
+            projection=projection,
+            sort=[('company', ASCENDING), ('date', ASCENDING)],
+            batch_size=self.chunk_size
+        )
+
+    def iter_record_chunks(self, import_id: ObjectId, company_name: Optional[str] = None,
+                           projection: Optional[Dict] = None) -> Iterator[List[Dict]]:
+        """Stream row records as lists of at most ``chunk_size`` documents"""
+        chunk: List[Dict] = []
+        for record in self.iter_records(import_id, company_name, projection):
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _frame_to_records(frame: pd.DataFrame) -> Iterator[Dict]:
+        """Turn an importer DataFrame chunk into record documents"""
+        frame = frame.rename(columns={'company_name': 'company'})
+        if 'date' in frame.columns:
+            frame = frame.assign(date=pd.to_datetime(frame['date'], errors='coerce'))
+        return iter(frame.to_dict('records'))
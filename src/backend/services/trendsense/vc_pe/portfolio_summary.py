@@ -0,0 +1,303 @@
+"""
+Portfolio Summary for TrendSense Platform
+Materialized, versioned portfolio overview maintained at import time
+"""
+
+import copy
+import math
+import heapq
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
+
+from .import_store import ImportStore
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOP_PERFORMERS_COUNT = 5
+LOW_ESG_THRESHOLD = 50
+MAX_PUBLISH_ATTEMPTS = 5
+
+
+class PortfolioSummary:
+    """
+    Keeps the portfolio overview in the ``portfolio_summaries`` collection.
+
+    Every change publishes a complete new version with a single ``insert_one``
+    under a unique ``version`` key, so readers always get a whole summary with
+    one indexed read and concurrent writers retry instead of overwriting each
+    other. Besides the rendered overview each version stores the running
+    aggregates it was rendered from, which lets a single company's change be
+    applied as a delta instead of a full recomputation.
+    """
+
+    def __init__(self, db, esg_store: ImportStore, carbon_store: ImportStore,
+                 keep_versions: int = 5):
+        self.collection = db.portfolio_summaries
+        self.esg_store = esg_store
+        self.carbon_store = carbon_store
+        self.keep_versions = keep_versions
+
+    def ensure_indexes(self) -> None:
+        """Create the version index and the index used to refill top performers"""
+        self.collection.create_index([('version', DESCENDING)], unique=True)
+        self.esg_store.companies.create_index([
+            ('import_id', ASCENDING),
+            ('metrics.esg_scores.mean', DESCENDING)
+        ])
+
+    def latest(self) -> Optional[Dict]:
+        """Fetch the newest published summary version"""
+        return self.collection.find_one({}, sort=[('version', DESCENDING)])
+
+    def get_overview(self) -> Optional[Dict]:
+        """Fetch only the rendered overview of the newest version"""
+        summary = self.collection.find_one(
+            {},
+            projection={'_id': False, 'overview': True},
+            sort=[('version', DESCENDING)]
+        )
+        return summary['overview'] if summary else None
+
+    def rebuild(self) -> Optional[Dict]:
+        """Recompute the summary from the latest imports and publish it"""
+        for _ in range(MAX_PUBLISH_ATTEMPTS):
+            latest = self.latest()
+            aggregates = self._compute_aggregates()
+            if aggregates is None:
+                return None
+            try:
+                return self._publish(aggregates, latest['version'] if latest else 0)
+            except DuplicateKeyError:
+                logger.info("Portfolio summary version taken by a concurrent writer, retrying")
+        raise RuntimeError("Could not publish portfolio summary after concurrent updates")
+
+    def apply_company_update(self, company_name: str, previous: Dict, current: Dict,
+                             new_company: bool = False) -> Optional[Dict]:
+        """
+        Apply one company's change as a delta on top of the newest version.
+
+        ``previous`` and ``current`` may hold ``esg_scores`` (the company's
+        mean/min/max dict) and ``total_emissions``; only the keys present in
+        ``current`` are applied. ``new_company`` marks a company that was not
+        in the latest ESG import before this update.
+        """
+        for _ in range(MAX_PUBLISH_ATTEMPTS):
+            latest = self.latest()
+            if latest is None or not self._is_current(latest['aggregates']):
+                return self.rebuild()
+
+            aggregates = copy.deepcopy(latest['aggregates'])
+            if 'esg_scores' in current:
+                refill = self._apply_esg(
+                    aggregates, company_name,
+                    previous.get('esg_scores'), current['esg_scores'], new_company
+                )
+                if refill:
+                    aggregates['top_performers'] = self._top_performers_from_db(
+                        aggregates['esg_import_id']
+                    )
+            if 'total_emissions' in current:
+                self._apply_emissions(
+                    aggregates, previous.get('total_emissions'), current['total_emissions']
+                )
+
+            try:
+                return self._publish(aggregates, latest['version'])
+            except DuplicateKeyError:
+                logger.info("Portfolio summary version taken by a concurrent writer, retrying")
+        raise RuntimeError("Could not publish portfolio summary after concurrent updates")
+
+    def _is_current(self, aggregates: Dict) -> bool:
+        """Whether a summary was built from the latest ESG and carbon imports"""
+        esg_header = self.esg_store.latest_import()
+        carbon_header = self.carbon_store.latest_import()
+        return (
+            'scored_count' in aggregates
+            and aggregates.get('esg_import_id') == (esg_header['_id'] if esg_header else None)
+            and aggregates.get('carbon_import_id') == (carbon_header['_id'] if carbon_header else None)
+        )
+
+    def _compute_aggregates(self) -> Optional[Dict]:
+        """Stream the latest imports' company documents into fresh aggregates"""
+        esg_header = self.esg_store.latest_import()
+        carbon_header = self.carbon_store.latest_import()
+        if not esg_header and not carbon_header:
+            return None
+
+        benchmarks = (carbon_header or {}).get('summary', {}).get('benchmarks', {})
+        aggregates = {
+            'esg_import_id': esg_header['_id'] if esg_header else None,
+            'carbon_import_id': carbon_header['_id'] if carbon_header else None,
+            'companies_count': 0,
+            'scored_count': 0,
+            'unscored_count': 0,
+            'esg_score_sum': 0.0,
+            'low_esg_count': 0,
+            'top_performers': [],
+            'total_emissions': 0.0,
+            'high_emitter_count': 0,
+            'emissions_threshold': benchmarks.get('average_emissions', {}).get('total', 0) * 1.5
+        }
+
+        if esg_header:
+            top: List = []
+            companies = self.esg_store.iter_companies(
+                esg_header['_id'],
+                projection={'_id': False, 'company': True, 'metrics.esg_scores': True}
+            )
+            for company_doc in companies:
+                scores = company_doc.get('metrics', {}).get('esg_scores')
+                self._apply_esg_totals(aggregates, None, scores, existed=False)
+                mean = self._mean(scores)
+                if mean is None:
+                    continue
+                heapq.heappush(top, (mean, company_doc['company'], scores))
+                if len(top) > TOP_PERFORMERS_COUNT:
+                    heapq.heappop(top)
+            aggregates['top_performers'] = [
+                self._performer(company, scores)
+                for _, company, scores in sorted(top, reverse=True)
+            ]
+
+        if carbon_header:
+            companies = self.carbon_store.iter_companies(
+                carbon_header['_id'],
+                projection={'_id': False, 'emissions.total_emissions': True}
+            )
+            for company_doc in companies:
+                total = company_doc.get('emissions', {}).get('total_emissions')
+                self._apply_emissions(aggregates, None, total)
+
+        return aggregates
+
+    @staticmethod
+    def _performer(company_name: str, scores: Dict) -> Dict:
+        return {
+            'company_name': company_name,
+            'esg_score': scores['mean'],
+            'trend': 'positive' if scores['mean'] > scores['min'] else 'neutral'
+        }
+
+    @staticmethod
+    def _mean(scores: Optional[Dict]) -> Optional[float]:
+        """A company's mean ESG score, or None when it has none (missing, None or NaN)"""
+        mean = (scores or {}).get('mean')
+        if mean is None or not math.isfinite(mean):
+            return None
+        return mean
+
+    @classmethod
+    def _apply_esg_totals(cls, aggregates: Dict, old: Optional[Dict], new: Optional[Dict],
+                          existed: bool = True) -> None:
+        """
+        Replace a company's contribution to the totals. Companies without a
+        mean score are counted in ``unscored_count`` and kept out of the average.
+        """
+        if not existed:
+            aggregates['companies_count'] += 1
+        for scores, sign in ((old, -1), (new, 1)):
+            if sign < 0 and not existed:
+                continue
+            mean = cls._mean(scores)
+            if mean is None:
+                aggregates['unscored_count'] += sign
+                continue
+            aggregates['scored_count'] += sign
+            aggregates['esg_score_sum'] += sign * mean
+            if mean < LOW_ESG_THRESHOLD:
+                aggregates['low_esg_count'] += sign
+
+    def _apply_esg(self, aggregates: Dict, company_name: str,
+                   old: Optional[Dict], new: Optional[Dict], new_company: bool = False) -> bool:
+        """Apply an ESG score delta; returns True when top performers must be refilled"""
+        self._apply_esg_totals(aggregates, old, new, existed=not new_company)
+        old_mean, new_mean = self._mean(old), self._mean(new)
+
+        top = aggregates['top_performers']
+        remaining = [p for p in top if p['company_name'] != company_name]
+        was_top = len(remaining) < len(top)
+        if was_top and (new_mean is None or old_mean is None or new_mean < old_mean):
+            # A lower-ranked company may now belong in the list
+            return True
+
+        if new_mean is not None:
+            remaining.append(self._performer(company_name, new))
+            remaining.sort(key=lambda p: p['esg_score'], reverse=True)
+        aggregates['top_performers'] = remaining[:TOP_PERFORMERS_COUNT]
+        return False
+
+    @staticmethod
+    def _apply_emissions(aggregates: Dict, old: Optional[float], new: Optional[float]) -> None:
+        threshold = aggregates['emissions_threshold']
+        for total, sign in ((old, -1), (new, 1)):
+            if total is None:
+                continue
+            aggregates['total_emissions'] += sign * total
+            if total > threshold:
+                aggregates['high_emitter_count'] += sign
+
+    def _top_performers_from_db(self, esg_import_id) -> List[Dict]:
+        companies = self.esg_store.companies.find(
+            # Excludes missing, None and NaN means, which sort below every number
+            {'import_id': esg_import_id, 'metrics.esg_scores.mean': {'$gte': float('-inf')}},
+            projection={'_id': False, 'company': True, 'metrics.esg_scores': True},
+            sort=[('metrics.esg_scores.mean', DESCENDING)],
+            limit=TOP_PERFORMERS_COUNT
+        )
+        return [
+            self._performer(company_doc['company'], company_doc['metrics']['esg_scores'])
+            for company_doc in companies
+        ]
+
+    @staticmethod
+    def _render(aggregates: Dict, version: int, built_at: datetime) -> Dict:
+        """Render the overview returned by DataManager.get_portfolio_overview"""
+        scored_count = aggregates['scored_count']
+        risks = []
+        if aggregates['low_esg_count'] > 0:
+            risks.append({
+                'type': 'esg_score',
+                'severity': 'high' if aggregates['low_esg_count'] > 3 else 'medium',
+                'description': f"{aggregates['low_esg_count']} companies have ESG scores below {LOW_ESG_THRESHOLD}"
+            })
+        if aggregates['high_emitter_count'] > 0:
+            risks.append({
+                'type': 'emissions',
+                'severity': 'high' if aggregates['high_emitter_count'] > 2 else 'medium',
+                'description': f"{aggregates['high_emitter_count']} companies exceed emissions benchmarks by 50%+"
+            })
+
+        return {
+            'success': True,
+            'last_updated': built_at.isoformat(),
+            'summary_version': version,
+            'companies_count': aggregates['companies_count'],
+            'unscored_companies_count': aggregates['unscored_count'],
+            'average_metrics': {
+                'esg_score': aggregates['esg_score_sum'] / scored_count if scored_count else 0,
+                'total_emissions': aggregates['total_emissions']
+            },
+            'top_performers': aggregates['top_performers'],
+            'risk_factors': risks
+        }
+
+    def _publish(self, aggregates: Dict, base_version: int) -> Dict:
+        """Insert the next version in one write and prune old versions"""
+        version = base_version + 1
+        built_at = datetime.now()
+        overview = self._render(aggregates, version, built_at)
+        self.collection.insert_one({
+            'version': version,
+            'built_at': built_at,
+            'aggregates': aggregates,
+            'overview': overview
+        })
+        self.collection.delete_many({'version': {'$lte': version - self.keep_versions}})
+        logger.info(f"Published portfolio summary version {version}")
+        return overview
@@ -0,0 +1,104 @@
+"""
+Regression tests for the rule-based compliance checks.
+
+data/compliance_baseline.jsonl holds randomized inputs with digests of what
+the original per-term implementation of the ethical AI module returned for
+them; the rule engine must reproduce those outputs exactly, with and without
+the Aho-Corasick matcher.
+"""
+
+import hashlib
+import json
+import os
+
+import pytest
+
+from backend.services import compliance_rules, ethical_ai
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'compliance_baseline.jsonl')
+
+ANALYSIS_CHECKS = [
+    'check_csrd_compliance',
+    'check_sec_compliance',
+    'check_ifrs_compliance',
+    'check_gri_compliance',
+    'check_gdpr_compliance',
+    'check_ai_transparency',
+]
+REPORT_CHECKS = [
+    'analyze_csrd_compliance',
+    'analyze_gdpr_compliance',
+    'analyze_ai_transparency_compliance',
+]
+
+
+def load_cases():
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def without_evidence(analysis):
+    """Rule-based analysis without the evidence the rule engine adds per regulation"""
+    analysis = dict(analysis)
+    analysis['detailed_analysis'] = {
+        regulation: {key: value for key, value in details.items() if key != 'evidence'}
+        for regulation, details in analysis['detailed_analysis'].items()
+    }
+    return analysis
+
+
+def outputs(case):
+    analysis, report_text = case['analysis'], case['report_text']
+    results = {name: getattr(ethical_ai, name)(analysis) for name in ANALYSIS_CHECKS}
+    results.update({name: list(getattr(ethical_ai, name)(report_text)) for name in REPORT_CHECKS})
+
+    report = ethical_ai.check_regulatory_compliance(analysis, case['regulations'])
+    report.pop('checked_at')
+    report.pop('analysis_id')
+    results['check_regulatory_compliance'] = report
+    results['perform_rule_based_compliance_analysis'] = without_evidence(
+        ethical_ai.perform_rule_based_compliance_analysis(report_text, case['report_regulations'])
+    )
+    return results
+
+
+@pytest.fixture(params=['automaton', 'substring search'])
+def matcher(request, monkeypatch):
+    use_automaton = request.param == 'automaton'
+    if use_automaton and not compliance_rules.AHOCORASICK_AVAILABLE:
+        pytest.skip("pyahocorasick is not installed")
+    matcher = compliance_rules.RuleMatcher(compliance_rules.RULES, use_automaton=use_automaton)
+    monkeypatch.setattr(compliance_rules, 'MATCHER', matcher)
+    return matcher
+
+
+def test_outputs_match_baseline(matcher):
+    for number, case in enumerate(load_cases()):
+        actual = {name: digest(value) for name, value in outputs(case).items()}
+        assert actual == case['expected'], f"case {number} differs from the baseline"
+
+
+def test_csrd_recommendations_keep_check_order(matcher):
+    result = ethical_ai.check_csrd_compliance({'summary': 'nothing relevant'})
+
+    assert [r['requirement'] for r in result['requirements']][0] == "Double Materiality Assessment"
+    assert result['recommendations'] == [
+        "Include analysis of environmental topics: climate change, pollution, water, biodiversity, resource use",
+        "Address social topics: workforce conditions, affected communities, consumer impacts",
+        "Include governance topics: business conduct, internal controls, risk management",
+        "Include a double materiality assessment that covers both financial impact and impact on people and environment",
+        "Include forward-looking information: targets, commitments, future scenarios",
+    ]
+
+
+def test_overlapping_terms_are_all_found(matcher):
+    hits = compliance_rules.scan_text("Explainable AI and risk management approach")
+
+    assert hits.find("ai") == [4, 12]
+    assert hits.find("explainable ai") == [0]
+    assert hits.find("management approach") == [24]
+    assert hits.find("risk management") == [19]
@@ -0,0 +1,67 @@
+"""
+Response classes for the FastAPI backend
+
+``FastJSONResponse`` renders with orjson, which serializes datetimes, UUIDs
+and NumPy arrays natively and is several times faster than the standard
+library encoder. ObjectIds, Decimals and NumPy scalars are handled by a small
+fallback hook. Without orjson installed it degrades to ``json.dumps``.
+"""
+
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from bson import ObjectId
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logging.warning("orjson not available. Falling back to the standard JSON encoder.")
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types neither encoder understands on its own"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (datetime, date)):
+        # datetime subclasses such as pandas.Timestamp
+        return obj.isoformat()
+    if NUMPY_AVAILABLE:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content to JSON bytes with the fastest available encoder"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(content, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; use for plain dicts straight from the database"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
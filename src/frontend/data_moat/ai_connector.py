@@ -7,6 +7,7 @@ interacting with OpenAI and Pinecone for document processing and RAG capabilitie
 
 import os
 import logging
+import threading
 from typing import Dict, List, Any, Optional, Union
 
 # Configure logging
@@ -52,6 +53,14 @@ except ImportError:
     PARENT_AI_CONNECTOR_AVAILABLE = False
     logger.warning("Parent AI connector package is not available")
 
+# Shared, persistently cached embedding service
+try:
+    from ..services.embedding_service import EmbeddingService
+    EMBEDDING_SERVICE_AVAILABLE = True
+except ImportError:
+    EMBEDDING_SERVICE_AVAILABLE = False
+    logger.warning("Embedding service is not available, embeddings will not be cached")
+
 class DataMoatAIConnector:
     """AI connector for data moat functionality"""
     
@@ -71,6 +80,10 @@ class DataMoatAIConnector:
             if gemini_api_key:
                 genai.configure(api_key=gemini_api_key)
         
+        # Batched, cached embedding services by model
+        self.embedding_services = {}
+        self.embedding_services_lock = threading.Lock()
+        
         # Initialize Pinecone if available
         self.pc = None
         self.index = None
@@ -201,23 +214,67 @@ class DataMoatAIConnector:
             Text embeddings or None if unavailable
         """
         if PARENT_AI_CONNECTOR_AVAILABLE:
-            return parent_generate_embeddings(text, model)
+            return parent_generate_embeddings([text])[0]
         
         if not self.is_openai_available():
             logger.warning("OpenAI is not available for generating embeddings")
             return None
         
+        if EMBEDDING_SERVICE_AVAILABLE:
+            return self._embedding_service(model).embed(text)
+        
         try:
-            response = openai.Embedding.create(
-                input=text,
-                model=model
-            )
-            
-            return response['data'][0]['embedding']
+            return self._request_embeddings([text], model)[0]
         except Exception as e:
             logger.error(f"Error generating embeddings: {str(e)}")
             return None
     
+    def generate_embeddings_batch(self, texts: List[str], model: str = "text-embedding-ada-002") -> Optional[List[List[float]]]:
+        """
+        Generate embeddings for several texts in a single OpenAI request
+        
+        Args:
+            texts: Texts to generate embeddings for
+            model: OpenAI embedding model to use
+            
+        Returns:
+            One embedding per text, in order, or None if unavailable
+        """
+        if PARENT_AI_CONNECTOR_AVAILABLE:
+            return parent_generate_embeddings(texts)
+        
+        if not self.is_openai_available():
+            logger.warning("OpenAI is not available for generating embeddings")
+            return None
+        
+        if EMBEDDING_SERVICE_AVAILABLE:
+            embeddings = self._embedding_service(model).embed_many(texts)
+            return embeddings if all(embedding is not None for embedding in embeddings) else None
+        
+        try:
+            return self._request_embeddings(texts, model)
+        except Exception as e:
+            logger.error(f"Error generating embeddings for {len(texts)} texts: {str(e)}")
+            return None
+    
+    def _request_embeddings(self, texts: List[str], model: str) -> List[List[float]]:
+        """Embed texts with one OpenAI request"""
+        response = openai.Embedding.create(
+            input=texts,
+            model=model
+        )
+        
+        return [item['embedding'] for item in sorted(response['data'], key=lambda item: item['index'])]
+    
+    def _embedding_service(self, model: str) -> 'EmbeddingService':
+        """Embedding service for an OpenAI model, created on first use"""
+        with self.embedding_services_lock:
+            if model not in self.embedding_services:
+                self.embedding_services[model] = EmbeddingService(
+                    'openai', model, lambda texts: self._request_embeddings(texts, model), source='data_moat'
+                )
+            return self.embedding_services[model]
+    
     def store_embeddings_in_pinecone(self, id: str, embeddings: List[float], metadata: Dict[str, Any]) -> bool:
         """
         Store embeddings in Pinecone
@@ -7,26 +7,273 @@ interacting with PostgreSQL to store and retrieve enhanced document data.
 
 import os
 import json
+import time
+import uuid
 import logging
-from typing import Dict, List, Any, Optional, Union
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterator, Optional, Tuple, Union
 from datetime import datetime
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from psycopg2.pool import PoolError
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+DB_POOL_MIN_CONNECTIONS = int(os.getenv('DB_POOL_MIN_CONNECTIONS', '1'))
+DB_POOL_MAX_CONNECTIONS = int(os.getenv('DB_POOL_MAX_CONNECTIONS', '10'))
+# Seconds a caller waits for a free connection before PoolError
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))
+DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', '5'))
+# Connections idle for longer than this are checked with SELECT 1 before reuse
+DB_HEALTH_CHECK_INTERVAL = 30
+# Rows fetched per round trip by server-side cursors
+DB_STREAM_BATCH_SIZE = 500
+
+# Display name of a document, matched by fuzzy name lookups (trigram indexed when pg_trgm is available)
+DOCUMENT_NAME_EXPRESSION = "lower(coalesce(metadata->>'company_name', metadata->>'filename', ''))"
+# Full-text search vector: the name outweighs the content when ranking
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('english', {DOCUMENT_NAME_EXPRESSION}), 'A') || "
+    "setweight(to_tsvector('english', content), 'B')"
+)
+SEARCH_HEADLINE_OPTIONS = 'MaxFragments=2, MinWords=15, MaxWords=35, FragmentDelimiter=" ... "'
+# Minimum pg_trgm word similarity of a fuzzy name match
+NAME_MATCH_THRESHOLD = 0.4
+
+# Analysis writes; the upserts rely on the unique keys added by _migrate_analysis_keys
+ENRICHMENT_UPDATE_SQL = """
+    UPDATE document_store_enhanced
+    SET 
+        document_structure = %s,
+        metadata = coalesce(metadata, '{}') || jsonb_build_object(
+            'regulatory_mapping', %s::jsonb,
+            'confidence_scores', %s::jsonb
+        ),
+        processing_status = %s,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = %s
+"""
+METRICS_UPSERT_SQL = """
+    INSERT INTO metrics_mapping (document_id, metrics)
+    VALUES (%s, %s)
+    ON CONFLICT (document_id) DO UPDATE
+    SET metrics = EXCLUDED.metrics, updated_at = CURRENT_TIMESTAMP
+"""
+COMPLIANCE_UPSERT_SQL = """
+    INSERT INTO regulatory_compliance (
+        document_id, framework_id, overall_score, category_scores,
+        findings, recommendations, evidence_links
+    )
+    VALUES %s
+    ON CONFLICT (document_id, framework_id) DO UPDATE
+    SET 
+        overall_score = EXCLUDED.overall_score,
+        category_scores = EXCLUDED.category_scores,
+        findings = EXCLUDED.findings,
+        recommendations = EXCLUDED.recommendations,
+        evidence_links = EXCLUDED.evidence_links,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool
+    
+    Connections are checked out with the ``connection()`` context manager and
+    returned to the pool afterwards; an open transaction is rolled back on
+    return. Up to ``maxconn`` connections are opened on demand and every
+    returned connection is kept idle for reuse (psycopg2's own pools close
+    returned connections beyond ``minconn``, which turns bursts into
+    connect/disconnect churn). Callers wait up to ``timeout`` seconds for a
+    free connection.
+    Connections that sat idle are health-checked on borrow and transparently
+    replaced when the server dropped them, and connections that broke during
+    use are discarded instead of being returned. Every connection carries a
+    statement timeout. Wait time and utilization are tracked for sizing.
+    """
+    
+    def __init__(self, dsn: Optional[str], minconn: int = DB_POOL_MIN_CONNECTIONS,
+                 maxconn: int = DB_POOL_MAX_CONNECTIONS, timeout: float = DB_POOL_TIMEOUT,
+                 statement_timeout_ms: int = DB_STATEMENT_TIMEOUT_MS):
+        """
+        Open the pool and its initial connections
+        
+        Args:
+            dsn: PostgreSQL connection string
+            minconn: Connections opened up front
+            maxconn: Maximum connections
+            timeout: Seconds to wait for a free connection
+            statement_timeout_ms: Server-side statement timeout of every connection
+        """
+        self.dsn = dsn
+        self.connect_options = {
+            'connect_timeout': DB_CONNECT_TIMEOUT,
+            'options': f"-c statement_timeout={statement_timeout_ms}"
+        }
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(maxconn)
+        self.lock = threading.Lock()
+        # Idle connections, most recently returned last
+        self.idle: List[Any] = []
+        self.last_used: Dict[int, float] = {}
+        self.closed = False
+        self.stats = {'checkouts': 0, 'timeouts': 0, 'reconnects': 0, 'health_check_failures': 0,
+                      'opened': 0, 'discarded': 0, 'in_use': 0, 'peak_in_use': 0,
+                      'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0}
+        for _ in range(minconn):
+            connection = self._connect()
+            with self.lock:
+                self.last_used[id(connection)] = time.monotonic()
+                self.idle.append(connection)
+    
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Check out a healthy connection for the duration of a with block
+        
+        Raises:
+            PoolError: If no connection became free within the pool timeout
+        """
+        started = time.perf_counter()
+        if not self.slots.acquire(timeout=self.timeout):
+            self._count('timeouts')
+            raise PoolError(f"No database connection available within {self.timeout}s")
+        try:
+            connection = self._borrow()
+            self._checked_out(time.perf_counter() - started)
+            try:
+                yield connection
+            finally:
+                self._release(connection)
+        finally:
+            self.slots.release()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool size, utilization and checkout wait times"""
+        with self.lock:
+            stats = dict(self.stats)
+            idle = len(self.idle)
+        stats['min_connections'] = self.minconn
+        stats['max_connections'] = self.maxconn
+        stats['idle'] = idle
+        stats['utilization'] = stats['in_use'] / self.maxconn
+        stats['peak_utilization'] = stats['peak_in_use'] / self.maxconn
+        stats['wait_ms_avg'] = (stats['wait_seconds_total'] / stats['checkouts'] * 1000) if stats['checkouts'] else 0.0
+        stats['wait_ms_max'] = stats.pop('wait_seconds_max') * 1000
+        stats.pop('wait_seconds_total')
+        stats['timestamp'] = datetime.now().isoformat()
+        return stats
+    
+    def close(self) -> None:
+        """Close the idle connections; connections still in use are closed when returned"""
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.last_used.clear()
+        for connection in idle:
+            self._close(connection)
+    
+    def _connect(self):
+        connection = psycopg2.connect(self.dsn, **self.connect_options)
+        self._count('opened')
+        return connection
+    
+    def _borrow(self):
+        # Each failed check discards one connection, so maxconn + 1 tries reach a fresh one
+        for _ in range(self.maxconn + 1):
+            with self.lock:
+                if self.closed:
+                    raise PoolError("Connection pool is closed")
+                connection = self.idle.pop() if self.idle else None
+            # Fewer than maxconn connections are open whenever none is idle
+            if connection is None:
+                return self._connect()
+            if not connection.closed and not self._idle_too_long(connection):
+                return connection
+            try:
+                if connection.closed:
+                    raise psycopg2.InterfaceError("connection already closed")
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                connection.rollback()
+                return connection
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                logger.warning(f"Discarding broken database connection: {str(e)}")
+                self._count('health_check_failures')
+                self._discard(connection)
+                self._count('reconnects')
+        raise PoolError("Could not obtain a healthy database connection")
+    
+    def _idle_too_long(self, connection) -> bool:
+        with self.lock:
+            last_used = self.last_used.get(id(connection))
+        return last_used is None or time.monotonic() - last_used > DB_HEALTH_CHECK_INTERVAL
+    
+    def _checked_out(self, wait: float) -> None:
+        with self.lock:
+            self.stats['checkouts'] += 1
+            self.stats['in_use'] += 1
+            self.stats['peak_in_use'] = max(self.stats['peak_in_use'], self.stats['in_use'])
+            self.stats['wait_seconds_total'] += wait
+            self.stats['wait_seconds_max'] = max(self.stats['wait_seconds_max'], wait)
+    
+    def _release(self, connection) -> None:
+        with self.lock:
+            self.stats['in_use'] -= 1
+        # psycopg2 marks connections that broke during use as closed
+        if connection.closed or connection.info.transaction_status == TRANSACTION_STATUS_UNKNOWN:
+            self._discard(connection)
+            return
+        try:
+            # Roll back an open transaction before the connection is reused
+            if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except Exception as e:
+            logger.warning(f"Could not return database connection to the pool: {str(e)}")
+            self._discard(connection)
+            return
+        with self.lock:
+            if not self.closed:
+                self.last_used[id(connection)] = time.monotonic()
+                self.idle.append(connection)
+                return
+        self._close(connection)
+    
+    def _discard(self, connection) -> None:
+        with self.lock:
+            self.last_used.pop(id(connection), None)
+            self.stats['discarded'] += 1
+        self._close(connection)
+    
+    @staticmethod
+    def _close(connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+    
+    def _count(self, name: str) -> None:
+        with self.lock:
+            self.stats[name] += 1
+
 class DatabaseConnector:
     """Database connector for data moat functionality"""
     
     def __init__(self):
         """Initialize the database connector"""
-        self.connection = None
+        self.pool = None
         self.connected = False
+        self.trigram_available = False
         
         # Try to connect to the database
         try:
-            self.connection = psycopg2.connect(os.environ.get('DATABASE_URL'))
+            self.pool = ConnectionPool(os.environ.get('DATABASE_URL'))
             self.connected = True
             logger.info("Successfully connected to PostgreSQL database")
             
@@ -35,13 +282,24 @@ class DatabaseConnector:
         except Exception as e:
             logger.error(f"Failed to connect to PostgreSQL database: {str(e)}")
     
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Connection pool metrics, for sizing the pool under load
+        
+        Returns:
+            Pool utilization and wait times, or only the connection state without a pool
+        """
+        if not self.pool:
+            return {'connected': False}
+        return dict(self.pool.get_stats(), connected=self.connected)
+    
     def _create_tables(self):
         """Create the necessary tables if they don't exist"""
-        if not self.connection:
+        if not self.pool:
             return
         
         try:
-            with self.connection.cursor() as cursor:
+            with self.pool.connection() as connection, connection.cursor() as cursor:
                 # Create document_store_enhanced table
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS document_store_enhanced (
@@ -83,10 +341,85 @@ class DatabaseConnector:
                     )
                 """)
                 
-                self.connection.commit()
+                connection.commit()
                 logger.info("Database tables created successfully")
         except Exception as e:
             logger.error(f"Error creating database tables: {str(e)}")
+            return
+        
+        self._migrate_search()
+        self._migrate_analysis_keys()
+    
+    def _migrate_search(self):
+        """
+        Add full-text and fuzzy name search to document_store_enhanced
+        
+        Every step is idempotent, so this runs on each start. The trigram
+        index needs the pg_trgm extension; without it (or without the
+        privilege to create it) fuzzy name lookups fall back to ILIKE.
+        """
+        try:
+            with self.pool.connection() as connection, connection.cursor() as cursor:
+                # Generated column, maintained by PostgreSQL on every insert and update
+                cursor.execute(f"""
+                    ALTER TABLE document_store_enhanced
+                    ADD COLUMN IF NOT EXISTS search_vector tsvector
+                    GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_document_store_enhanced_search_vector
+                    ON document_store_enhanced USING GIN (search_vector)
+                """)
+                connection.commit()
+                logger.info("Document full-text search index is ready")
+                
+                try:
+                    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                    cursor.execute(f"""
+                        CREATE INDEX IF NOT EXISTS idx_document_store_enhanced_name_trgm
+                        ON document_store_enhanced USING GIN (({DOCUMENT_NAME_EXPRESSION}) gin_trgm_ops)
+                    """)
+                    connection.commit()
+                    self.trigram_available = True
+                except psycopg2.Error as e:
+                    connection.rollback()
+                    logger.warning(f"pg_trgm is not available, fuzzy name lookups use ILIKE: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error migrating document search: {str(e)}")
+    
+    def _migrate_analysis_keys(self):
+        """
+        Make metrics mappings unique per document and compliance assessments
+        unique per document and framework, so analysis results can be upserted
+        
+        Duplicates left by earlier versions are removed first, keeping the
+        newest row. Idempotent, so this runs on each start.
+        """
+        try:
+            with self.pool.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("""
+                    DELETE FROM metrics_mapping older
+                    USING metrics_mapping newer
+                    WHERE older.document_id = newer.document_id AND older.id < newer.id
+                """)
+                cursor.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS uq_metrics_mapping_document
+                    ON metrics_mapping (document_id)
+                """)
+                cursor.execute("""
+                    DELETE FROM regulatory_compliance older
+                    USING regulatory_compliance newer
+                    WHERE older.document_id = newer.document_id
+                      AND older.framework_id = newer.framework_id
+                      AND older.id < newer.id
+                """)
+                cursor.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS uq_regulatory_compliance_document_framework
+                    ON regulatory_compliance (document_id, framework_id)
+                """)
+                connection.commit()
+        except Exception as e:
+            logger.error(f"Error migrating analysis keys: {str(e)}")
     
     def store_document(self, content: str, document_type: str, metadata: Optional[Dict[str, Any]] = None) -> Optional[int]:
         """
@@ -100,11 +433,11 @@ class DatabaseConnector:
         Returns:
             Document ID if successful, None otherwise
         """
-        if not self.connection:
+        if not self.pool:
             return None
         
         try:
-            with self.connection.cursor() as cursor:
+            with self.pool.connection() as connection, connection.cursor() as cursor:
                 # Insert document
                 cursor.execute(
                     """
@@ -116,7 +449,7 @@ class DatabaseConnector:
                 )
                 
                 document_id = cursor.fetchone()[0]
-                self.connection.commit()
+                connection.commit()
                 
                 logger.info(f"Document stored successfully with ID: {document_id}")
                 return document_id
@@ -144,31 +477,14 @@ class DatabaseConnector:
         Returns:
             True if successful, False otherwise
         """
-        if not self.connection:
+        if not self.pool:
             return False
         
         try:
-            with self.connection.cursor() as cursor:
+            with self.pool.connection() as connection, connection.cursor() as cursor:
                 # Update document with enrichment data
                 cursor.execute(
-                    """
-                    UPDATE document_store_enhanced
-                    SET 
-                        document_structure = %s,
-                        metadata = jsonb_set(
-                            coalesce(metadata, '{}'), 
-                            '{regulatory_mapping}', 
-                            %s
-                        ),
-                        metadata = jsonb_set(
-                            coalesce(metadata, '{}'), 
-                            '{confidence_scores}', 
-                            %s
-                        ),
-                        processing_status = %s,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = %s
-                    """,
+                    ENRICHMENT_UPDATE_SQL,
                     (
                         json.dumps(document_structure or {}),
                         json.dumps(regulatory_mapping or {}),
@@ -178,7 +494,7 @@ class DatabaseConnector:
                     )
                 )
                 
-                self.connection.commit()
+                connection.commit()
                 logger.info(f"Document enrichment updated successfully for ID: {document_id}")
                 return True
         except Exception as e:
@@ -196,45 +512,14 @@ class DatabaseConnector:
         Returns:
             True if successful, False otherwise
         """
-        if not self.connection:
+        if not self.pool:
             return False
         
         try:
-            with self.connection.cursor() as cursor:
-                # Check if metrics mapping already exists for this document
-                cursor.execute(
-                    """
-                    SELECT id FROM metrics_mapping
-                    WHERE document_id = %s
-                    """,
-                    (document_id,)
-                )
-                
-                result = cursor.fetchone()
-                
-                if result:
-                    # Update existing mapping
-                    cursor.execute(
-                        """
-                        UPDATE metrics_mapping
-                        SET 
-                            metrics = %s,
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE document_id = %s
-                        """,
-                        (json.dumps(metrics), document_id)
-                    )
-                else:
-                    # Insert new mapping
-                    cursor.execute(
-                        """
-                        INSERT INTO metrics_mapping (document_id, metrics)
-                        VALUES (%s, %s)
-                        """,
-                        (document_id, json.dumps(metrics))
-                    )
+            with self.pool.connection() as connection, connection.cursor() as cursor:
+                cursor.execute(METRICS_UPSERT_SQL, (document_id, json.dumps(metrics)))
                 
-                self.connection.commit()
+                connection.commit()
                 logger.info(f"Metrics mapping stored successfully for document ID: {document_id}")
                 return True
         except Exception as e:
@@ -262,72 +547,103 @@ class DatabaseConnector:
         Returns:
             True if successful, False otherwise
         """
-        if not self.connection:
+        if not self.pool:
+            return False
+        
+        try:
+            with self.pool.connection() as connection, connection.cursor() as cursor:
+                execute_values(cursor, COMPLIANCE_UPSERT_SQL, [(
+                    document_id,
+                    framework_id,
+                    overall_score,
+                    json.dumps(category_scores),
+                    json.dumps(findings),
+                    json.dumps(recommendations),
+                    json.dumps(evidence_links)
+                )])
+                
+                connection.commit()
+                logger.info(f"Regulatory compliance stored for document ID: {document_id}, framework: {framework_id}")
+                return True
+        except Exception as e:
+            logger.error(f"Error storing regulatory compliance: {str(e)}")
+            return False
+    
+    def store_document_analysis(self, document_id: int,
+                                metrics: List[Dict[str, Any]],
+                                compliance: List[Dict[str, Any]],
+                                regulatory_mapping: Optional[Dict[str, Any]] = None,
+                                document_structure: Optional[Dict[str, Any]] = None,
+                                confidence_scores: Optional[Dict[str, Any]] = None,
+                                processing_status: str = 'processed') -> bool:
+        """
+        Store all results of one document analysis in a single transaction
+        
+        The enrichment update, the metrics mapping and every compliance
+        assessment are written with a handful of statements on one connection
+        and committed together, so readers never see a half-stored analysis.
+        Re-analysing a document replaces its earlier results: rows are
+        upserted, and assessments for frameworks no longer detected are removed.
+        
+        Args:
+            document_id: Document ID
+            metrics: Standardized metrics data
+            compliance: Compliance assessments, each with 'framework_id', 'overall_score',
+                'category_scores', 'findings', 'recommendations' and 'evidence_links'
+            regulatory_mapping: Regulatory mapping data
+            document_structure: Document structure data
+            confidence_scores: Confidence scores
+            processing_status: Processing status
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.pool:
             return False
         
+        # One row per framework; a batch may not upsert the same key twice
+        assessments = {assessment['framework_id']: assessment for assessment in compliance}
+        
         try:
-            with self.connection.cursor() as cursor:
-                # Check if compliance assessment already exists for this document and framework
+            with self.pool.connection() as connection, connection.cursor() as cursor:
+                cursor.execute(
+                    ENRICHMENT_UPDATE_SQL,
+                    (
+                        json.dumps(document_structure or {}),
+                        json.dumps(regulatory_mapping or {}),
+                        json.dumps(confidence_scores or {}),
+                        processing_status,
+                        document_id
+                    )
+                )
+                cursor.execute(METRICS_UPSERT_SQL, (document_id, json.dumps(metrics)))
                 cursor.execute(
                     """
-                    SELECT id FROM regulatory_compliance
-                    WHERE document_id = %s AND framework_id = %s
+                    DELETE FROM regulatory_compliance
+                    WHERE document_id = %s AND NOT (framework_id = ANY(%s))
                     """,
-                    (document_id, framework_id)
+                    (document_id, list(assessments))
                 )
-                
-                result = cursor.fetchone()
-                
-                if result:
-                    # Update existing assessment
-                    cursor.execute(
-                        """
-                        UPDATE regulatory_compliance
-                        SET 
-                            overall_score = %s,
-                            category_scores = %s,
-                            findings = %s,
-                            recommendations = %s,
-                            evidence_links = %s,
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE document_id = %s AND framework_id = %s
-                        """,
-                        (
-                            overall_score,
-                            json.dumps(category_scores),
-                            json.dumps(findings),
-                            json.dumps(recommendations),
-                            json.dumps(evidence_links),
-                            document_id,
-                            framework_id
-                        )
-                    )
-                else:
-                    # Insert new assessment
-                    cursor.execute(
-                        """
-                        INSERT INTO regulatory_compliance (
-                            document_id, framework_id, overall_score, category_scores,
-                            findings, recommendations, evidence_links
-                        )
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        """,
+                if assessments:
+                    execute_values(cursor, COMPLIANCE_UPSERT_SQL, [
                         (
                             document_id,
                             framework_id,
-                            overall_score,
-                            json.dumps(category_scores),
-                            json.dumps(findings),
-                            json.dumps(recommendations),
-                            json.dumps(evidence_links)
+                            assessment.get('overall_score', 0.0),
+                            json.dumps(assessment.get('category_scores', {})),
+                            json.dumps(assessment.get('findings', {})),
+                            json.dumps(assessment.get('recommendations', {})),
+                            json.dumps(assessment.get('evidence_links', {}))
                         )
-                    )
+                        for framework_id, assessment in assessments.items()
+                    ])
                 
-                self.connection.commit()
-                logger.info(f"Regulatory compliance stored for document ID: {document_id}, framework: {framework_id}")
+                connection.commit()
+                logger.info(f"Analysis stored for document ID: {document_id} "
+                            f"({len(metrics)} metrics, {len(assessments)} frameworks)")
                 return True
         except Exception as e:
-            logger.error(f"Error storing regulatory compliance: {str(e)}")
+            logger.error(f"Error storing document analysis: {str(e)}")
             return False
     
     def get_document_by_id(self, document_id: Union[int, str]) -> Optional[Dict[str, Any]]:
@@ -340,11 +656,11 @@ class DatabaseConnector:
         Returns:
             Document data if found, None otherwise
         """
-        if not self.connection:
+        if not self.pool:
             return None
         
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            with self.pool.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
                 # Get document
                 cursor.execute(
                     """
@@ -424,11 +740,11 @@ class DatabaseConnector:
         Returns:
             List of metrics
         """
-        if not self.connection:
+        if not self.pool:
             return []
         
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            with self.pool.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
                 # Get metrics mapping
                 cursor.execute(
                     """
@@ -458,11 +774,11 @@ class DatabaseConnector:
         Returns:
             List of compliance assessments
         """
-        if not self.connection:
+        if not self.pool:
             return []
         
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            with self.pool.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
                 # Get compliance assessments
                 cursor.execute(
                     """
@@ -492,69 +808,182 @@ class DatabaseConnector:
             logger.error(f"Error getting compliance for document: {str(e)}")
             return []
     
+    def iter_documents(self, document_type: Optional[str] = None,
+                       batch_size: int = DB_STREAM_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Stream documents, including their content, with a server-side cursor
+        
+        Rows are fetched ``batch_size`` at a time, so large document sets are
+        never held in memory at once. The generator keeps its pooled connection
+        until it is exhausted or closed.
+        
+        Args:
+            document_type: Optional document type filter
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            Documents in ID order
+        """
+        if not self.pool:
+            return
+        
+        query = """
+            SELECT id, content, document_type, metadata, processing_status, created_at
+            FROM document_store_enhanced
+        """
+        params = ()
+        if document_type:
+            query += " WHERE document_type = %s"
+            params = (document_type,)
+        query += " ORDER BY id"
+        
+        with self.pool.connection() as connection:
+            with connection.cursor(name=f"iter_documents_{uuid.uuid4().hex}",
+                                   cursor_factory=RealDictCursor) as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(query, params)
+                for row in cursor:
+                    yield self._decode_metadata(dict(row))
+    
     def search_documents(self, query: str, document_type: Optional[str] = None, 
-                       limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+                       limit: int = 10, offset: int = 0,
+                       after: Optional[Tuple[float, int]] = None) -> List[Dict[str, Any]]:
         """
-        Search documents by content
+        Full-text search of documents, best matches first
+        
+        Documents are matched against the GIN-indexed search vector and ranked
+        with ts_rank_cd; each result carries a ts_headline snippet of the
+        passages that matched. To page through results, pass the ``(rank, id)``
+        of the last result as ``after``: unlike ``offset``, every page then
+        costs the same. A blank query lists documents, newest first.
         
         Args:
-            query: Search query
+            query: Search query (web search syntax: "quoted phrases", or, -excluded)
             document_type: Optional document type filter
             limit: Maximum number of results
-            offset: Offset for pagination
+            offset: Offset for pagination (prefer ``after``)
+            after: ``(rank, id)`` of the last result of the previous page
+            
+        Returns:
+            List of matching documents with their 'rank' and 'snippet'
+        """
+        if not self.pool:
+            return []
+        
+        params: List[Any] = [query]
+        conditions = []
+        if query.strip():
+            conditions.append("search_vector @@ search_query")
+        if document_type:
+            conditions.append("document_type = %s")
+            params.append(document_type)
+        keyset = "TRUE"
+        if after is not None:
+            keyset = "(rank, id) < (%s, %s)"
+            params.extend(after)
+        params.extend([limit, offset])
+        
+        try:
+            with self.pool.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                # Snippets are only built for the rows of the requested page
+                cursor.execute(
+                    f"""
+                    WITH search AS (
+                        SELECT websearch_to_tsquery('english', %s) AS search_query
+                    ),
+                    ranked AS (
+                        SELECT id, document_type, metadata, processing_status, created_at,
+                               -- float8 so the rank round-trips exactly through the (rank, id) cursor
+                               ts_rank_cd(search_vector, search_query, 32)::float8 AS rank
+                        FROM document_store_enhanced, search
+                        WHERE {' AND '.join(conditions) or 'TRUE'}
+                    ),
+                    page AS (
+                        SELECT * FROM ranked
+                        WHERE {keyset}
+                        ORDER BY rank DESC, id DESC
+                        LIMIT %s OFFSET %s
+                    )
+                    SELECT page.*,
+                           CASE WHEN numnode(search.search_query) > 0
+                                THEN ts_headline('english', document.content, search.search_query,
+                                                 '{SEARCH_HEADLINE_OPTIONS}')
+                                ELSE left(document.content, 200)
+                           END AS snippet
+                    FROM page
+                    JOIN document_store_enhanced document ON document.id = page.id
+                    CROSS JOIN search
+                    ORDER BY page.rank DESC, page.id DESC
+                    """,
+                    params
+                )
+                
+                return [self._decode_metadata(dict(result)) for result in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error searching documents: {str(e)}")
+            return []
+    
+    def find_documents_by_name(self, name: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Fuzzy lookup of documents by company name (or file name)
+        
+        Uses pg_trgm word similarity, so misspellings and partial names
+        ("unilevr", "acme corp") still match; without pg_trgm, falls back
+        to a substring match.
+        
+        Args:
+            name: Company name to look for
+            limit: Maximum number of results
             
         Returns:
-            List of matching documents
+            List of matching documents, most similar first, with their 'similarity'
         """
-        if not self.connection:
+        if not self.pool or not name.strip():
             return []
         
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
-                if document_type:
-                    # Search with document type filter
+            with self.pool.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                if self.trigram_available:
+                    cursor.execute(f"SET LOCAL pg_trgm.word_similarity_threshold = {NAME_MATCH_THRESHOLD}")
                     cursor.execute(
-                        """
-                        SELECT id, document_type, metadata, processing_status, created_at
+                        f"""
+                        SELECT id, document_type, metadata, processing_status, created_at,
+                               word_similarity(lower(%s), {DOCUMENT_NAME_EXPRESSION}) AS similarity
                         FROM document_store_enhanced
-                        WHERE document_type = %s AND content ILIKE %s
-                        ORDER BY created_at DESC
-                        LIMIT %s OFFSET %s
+                        WHERE lower(%s) <%% {DOCUMENT_NAME_EXPRESSION}
+                        ORDER BY similarity DESC, id DESC
+                        LIMIT %s
                         """,
-                        (document_type, f"%{query}%", limit, offset)
+                        (name, name, limit)
                     )
                 else:
-                    # Search without document type filter
                     cursor.execute(
-                        """
-                        SELECT id, document_type, metadata, processing_status, created_at
+                        f"""
+                        SELECT id, document_type, metadata, processing_status, created_at,
+                               1.0 AS similarity
                         FROM document_store_enhanced
-                        WHERE content ILIKE %s
-                        ORDER BY created_at DESC
-                        LIMIT %s OFFSET %s
+                        WHERE {DOCUMENT_NAME_EXPRESSION} LIKE %s
+                        ORDER BY id DESC
+                        LIMIT %s
                         """,
-                        (f"%{query}%", limit, offset)
+                        (f"%{name.lower()}%", limit)
                     )
                 
-                results = cursor.fetchall()
-                documents = []
-                
-                for result in results:
-                    document = dict(result)
-                    
-                    # Convert JSON strings to Python objects
-                    for key in ['metadata']:
-                        if isinstance(document[key], str):
-                            document[key] = json.loads(document[key])
-                        elif document[key] is None:
-                            document[key] = {}
-                    
-                    documents.append(document)
-                
+                documents = [self._decode_metadata(dict(result)) for result in cursor.fetchall()]
+                connection.commit()
                 return documents
         except Exception as e:
-            logger.error(f"Error searching documents: {str(e)}")
+            logger.error(f"Error finding documents by name: {str(e)}")
             return []
+    
+    @staticmethod
+    def _decode_metadata(document: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a row's metadata JSON string to a Python object"""
+        if isinstance(document['metadata'], str):
+            document['metadata'] = json.loads(document['metadata'])
+        elif document['metadata'] is None:
+            document['metadata'] = {}
+        return document
 
 # Create a singleton instance
 db_connector = DatabaseConnector()
\ No newline at end of file
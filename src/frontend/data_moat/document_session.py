@@ -0,0 +1,167 @@
+"""
+Document Session for SustainaTrend™ Data Moat
+
+Opens a PDF once for the whole enhanced processing pipeline and lazily
+caches what the steps read from it: the text layer of each page, OCR output,
+layout blocks and table detections. Each of these is computed at most once
+per page, however many steps ask for it.
+
+OCR is decided per page: a page is OCR'd when its text layer is empty or
+garbled (or when OCR was requested for the whole document), so one scanned
+page no longer forces the entire report through OCR. Table detection runs
+only on pages whose layout can hold a table, i.e. pages with text and the
+vector rulings that PyMuPDF's default table strategy builds cells from.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+try:
+    import fitz
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+    fitz = None
+
+from frontend.services.pdf_extraction import OCR_AVAILABLE, text_layer_is_poor, ocr_page
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Drawing items that can form table borders: lines, rectangles and quads
+RULING_ITEMS = ('l', 're', 'qu')
+# Minimum rulings (and text blocks) on a page before table detection is tried
+MIN_TABLE_RULINGS = 2
+MIN_TABLE_BLOCKS = 2
+
+
+class DocumentSession:
+    """One open PDF shared by all processing steps, with per-page results cached on first use"""
+
+    def __init__(self, file_path: str, use_ocr: bool = False):
+        """
+        Open a PDF document
+
+        Args:
+            file_path: Path to the PDF file
+            use_ocr: OCR every page instead of only pages with a poor text layer
+        """
+        if not PYMUPDF_AVAILABLE or fitz is None:
+            raise RuntimeError("PyMuPDF not available. Cannot open PDF document.")
+
+        self.file_path = file_path
+        self.use_ocr = use_ocr
+        self.doc = fitz.open(file_path)
+        self.page_count = len(self.doc)
+        self.ocr_pages: List[int] = []
+        self._text_layers: Dict[int, str] = {}
+        self._ocr_texts: Dict[int, Optional[str]] = {}
+        self._page_texts: Dict[int, str] = {}
+        self._blocks: Dict[int, List[tuple]] = {}
+        self._table_layouts: Dict[int, bool] = {}
+        self._tables: Dict[int, List[Any]] = {}
+        self._text: Optional[str] = None
+
+    def __enter__(self) -> 'DocumentSession':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying document"""
+        if self.doc is not None:
+            self.doc.close()
+            self.doc = None
+
+    def page(self, number: int):
+        """PyMuPDF page by 1-based page number"""
+        return self.doc[number - 1]
+
+    def text_layer(self, number: int) -> str:
+        """Embedded text of a page"""
+        if number not in self._text_layers:
+            self._text_layers[number] = self.page(number).get_text()
+        return self._text_layers[number]
+
+    def ocr_text(self, number: int) -> Optional[str]:
+        """OCR output of a page, or None if OCR is unavailable or failed"""
+        if number not in self._ocr_texts:
+            text = None
+            if OCR_AVAILABLE:
+                try:
+                    text = ocr_page(self.page(number))
+                except Exception as e:
+                    logger.warning(f"OCR processing failed on page {number}: {str(e)}")
+            self._ocr_texts[number] = text
+        return self._ocr_texts[number]
+
+    def needs_ocr(self, number: int) -> bool:
+        """Whether a page should be OCR'd: always when requested, otherwise only for a poor text layer"""
+        return self.use_ocr or text_layer_is_poor(self.text_layer(number))
+
+    def page_text(self, number: int) -> str:
+        """
+        Best text of a page
+
+        Args:
+            number: Page number (1-based)
+
+        Returns:
+            OCR output when the page needs OCR and it recovered more text, otherwise the text layer
+        """
+        if number not in self._page_texts:
+            text = self.text_layer(number)
+            if self.needs_ocr(number):
+                ocr_text = self.ocr_text(number)
+                if ocr_text is not None and len(ocr_text.strip()) > len(text.strip()):
+                    text = ocr_text
+                    self.ocr_pages.append(number)
+            self._page_texts[number] = text
+        return self._page_texts[number]
+
+    def text(self) -> str:
+        """Full document text with [Page N] markers"""
+        if self._text is None:
+            self._text = "".join(
+                f"\n\n[Page {number}]\n{self.page_text(number)}" for number in range(1, self.page_count + 1)
+            )
+        return self._text
+
+    def blocks(self, number: int) -> List[tuple]:
+        """Layout blocks of a page as (x0, y0, x1, y1, text, block_no, block_type)"""
+        if number not in self._blocks:
+            self._blocks[number] = self.page(number).get_text('blocks')
+        return self._blocks[number]
+
+    def has_table_layout(self, number: int) -> bool:
+        """Whether a page has enough text blocks and vector rulings to hold a detectable table"""
+        if number not in self._table_layouts:
+            table_layout = False
+            if len(self.blocks(number)) >= MIN_TABLE_BLOCKS:
+                rulings = 0
+                for drawing in self.page(number).get_drawings():
+                    rulings += sum(1 for item in drawing['items'] if item[0] in RULING_ITEMS)
+                    if rulings >= MIN_TABLE_RULINGS:
+                        table_layout = True
+                        break
+            self._table_layouts[number] = table_layout
+        return self._table_layouts[number]
+
+    def tables(self, number: int) -> List[Any]:
+        """
+        Tables PyMuPDF detects on a page
+
+        Args:
+            number: Page number (1-based)
+
+        Returns:
+            Detected tables; empty for pages without a table-like layout
+        """
+        if number not in self._tables:
+            tables = []
+            if self.has_table_layout(number):
+                found = self.page(number).find_tables()
+                tables = list(getattr(found, 'tables', None) or [])
+            self._tables[number] = tables
+        return self._tables[number]
@@ -0,0 +1,259 @@
+"""
+Embedding Pipeline for SustainaTrend™ Data Moat
+
+Embeds document chunks and upserts the vectors in batches instead of one
+round trip per chunk:
+
+1. Chunks whose content hash is already stored under their vector ID are
+   skipped, so reprocessing a document only embeds what changed.
+2. The remaining chunks are grouped into requests of up to a token budget
+   and embedded by a small thread pool, under a requests-per-minute limit,
+   retrying failed requests with exponential backoff.
+3. Vectors are upserted in batches to Pinecone when it is configured, or to
+   an in-process stand-in store otherwise.
+
+Every run reports its throughput (chunks per second) along with counts of
+embedded, skipped and failed chunks.
+"""
+
+import os
+import time
+import random
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Estimated tokens per embeddings request (the API accepts up to 8191 per input)
+EMBEDDING_BATCH_TOKENS = int(os.getenv('EMBEDDING_BATCH_TOKENS', '8000'))
+EMBEDDING_BATCH_MAX_INPUTS = 256
+EMBEDDING_CONCURRENCY = int(os.getenv('EMBEDDING_CONCURRENCY', '4'))
+EMBEDDING_REQUESTS_PER_MINUTE = int(os.getenv('EMBEDDING_REQUESTS_PER_MINUTE', '300'))
+EMBEDDING_MAX_RETRIES = 4
+EMBEDDING_BACKOFF_SECONDS = 1.0
+# Vectors per upsert request, and IDs per fetch request when checking stored hashes
+UPSERT_BATCH_SIZE = 100
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of a chunk's text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+def batch_by_tokens(texts: Sequence[str], max_tokens: int = EMBEDDING_BATCH_TOKENS,
+                    max_inputs: int = EMBEDDING_BATCH_MAX_INPUTS) -> List[List[int]]:
+    """
+    Group texts into request batches
+
+    Args:
+        texts: Texts to embed
+        max_tokens: Estimated token budget per batch (a longer text gets a batch of its own)
+        max_inputs: Maximum texts per batch
+
+    Returns:
+        Batches of indexes into ``texts``, in order
+    """
+    batches, current, tokens = [], [], 0
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if current and (tokens + cost > max_tokens or len(current) >= max_inputs):
+            batches.append(current)
+            current, tokens = [], 0
+        current.append(i)
+        tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+class RequestRateLimiter:
+    """Spaces request starts evenly to stay under a requests-per-minute limit"""
+
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the caller may start a request"""
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class LocalVectorStore:
+    """In-process stand-in for a vector index, used when no vector database is configured"""
+
+    def __init__(self):
+        self.vectors: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def fetch_hashes(self, ids: Sequence[str]) -> Dict[str, str]:
+        """Content hashes stored under the given vector IDs"""
+        with self.lock:
+            return {id: self.vectors[id]['metadata'].get('content_hash')
+                    for id in ids if id in self.vectors}
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        with self.lock:
+            for vector in vectors:
+                self.vectors[vector['id']] = vector
+
+
+class PineconeVectorStore:
+    """Batched access to a Pinecone index"""
+
+    def __init__(self, index):
+        self.index = index
+
+    def fetch_hashes(self, ids: Sequence[str]) -> Dict[str, str]:
+        """Content hashes stored under the given vector IDs"""
+        hashes = {}
+        for start in range(0, len(ids), UPSERT_BATCH_SIZE):
+            response = self.index.fetch(ids=list(ids[start:start + UPSERT_BATCH_SIZE]))
+            vectors = response.get('vectors', {}) if isinstance(response, dict) else response.vectors
+            for id, vector in vectors.items():
+                metadata = vector.get('metadata') if isinstance(vector, dict) else vector.metadata
+                hashes[id] = (metadata or {}).get('content_hash')
+        return hashes
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        self.index.upsert(vectors=vectors)
+
+
+class EmbeddingPipeline:
+    """Batched, concurrent, rate-limited chunk embedding with batched vector upserts"""
+
+    def __init__(self, embed_batch: Callable[[List[str]], Optional[List[List[float]]]], vector_store,
+                 concurrency: int = EMBEDDING_CONCURRENCY,
+                 requests_per_minute: int = EMBEDDING_REQUESTS_PER_MINUTE,
+                 batch_tokens: int = EMBEDDING_BATCH_TOKENS,
+                 max_retries: int = EMBEDDING_MAX_RETRIES,
+                 backoff: float = EMBEDDING_BACKOFF_SECONDS):
+        """
+        Initialize the pipeline
+
+        Args:
+            embed_batch: Embeds a list of texts, returning one vector per text (None or an exception on failure)
+            vector_store: Store with ``fetch_hashes(ids)`` and ``upsert(vectors)``
+            concurrency: Embedding requests in flight at once
+            requests_per_minute: Embedding request rate limit
+            batch_tokens: Estimated token budget per embedding request
+            max_retries: Retries per failed request
+            backoff: Delay before the first retry, doubled for each further retry
+        """
+        self.embed_batch = embed_batch
+        self.vector_store = vector_store
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = RequestRateLimiter(requests_per_minute)
+        self.batch_tokens = batch_tokens
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def run(self, ids: List[str], texts: List[str], metadata: List[Dict[str, Any]],
+            embeddings: Optional[List[List[float]]] = None) -> Dict[str, Any]:
+        """
+        Embed and store chunks
+
+        Args:
+            ids: Vector ID of each chunk
+            texts: Chunk texts
+            metadata: Metadata of each chunk; its content hash is added
+            embeddings: Already computed vectors of all chunks, if any
+
+        Returns:
+            Run statistics, with the newly computed vectors by chunk position under 'embeddings'
+        """
+        started = time.perf_counter()
+        hashes = [content_hash(text) for text in texts]
+        try:
+            stored = self.vector_store.fetch_hashes(ids)
+        except Exception as e:
+            logger.warning(f"Could not check stored chunk hashes, storing all chunks: {str(e)}")
+            stored = {}
+        pending = [i for i in range(len(ids)) if stored.get(ids[i]) != hashes[i]]
+
+        stats = {'chunks': len(ids), 'skipped': len(ids) - len(pending), 'embedded': 0, 'failed': 0,
+                 'requests': 0, 'retries': 0, 'upserted': 0, 'embeddings': {}}
+        buffer: List[Dict[str, Any]] = []
+
+        def add(i: int, vector: List[float]) -> None:
+            buffer.append({'id': ids[i], 'values': vector,
+                           'metadata': dict(metadata[i], content_hash=hashes[i])})
+            if len(buffer) >= UPSERT_BATCH_SIZE:
+                self._upsert(buffer, stats)
+
+        if embeddings is not None:
+            for i in pending:
+                add(i, embeddings[i])
+        elif pending:
+            batches = [[pending[j] for j in batch]
+                       for batch in batch_by_tokens([texts[i] for i in pending], self.batch_tokens)]
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches)),
+                                    thread_name_prefix='embedding') as executor:
+                futures = {executor.submit(self._embed, [texts[i] for i in batch]): batch for batch in batches}
+                # Counting and upserts happen here, on the calling thread, as batches complete
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    vectors, requests = future.result()
+                    stats['requests'] += requests
+                    stats['retries'] += requests - 1
+                    if vectors is None:
+                        stats['failed'] += len(batch)
+                        continue
+                    for i, vector in zip(batch, vectors):
+                        stats['embeddings'][i] = vector
+                        add(i, vector)
+                    stats['embedded'] += len(batch)
+        self._upsert(buffer, stats)
+
+        elapsed = time.perf_counter() - started
+        stats['elapsed'] = round(elapsed, 3)
+        stats['chunks_per_second'] = round((len(ids) - stats['failed']) / elapsed, 1) if elapsed else 0.0
+        logger.info(f"Embedding pipeline: {stats['embedded']} embedded, {stats['skipped']} unchanged, "
+                    f"{stats['failed']} failed in {stats['requests']} requests "
+                    f"({stats['chunks_per_second']} chunks/sec)")
+        return stats
+
+    def _embed(self, texts: List[str]) -> Tuple[Optional[List[List[float]]], int]:
+        """One batch with retries; returns the vectors (None once retries are exhausted) and requests made"""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1) * (1 + random.random()))
+            self.rate_limiter.acquire()
+            try:
+                vectors = self.embed_batch(texts)
+                if vectors is not None and len(vectors) == len(texts) and all(vectors):
+                    return vectors, attempt + 1
+                logger.warning(f"Embedding request for {len(texts)} chunks returned no vectors")
+            except Exception as e:
+                logger.warning(f"Embedding request for {len(texts)} chunks failed: {str(e)}")
+        return None, self.max_retries + 1
+
+    def _upsert(self, buffer: List[Dict[str, Any]], stats: Dict[str, Any]) -> None:
+        if not buffer:
+            return
+        try:
+            self.vector_store.upsert(list(buffer))
+            stats['upserted'] += len(buffer)
+        except Exception as e:
+            logger.error(f"Error upserting {len(buffer)} vectors: {str(e)}")
+        buffer.clear()
+
+
+# Create a global instance of the local stand-in store
+local_vector_store = LocalVectorStore()
@@ -18,6 +18,8 @@ import logging
 import json
 import re
 import uuid
+import hashlib
+from bisect import bisect_right
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple, Union
 
@@ -29,14 +31,6 @@ except ImportError:
     PYMUPDF_AVAILABLE = False
     fitz = None
 
-# Try to import Tesseract for OCR
-try:
-    import pytesseract
-    from PIL import Image
-    TESSERACT_AVAILABLE = True
-except ImportError:
-    TESSERACT_AVAILABLE = False
-
 # Import our document processor base class
 try:
     from frontend.document_processor import DocumentProcessor
@@ -46,23 +40,77 @@ except ImportError:
     
 # Import AI connector for AI-powered processing
 try:
-    from frontend.data_moat.ai_connector import (
-        generate_embeddings,
-        query_openai,
-        is_openai_available,
-        store_embeddings_in_pinecone,
-        is_pinecone_available
-    )
+    from frontend.data_moat.ai_connector import ai_connector
     AI_CONNECTOR_AVAILABLE = True
 except ImportError:
     AI_CONNECTOR_AVAILABLE = False
 
+# Import the batched embedding pipeline
+try:
+    from frontend.data_moat.embedding_pipeline import EmbeddingPipeline, PineconeVectorStore, local_vector_store
+    EMBEDDING_PIPELINE_AVAILABLE = True
+except ImportError:
+    EMBEDDING_PIPELINE_AVAILABLE = False
+
+# Import the persistent analysis cache
+try:
+    from frontend.services.analysis_cache import analysis_cache, file_hash
+    ANALYSIS_CACHE_AVAILABLE = True
+except ImportError:
+    ANALYSIS_CACHE_AVAILABLE = False
+
+# Import the shared single-open PDF session
+try:
+    from frontend.data_moat.document_session import DocumentSession
+    DOCUMENT_SESSION_AVAILABLE = PYMUPDF_AVAILABLE
+except ImportError:
+    DOCUMENT_SESSION_AVAILABLE = False
+
 # Import database connector
 from frontend.data_moat.db_connector import db_connector
 
+# Bump whenever enrichment output changes, so cached results are not reused
+PROCESSOR_VERSION = '1.0'
+
+# Model used for chunk embeddings (the connector default)
+EMBEDDING_MODEL = 'text-embedding-ada-002'
+
+# Page markers written by extract_text
+PAGE_MARKER_PATTERN = re.compile(r'\[Page (\d+)\]')
+
+# Characters per page assumed when the text has no page markers
+AVG_CHARS_PER_PAGE = 3000
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+class PageIndex:
+    """Page boundaries of a document, built once, resolving text offsets to pages by bisection"""
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.marker_ends = []
+        self.page_numbers = []
+        for match in PAGE_MARKER_PATTERN.finditer(text):
+            self.marker_ends.append(match.end())
+            self.page_numbers.append(int(match.group(1)))
+    
+    def page_at(self, position: int) -> int:
+        """
+        Page of a text offset: the last page marker that ends at or before it
+        
+        Args:
+            position: Offset in the text; negative offsets count from the end, as in slicing
+            
+        Returns:
+            Page number (1-based), estimated from the average page length if no marker precedes it
+        """
+        end = position if position >= 0 else max(0, len(self.text) + position)
+        index = bisect_right(self.marker_ends, end) - 1
+        if index >= 0:
+            return self.page_numbers[index]
+        return max(1, position // AVG_CHARS_PER_PAGE + 1)
+
 class EnhancedDocumentProcessor:
     """Enhanced document processor with data moat capabilities"""
     
@@ -113,6 +161,9 @@ class EnhancedDocumentProcessor:
             ]
         }
         
+        # Page index of the document being processed, see _page_index
+        self.page_index = None
+        
         # Framework detection patterns
         self.frameworks = {
             'esrs': [
@@ -161,9 +212,25 @@ class EnhancedDocumentProcessor:
         Returns:
             Processing result with extracted text, metadata, and data moat enhancements
         """
+        session = None
         try:
             self.logger.info(f"Processing document with enhanced processor: {file_path}")
             
+            # Repeat uploads of the same file are served from the analysis cache
+            cache_key = None
+            if ANALYSIS_CACHE_AVAILABLE:
+                cache_key = analysis_cache.key(file_hash(file_path), type(self).__name__, PROCESSOR_VERSION,
+                                               use_ocr, auto_detect_framework, document_type)
+                cached = analysis_cache.get(cache_key)
+                if cached is not None:
+                    self.logger.info(f"Serving cached enrichment for document {cached.get('document_id')}")
+                    cached['cached'] = True
+                    return cached
+            
+            # Open the PDF once; every step reads pages, OCR output and tables through this session
+            if DOCUMENT_SESSION_AVAILABLE and file_path.lower().endswith('.pdf'):
+                session = DocumentSession(file_path, use_ocr)
+            
             # Step 1: Extract text and basic metadata using base processor if available
             if self.base_processor:
                 base_result = self.base_processor.process_document(file_path, use_ocr)
@@ -178,13 +245,21 @@ class EnhancedDocumentProcessor:
                 document_structure = base_result.get('document_structure', {})
             else:
                 # Fall back to direct extraction
-                text, page_count = self.extract_text(file_path, use_ocr)
+                if session:
+                    text, page_count = session.text(), session.page_count
+                else:
+                    text, page_count = self.extract_text(file_path, use_ocr)
                 base_metrics = self._identify_sustainability_metrics(text)
                 base_frameworks = self._identify_frameworks(text)
                 document_structure = self._create_document_structure(text, page_count)
             
-            # Step 2: Detect if OCR is needed (if not explicitly provided)
-            if not use_ocr and self._is_ocr_needed(text, page_count):
+            # Index page boundaries once; all page attribution below bisects this index
+            self._page_index(text)
+            
+            # Step 2: Detect if OCR is needed (if not explicitly provided); session text is
+            # already OCR'd page by page, other text escalates to OCR for the whole document
+            ocr_per_page = session is not None and not self.base_processor
+            if not use_ocr and not ocr_per_page and self._is_ocr_needed(text, page_count):
                 self.logger.info("OCR detected as needed, re-processing with OCR")
                 return self.process_document(file_path, use_ocr=True, 
                                            auto_detect_framework=auto_detect_framework,
@@ -200,8 +275,9 @@ class EnhancedDocumentProcessor:
                 'page_count': page_count,
                 'word_count': len(text.split()),
                 'processed_time': datetime.now().isoformat(),
-                'processor_version': '1.0',
-                'ocr_applied': use_ocr
+                'processor_version': PROCESSOR_VERSION,
+                'ocr_applied': use_ocr or bool(ocr_per_page and session.ocr_pages),
+                'ocr_pages': sorted(session.ocr_pages) if ocr_per_page else []
             }
             
             # Step 4: Auto-detect framework if enabled
@@ -233,48 +309,38 @@ class EnhancedDocumentProcessor:
             regulatory_mapping = self._create_regulatory_mapping(text, document_structure, detected_frameworks)
             
             # Step 8: Extract tables and normalize them
-            tables = self._extract_and_normalize_tables(file_path)
+            tables = self._extract_and_normalize_tables(file_path, session)
             
             # Step 9: Calculate confidence scores
             confidence_scores = self._calculate_confidence_scores(text, enhanced_metrics, regulatory_mapping)
             
-            # Step 10: Store enriched data in database
-            db_connector.update_document_enrichment(
+            # Step 10: Assess compliance for each detected framework
+            compliance_assessments = []
+            for framework_id, score in detected_frameworks.items():
+                if score > 0.3:  # Only store significant framework detections
+                    compliance_assessment = self._assess_framework_compliance(text, framework_id, document_structure)
+                    compliance_assessments.append(dict(compliance_assessment, framework_id=framework_id))
+            
+            # Step 11: Convert metrics to the standardized mapping format
+            standardized_metrics = self._convert_to_standardized_metrics(normalized_metrics, document_id)
+            
+            # Step 12: Store enrichment, metrics mapping and compliance assessments in one transaction
+            db_connector.store_document_analysis(
                 document_id=document_id,
+                metrics=standardized_metrics,
+                compliance=compliance_assessments,
                 regulatory_mapping=regulatory_mapping,
-                extracted_metrics=normalized_metrics,
                 document_structure=document_structure,
                 confidence_scores=confidence_scores,
                 processing_status='processed'
             )
             
-            # Step 11: Store standardized metrics mapping
-            standardized_metrics = self._convert_to_standardized_metrics(normalized_metrics, document_id)
-            db_connector.store_metrics_mapping(
-                document_id=document_id,
-                metrics=standardized_metrics
-            )
-            
-            # Step 12: Store compliance assessment for each detected framework
-            for framework_id, score in detected_frameworks.items():
-                if score > 0.3:  # Only store significant framework detections
-                    compliance_assessment = self._assess_framework_compliance(text, framework_id, document_structure)
-                    db_connector.store_regulatory_compliance(
-                        document_id=document_id,
-                        framework_id=framework_id,
-                        overall_score=compliance_assessment.get('overall_score', 0.0),
-                        category_scores=compliance_assessment.get('category_scores', {}),
-                        findings=compliance_assessment.get('findings', {}),
-                        recommendations=compliance_assessment.get('recommendations', {}),
-                        evidence_links=compliance_assessment.get('evidence_links', {})
-                    )
-            
-            # Step 13: Create vector embeddings and store in Pinecone if available
-            if AI_CONNECTOR_AVAILABLE and is_pinecone_available():
+            # Step 13: Create vector embeddings and store them in Pinecone, or the local stand-in
+            if AI_CONNECTOR_AVAILABLE and EMBEDDING_PIPELINE_AVAILABLE and ai_connector.is_openai_available():
                 self._create_and_store_embeddings(text, document_id, metadata)
             
             # Return the enhanced processing result
-            return {
+            result = {
                 'success': True,
                 'document_id': document_id,
                 'text_length': len(text),
@@ -290,6 +356,9 @@ class EnhancedDocumentProcessor:
                 'enrichment_status': 'complete',
                 'timestamp': datetime.now().isoformat()
             }
+            if cache_key:
+                analysis_cache.set(cache_key, result)
+            return result
         except Exception as e:
             self.logger.error(f"Error in enhanced document processing: {str(e)}")
             import traceback
@@ -298,6 +367,9 @@ class EnhancedDocumentProcessor:
                 'success': False,
                 'error': str(e)
             }
+        finally:
+            if session:
+                session.close()
     
     def extract_text(self, file_path: str, use_ocr: bool = False) -> Tuple[str, int]:
         """
@@ -314,36 +386,13 @@ class EnhancedDocumentProcessor:
         if self.base_processor:
             return self.base_processor.extract_text(file_path, use_ocr)
         
-        if not PYMUPDF_AVAILABLE or fitz is None:
+        if not DOCUMENT_SESSION_AVAILABLE:
             return "PyMuPDF not available. Cannot extract text from PDF.", 0
         
         try:
-            doc = fitz.open(file_path)
-            text = ""
-            page_count = len(doc)
-            
-            for page_num in range(page_count):
-                page = doc[page_num]
-                
-                if use_ocr and TESSERACT_AVAILABLE:
-                    # Use OCR for this page
-                    pix = page.get_pixmap()
-                    img_path = f"temp_ocr_{page_num}.png"
-                    pix.save(img_path)
-                    
-                    # Process with Tesseract
-                    img = Image.open(img_path)
-                    page_text = pytesseract.image_to_string(img)
-                    
-                    # Clean up temporary file
-                    os.remove(img_path)
-                else:
-                    # Use normal text extraction
-                    page_text = page.get_text()
-                
-                text += f"\n\n[Page {page_num + 1}]\n{page_text}"
-            
-            return text, page_count
+            # Pages with a poor text layer are OCR'd individually
+            with DocumentSession(file_path, use_ocr) as session:
+                return session.text(), session.page_count
         except Exception as e:
             self.logger.error(f"Error extracting text: {str(e)}")
             return f"Error extracting text: {str(e)}", 0
@@ -541,14 +590,23 @@ class EnhancedDocumentProcessor:
         Returns:
             Page number (1-based)
         """
-        # Look for page markers like [Page X]
-        page_markers = re.findall(r'\[Page (\d+)\]', text[:position])
-        if page_markers:
-            return int(page_markers[-1])
-        
-        # Fall back to estimation based on average page length
-        avg_chars_per_page = 3000  # Approximate
-        return max(1, position // avg_chars_per_page + 1)
+        return self._page_index(text).page_at(position)
+    
+    def _page_index(self, text: str) -> PageIndex:
+        """
+        Page index of a document, built on first use and reused by every extraction step
+        
+        Args:
+            text: Document text
+            
+        Returns:
+            Page index for this exact text
+        """
+        page_index = self.page_index
+        if page_index is None or page_index.text is not text:
+            page_index = PageIndex(text)
+            self.page_index = page_index
+        return page_index
     
     def _extract_year_reference(self, context: str) -> str:
         """
@@ -639,7 +697,7 @@ class EnhancedDocumentProcessor:
         metrics = self._identify_sustainability_metrics(text)
         
         # Use AI for enhanced extraction if available
-        if AI_CONNECTOR_AVAILABLE and is_openai_available():
+        if AI_CONNECTOR_AVAILABLE and ai_connector.is_openai_available():
             ai_metrics = self._extract_metrics_with_ai(text)
             
             # Merge AI-extracted metrics with pattern-based metrics
@@ -674,7 +732,7 @@ class EnhancedDocumentProcessor:
         Returns:
             Dictionary of AI-extracted metrics
         """
-        if not AI_CONNECTOR_AVAILABLE or not is_openai_available():
+        if not AI_CONNECTOR_AVAILABLE or not ai_connector.is_openai_available():
             return {}
         
         try:
@@ -696,7 +754,7 @@ class EnhancedDocumentProcessor:
             {text[:10000]}  # Use first 10k chars to stay within token limits
             """
             
-            response = query_openai(prompt)
+            response = ai_connector.query_openai(prompt)
             
             if response and response.get('content'):
                 # Parse the JSON response
@@ -1074,12 +1132,14 @@ class EnhancedDocumentProcessor:
         
         return regulatory_mapping
     
-    def _extract_and_normalize_tables(self, file_path: str) -> List[Dict[str, Any]]:
+    def _extract_and_normalize_tables(self, file_path: str,
+                                      session: Optional['DocumentSession'] = None) -> List[Dict[str, Any]]:
         """
         Extract tables from the document and normalize them
         
         Args:
             file_path: Path to the document file
+            session: Open session of the document, opened here if not given
             
         Returns:
             List of extracted and normalized tables
@@ -1087,20 +1147,20 @@ class EnhancedDocumentProcessor:
         tables = []
         
         # Check if PyMuPDF is available
-        if not PYMUPDF_AVAILABLE or fitz is None:
+        if session is None and not DOCUMENT_SESSION_AVAILABLE:
             return tables
         
+        own_session = session is None
         try:
-            doc = fitz.open(file_path)
+            if own_session:
+                session = DocumentSession(file_path)
             
-            for page_num in range(len(doc)):
-                page = doc[page_num]
+            for page_number in range(1, session.page_count + 1):
+                # Extract tables using PyMuPDF; pages without a table-like layout are skipped
+                tables_on_page = session.tables(page_number)
                 
-                # Extract tables using PyMuPDF
-                tables_on_page = page.find_tables()
-                
-                if tables_on_page and hasattr(tables_on_page, 'tables'):
-                    for i, table in enumerate(tables_on_page.tables):
+                if tables_on_page:
+                    for i, table in enumerate(tables_on_page):
                         rows = []
                         
                         # Extract headers
@@ -1120,7 +1180,7 @@ class EnhancedDocumentProcessor:
                         
                         # Create structured table representation
                         table_data = {
-                            'page': page_num + 1,
+                            'page': page_number,
                             'index_on_page': i,
                             'headers': headers,
                             'rows': rows,
@@ -1141,6 +1201,9 @@ class EnhancedDocumentProcessor:
         
         except Exception as e:
             self.logger.error(f"Error extracting tables: {str(e)}")
+        finally:
+            if own_session and session:
+                session.close()
         
         return tables
     
@@ -1277,7 +1340,7 @@ class EnhancedDocumentProcessor:
                 return self._enhance_compliance_assessment(base_assessment[framework_id], text, document_structure)
         
         # Fall back to AI-based assessment if available
-        if AI_CONNECTOR_AVAILABLE and is_openai_available():
+        if AI_CONNECTOR_AVAILABLE and ai_connector.is_openai_available():
             return self._assess_compliance_with_ai(text, framework_id, document_structure)
         
         # Basic assessment
@@ -1359,7 +1422,7 @@ class EnhancedDocumentProcessor:
         Returns:
             AI-based compliance assessment
         """
-        if not AI_CONNECTOR_AVAILABLE or not is_openai_available():
+        if not AI_CONNECTOR_AVAILABLE or not ai_connector.is_openai_available():
             return {
                 'framework_id': framework_id,
                 'overall_score': 0.5,
@@ -1414,7 +1477,7 @@ class EnhancedDocumentProcessor:
             {text[:10000]}  # Use first 10k chars to stay within token limits
             """
             
-            response = query_openai(prompt)
+            response = ai_connector.query_openai(prompt)
             
             if response and response.get('content'):
                 # Parse the JSON response
@@ -1578,7 +1641,7 @@ class EnhancedDocumentProcessor:
     
     def _create_and_store_embeddings(self, text: str, document_id: int, metadata: Dict[str, Any]) -> bool:
         """
-        Create vector embeddings and store them in Pinecone
+        Create vector embeddings in batches and store them in Pinecone, or the local stand-in store
         
         Args:
             text: Document text
@@ -1586,9 +1649,9 @@ class EnhancedDocumentProcessor:
             metadata: Document metadata
             
         Returns:
-            True if successful, False otherwise
+            True if every chunk was stored, False otherwise
         """
-        if not AI_CONNECTOR_AVAILABLE or not is_pinecone_available():
+        if not AI_CONNECTOR_AVAILABLE or not EMBEDDING_PIPELINE_AVAILABLE or not ai_connector.is_openai_available():
             return False
         
         try:
@@ -1608,33 +1671,45 @@ class EnhancedDocumentProcessor:
                     chunk = ' '.join(words[i:i + chunk_size])
                     chunks.append(chunk)
             
-            # Generate embeddings for each chunk
-            for i, chunk in enumerate(chunks):
-                chunk_id = f"{document_id}-{i}"
-                
-                # Create chunk metadata
-                chunk_metadata = dict(metadata)
-                chunk_metadata['chunk_id'] = i
-                chunk_metadata['chunk_count'] = len(chunks)
-                chunk_metadata['document_id'] = document_id
-                
-                # Generate embedding
-                embedding = generate_embeddings(chunk)
-                if embedding:
-                    # Store in Pinecone
-                    success = store_embeddings_in_pinecone(
-                        chunk_id, 
-                        embedding, 
-                        chunk_metadata
-                    )
-                    
-                    if not success:
-                        self.logger.warning(f"Failed to store embedding for chunk {i}")
+            # Reuse the chunk embeddings of identical text, e.g. from an earlier upload
+            embeddings = None
+            embeddings_key = None
+            if ANALYSIS_CACHE_AVAILABLE:
+                text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+                embeddings_key = analysis_cache.key(text_hash, 'chunk_embeddings', EMBEDDING_MODEL, len(chunks))
+                cached = analysis_cache.get_embeddings(embeddings_key)
+                if cached is not None and len(cached) == len(chunks):
+                    embeddings = cached.tolist()
+            
+            ids = [f"{document_id}-{i}" for i in range(len(chunks))]
+            chunk_metadata = [
+                dict(metadata, chunk_id=i, chunk_count=len(chunks), document_id=document_id)
+                for i in range(len(chunks))
+            ]
+            
+            # Embed in concurrent, rate-limited batches and upsert in batches; unchanged chunks are skipped
+            stats = self._embedding_pipeline().run(ids, chunks, chunk_metadata, embeddings)
             
-            return True
+            if embeddings is None and embeddings_key and chunks and len(stats['embeddings']) == len(chunks):
+                analysis_cache.set_embeddings(embeddings_key, [stats['embeddings'][i] for i in range(len(chunks))])
+            
+            if stats['failed']:
+                self.logger.warning(f"Failed to embed {stats['failed']} of {len(chunks)} chunks")
+            return stats['failed'] == 0
         except Exception as e:
             self.logger.error(f"Error creating and storing embeddings: {str(e)}")
             return False
+    
+    def _embedding_pipeline(self) -> 'EmbeddingPipeline':
+        """Embedding pipeline writing to Pinecone when it is configured, otherwise to the local stand-in"""
+        if ai_connector.is_pinecone_available() and ai_connector.index is not None:
+            vector_store = PineconeVectorStore(ai_connector.index)
+        else:
+            vector_store = local_vector_store
+        return EmbeddingPipeline(
+            lambda texts: ai_connector.generate_embeddings_batch(texts, EMBEDDING_MODEL),
+            vector_store
+        )
 
 # Create a singleton instance
 enhanced_processor = EnhancedDocumentProcessor()
\ No newline at end of file
@@ -18,6 +18,8 @@ from ..utils.data_providers import (
 )
 from ..services.performance_monitor import performance_monitor
 from ..services.cache_service import cache_service
+from ..services.analysis_cache import analysis_cache
+from ..services.embedding_service import get_embedding_stats
 from ..services.rate_limiter import rate_limiter
 from ..services.config_service import config_service
 
@@ -71,6 +73,7 @@ class APIRoute(BaseRoute):
                 'status': 'success',
                 'performance': perf_stats,
                 'cache_stats': cache_service.get_stats(),
+                'analysis_cache_stats': analysis_cache.get_stats(),
                 'rate_limits': rate_limits,
                 'rate_states': rate_states,
                 'timestamp': datetime.now()
@@ -236,10 +239,20 @@ class APIRoute(BaseRoute):
                 for key in rate_limits.keys()
             }
             
+            # Pool wait time and utilization of the data moat database, when psycopg2 is installed
+            try:
+                from ..data_moat.db_connector import db_connector
+                database_pool = db_connector.get_pool_stats()
+            except ImportError:
+                database_pool = None
+            
             return self.json_response({
                 'status': 'success',
                 'performance': perf_stats,
                 'cache': cache_stats,
+                'analysis_cache': analysis_cache.get_stats(),
+                'database_pool': database_pool,
+                'embeddings': get_embedding_stats(),
                 'rate_limits': rate_limits,
                 'rate_states': rate_states,
                 'timestamp': datetime.now()
@@ -13,7 +13,6 @@ This module provides the routes for the document hub redesign, including:
 import os
 import json
 import uuid
-import time
 import logging
 import threading
 from datetime import datetime
@@ -54,6 +53,17 @@ except Exception as e:
     regulatory_ai_refactored = None
     logger.info(f"Using standard Regulatory AI integration (refactored agent not available: {e})")
 
+# Background, page-by-page document processing with published progress
+try:
+    try:
+        from ...services.document_jobs import document_jobs
+    except ImportError:
+        from document_jobs import document_jobs
+    logger.info("Document processing job runner initialized")
+except Exception as e:
+    document_jobs = None
+    logger.error(f"Failed to initialize document processing job runner: {e}")
+
 # AI service functions
 def analyze_document_text(document_text: str, frameworks: List[str] = None) -> Dict[str, Any]:
     """
@@ -139,16 +149,17 @@ def process_document(file) -> Tuple[bool, str, Optional[str]]:
         upload_dir = os.path.join(current_app.root_path, 'uploads')
         os.makedirs(upload_dir, exist_ok=True)
         
-        # Secure the filename and save the file
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(upload_dir, filename)
-        file.save(file_path)
-        
         # Generate a unique ID for the document
         document_id = str(uuid.uuid4())
         
-        # In a real implementation, we would process the document,
-        # extract text, and store it in a database
+        # Secure the filename and save the file under the document ID
+        filename = secure_filename(file.filename)
+        file_path = os.path.join(upload_dir, f"{document_id}-{filename}")
+        file.save(file_path)
+        
+        # Process in the background; progress is streamed by the file assessment endpoint
+        if document_jobs:
+            document_jobs.submit(document_id, file_path)
         
         return True, "Document uploaded successfully", document_id
     except Exception as e:
@@ -248,6 +259,10 @@ def text_upload_api():
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(text_content)
         
+        # Process in the background; progress is streamed by the file assessment endpoint
+        if document_jobs and file_path.lower().endswith('.txt'):
+            document_jobs.submit(document_id, file_path)
+        
         # If regulatory AI is available, perform ethical check
         if regulatory_ai and hasattr(regulatory_ai, 'ethical_ai_enabled'):
             logger.info(f"Text content processed with Ethical AI safeguards (ID: {document_id})")
@@ -279,112 +294,22 @@ def file_assessment_api(document_id):
     if not document_id:
         return jsonify({"success": False, "message": "No document ID provided"}), 400
     
+    job = document_jobs.get(document_id) if document_jobs else None
+    if job is None:
+        return jsonify({"success": False, "message": f"No processing job found for document {document_id}"}), 404
+    
     def generate_assessment_events():
-        """Generate server-sent events for document assessment"""
+        """Relay the processing job's events as they are published"""
         # Send initial connection established event
         yield "event: connection\ndata: {\"status\": \"connected\"}\n\n"
         
-        # Extract text from document (simulation)
-        yield "event: extraction_started\ndata: {\"message\": \"Extracting text from document...\"}\n\n"
-        time.sleep(1)
-        
-        # Send extraction progress updates
-        yield "event: extraction_update\ndata: {\"message\": \"Processing document structure...\"}\n\n"
-        time.sleep(1.5)
-        
-        yield "event: extraction_update\ndata: {\"message\": \"Identifying document sections...\"}\n\n"
-        time.sleep(1)
-        
-        yield "event: extraction_complete\ndata: {\"message\": \"Text extraction complete\"}\n\n"
-        
-        # Processing phase
-        yield "event: processing_started\ndata: {\"message\": \"Processing document content...\"}\n\n"
-        time.sleep(1)
-        
-        # Send processing updates
-        processing_updates = [
-            "Analyzing sustainability metrics...",
-            "Extracting ESG key performance indicators...",
-            "Identifying carbon emission disclosures..."
-        ]
-        
-        for update in processing_updates:
-            yield f"event: processing_update\ndata: {{\"message\": \"{update}\"}}\n\n"
-            time.sleep(1.2)
-        
-        yield "event: processing_complete\ndata: {\"message\": \"Content processing complete\"}\n\n"
-        
-        # Framework assessment phase
-        yield "event: assessment_started\ndata: {\"message\": \"Starting framework assessment...\"}\n\n"
-        time.sleep(1)
-        
-        # Send assessment updates
-        assessment_updates = [
-            "Evaluating CSRD compliance...",
-            "Analyzing ESRS E1-E5 disclosures...",
-            "Checking TCFD alignment...",
-            "Verifying SFDR reporting requirements...",
-            "Assessing SASB standard adherence..."
-        ]
-        
-        for update in assessment_updates:
-            yield f"event: assessment_update\ndata: {{\"message\": \"{update}\"}}\n\n"
-            time.sleep(1.3)
-        
-        yield "event: assessment_complete\ndata: {\"message\": \"Framework assessment complete\"}\n\n"
-        
-        # Insights generation phase
-        yield "event: insights_started\ndata: {\"message\": \"Generating sustainability insights...\"}\n\n"
-        time.sleep(1)
-        
-        # Send insights updates
-        insights_updates = [
-            "Creating executive summary...",
-            "Identifying improvement opportunities...",
-            "Preparing compliance metrics...",
-            "Finalizing recommendations..."
-        ]
-        
-        for update in insights_updates:
-            yield f"event: insights_update\ndata: {{\"message\": \"{update}\"}}\n\n"
-            time.sleep(1.2)
-        
-        # Send completion event
-        yield "event: insights_complete\ndata: {\"message\": \"Insights generation complete\"}\n\n"
-        
-        # Final result event with analysis data
-        analysis_result = {
-            "document_id": document_id,
-            "completion_time": datetime.now().isoformat(),
-            "compliance_scores": {
-                "CSRD": 85,
-                "ESRS": 72,
-                "TCFD": 88,
-                "SFDR": 58,
-                "SASB": 76
-            },
-            "summary": "This document demonstrates strong alignment with CSRD requirements, with comprehensive coverage of environmental metrics and governance disclosures. The report shows good adherence to SASB industry-specific disclosure topics but lacks complete accounting metrics. There are opportunities to strengthen social impact reporting and improve quantitative target setting for biodiversity impacts.",
-            "strengths": [
-                "Detailed emissions reporting across scopes 1, 2, and 3",
-                "Strong governance disclosures with clear board oversight",
-                "Comprehensive climate transition planning",
-                "Good alignment with SASB industry-specific disclosure topics"
-            ],
-            "gaps": [
-                "Limited biodiversity impact metrics",
-                "Insufficient supply chain due diligence reporting",
-                "Lack of quantitative social impact targets",
-                "Incomplete SASB industry-specific accounting metrics"
-            ],
-            "recommendations": [
-                "Enhance biodiversity impact assessments with quantitative data",
-                "Strengthen human rights due diligence in supply chain reporting",
-                "Add interim climate transition targets for 2025 and 2030",
-                "Include all relevant SASB industry-specific accounting metrics"
-            ]
-        }
-        
-        yield f"event: result\ndata: {json.dumps(analysis_result)}\n\n"
+        for event in job.stream():
+            if event is None:
+                # Comment line keeps idle connections (and proxies) open
+                yield ": keepalive\n\n"
+                continue
+            name, data = event
+            yield f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
     
     # Return streaming response
     return Response(
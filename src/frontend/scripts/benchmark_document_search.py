@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+"""
+Document Search Benchmark
+
+Loads synthetic sustainability reports into document_store_enhanced of the
+PostgreSQL database at DATABASE_URL (under a dedicated document type, removed
+again afterwards) and pages through the results of a few queries twice: once
+with the former ``content ILIKE`` scan and OFFSET pagination, and once with
+DatabaseConnector.search_documents (full-text index, keyset pagination).
+Both paginations are then walked to the end and must return the same
+documents, each exactly once; the script exits with status 1 otherwise.
+Fuzzy company-name lookups are timed as well.
+
+Usage:
+    DATABASE_URL=postgresql://localhost/sustainatrend python benchmark_document_search.py --documents 5000
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import statistics
+
+# Add src directory to Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from psycopg2.extras import Json, RealDictCursor, execute_values
+
+from frontend.data_moat.db_connector import db_connector
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("document_search_benchmark")
+
+DOCUMENT_TYPE = 'search_benchmark'
+SENTENCES = [
+    "Scope 1 and Scope 2 greenhouse gas emissions fell by {n}% against the 2019 baseline.",
+    "Water withdrawal in water-stressed regions was reduced to {n} million cubic metres.",
+    "Renewable electricity covered {n}% of operational energy consumption.",
+    "The board approved a transition plan aligned with the Paris Agreement.",
+    "Supplier audits covered {n}% of tier one spend on human rights and labour practices.",
+    "Hazardous waste sent to landfill decreased by {n}% following process changes.",
+    "Biodiversity assessments were completed at {n} sites adjacent to protected areas.",
+    "Lost time injury frequency rate improved to {n} per million hours worked.",
+    "Double materiality assessment identified climate adaptation as a material topic.",
+    "Green bond proceeds of {n} million were allocated to eligible taxonomy activities.",
+]
+COMPANIES = ["Acme Industries", "Borealis Energy", "Cobalt Mining Group", "Delta Foods",
+             "Evergreen Logistics", "Fjord Shipping", "Granite Cement", "Helios Solar"]
+# Phrases from SENTENCES, so ILIKE and full-text search match the same documents
+QUERIES = ["water withdrawal", "protected areas", "green bond proceeds"]
+NAME_LOOKUPS = ["acme industres", "borealis", "helio solar", "granit cement"]
+
+
+def build_documents(count: int, sentences: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(count):
+        company = rng.choice(COMPANIES)
+        # Only some reports mention each topic, so queries match a fraction of the documents
+        topics = rng.sample(SENTENCES, k=4)
+        content = " ".join(rng.choice(topics).format(n=rng.randint(1, 99)) for _ in range(sentences))
+        metadata = {'company_name': f"{company} {i}", 'filename': f"{company.lower().replace(' ', '_')}_{i}.pdf"}
+        yield content, DOCUMENT_TYPE, Json(metadata)
+
+
+def load_documents(count: int, sentences: int) -> None:
+    with db_connector.pool.connection() as connection, connection.cursor() as cursor:
+        execute_values(
+            cursor,
+            "INSERT INTO document_store_enhanced (content, document_type, metadata) VALUES %s",
+            build_documents(count, sentences),
+            page_size=500
+        )
+        cursor.execute("ANALYZE document_store_enhanced")
+        connection.commit()
+
+
+def remove_documents() -> None:
+    with db_connector.pool.connection() as connection, connection.cursor() as cursor:
+        cursor.execute("DELETE FROM document_store_enhanced WHERE document_type = %s", (DOCUMENT_TYPE,))
+        connection.commit()
+
+
+def ilike_page(query: str, limit: int, offset: int):
+    """One page as it was searched before the full-text index"""
+    with db_connector.pool.connection() as connection, connection.cursor(cursor_factory=RealDictCursor) as cursor:
+        # The id tie-break keeps OFFSET pages disjoint: a bulk load shares one created_at
+        cursor.execute(
+            """
+            SELECT id, document_type, metadata, processing_status, created_at
+            FROM document_store_enhanced
+            WHERE document_type = %s AND content ILIKE %s
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s OFFSET %s
+            """,
+            (DOCUMENT_TYPE, f"%{query}%", limit, offset)
+        )
+        return cursor.fetchall()
+
+
+def time_pages(fetch_page, pages: int):
+    """Per-page latencies (ms) of walking up to ``pages`` pages"""
+    latencies, cursor = [], None
+    for number in range(pages):
+        started = time.perf_counter()
+        results, cursor = fetch_page(number, cursor)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if not results:
+            break
+    return latencies
+
+
+def collect_ids(fetch_page, max_pages: int):
+    """Ids of every result in page order, and whether an empty page was reached within ``max_pages``"""
+    ids, cursor = [], None
+    for number in range(max_pages):
+        results, cursor = fetch_page(number, cursor)
+        if not results:
+            return ids, True
+        ids.extend(result['id'] for result in results)
+    return ids, False
+
+
+def compare_results(paginations, max_pages: int) -> bool:
+    """Walk each pagination to the end; True if all return the same documents without duplicates"""
+    problems, id_sets = [], []
+    for label, fetch_page in paginations:
+        ids, finished = collect_ids(fetch_page, max_pages)
+        if not finished:
+            problems.append(f"{label} did not finish within {max_pages} pages")
+        if len(ids) != len(set(ids)):
+            problems.append(f"{label} returned {len(ids) - len(set(ids))} duplicates")
+        id_sets.append((label, set(ids)))
+    (first_label, first), (second_label, second) = id_sets
+    if first != second:
+        problems.append(f"{len(first - second)} documents only from {first_label}, "
+                        f"{len(second - first)} only from {second_label}")
+    if problems:
+        print(f"  results differ: {'; '.join(problems)}")
+    else:
+        print(f"  results: {len(first)} documents, identical across both paginations")
+    return not problems
+
+
+def report(label: str, latencies) -> None:
+    print(f"  {label:<22} pages={len(latencies):<4} first={latencies[0]:8.2f}ms "
+          f"median={statistics.median(latencies):8.2f}ms last={latencies[-1]:8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document search against a local PostgreSQL")
+    parser.add_argument("--documents", type=int, default=5000, help="Synthetic documents to load")
+    parser.add_argument("--sentences", type=int, default=400, help="Sentences per document")
+    parser.add_argument("--page-size", type=int, default=20, help="Results per page")
+    parser.add_argument("--pages", type=int, default=50, help="Pages walked per query")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic documents afterwards")
+    args = parser.parse_args()
+
+    if not db_connector.connected:
+        logger.error("No database connection; set DATABASE_URL to a local PostgreSQL")
+        sys.exit(1)
+
+    # Enough pages to list every document, plus the empty one that ends a walk
+    max_pages = args.documents // args.page_size + 2
+    consistent = True
+
+    started = time.perf_counter()
+    load_documents(args.documents, args.sentences)
+    logger.info(f"Loaded {args.documents:,} documents in {time.perf_counter() - started:.1f}s")
+
+    try:
+        for query in QUERIES:
+            print(f"query: {query!r}")
+
+            def ilike(number, _):
+                return ilike_page(query, args.page_size, number * args.page_size), None
+
+            def keyset(number, after):
+                results = db_connector.search_documents(query, DOCUMENT_TYPE, limit=args.page_size, after=after)
+                return results, ((results[-1]['rank'], results[-1]['id']) if results else None)
+
+            report("ILIKE + OFFSET", time_pages(ilike, args.pages))
+            report("full-text + keyset", time_pages(keyset, args.pages))
+            consistent &= compare_results([("ILIKE + OFFSET", ilike), ("full-text + keyset", keyset)], max_pages)
+
+        print(f"fuzzy name lookups (pg_trgm {'on' if db_connector.trigram_available else 'off'}):")
+        for name in NAME_LOOKUPS:
+            started = time.perf_counter()
+            matches = db_connector.find_documents_by_name(name, limit=args.page_size)
+            elapsed = (time.perf_counter() - started) * 1000
+            best = matches[0]['metadata'].get('company_name') if matches else '-'
+            print(f"  {name!r:<20} {elapsed:8.2f}ms  matches={len(matches):<3} best={best}")
+    finally:
+        if not args.keep:
+            remove_documents()
+
+    if not consistent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
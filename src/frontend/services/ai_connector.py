@@ -15,6 +15,12 @@ import os
 import sys
 from typing import Dict, List, Any, Optional, Union, Tuple
 
+# Shared, persistently cached embedding service
+try:
+    from .embedding_service import EmbeddingService
+except ImportError:
+    from embedding_service import EmbeddingService
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -215,6 +221,17 @@ def get_completion(prompt: str, model: str = "gpt-3.5-turbo") -> Dict[str, Any]:
         "error": True
     }
 
+def _openai_embed_batch(texts: List[str]) -> List[List[float]]:
+    """Embed texts with one OpenAI request"""
+    response = openai.embeddings.create(
+        model="text-embedding-3-small",
+        input=texts
+    )
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+# OpenAI embeddings, batched and cached by the shared embedding service
+openai_embedding_service = EmbeddingService('openai', 'text-embedding-3-small', _openai_embed_batch, source='services')
+
 def generate_embedding(text: str) -> List[float]:
     """
     Generate an embedding vector for text
@@ -226,18 +243,26 @@ def generate_embedding(text: str) -> List[float]:
         List[float]: Embedding vector
     """
     if OPENAI_AVAILABLE:
-        try:
-            response = openai.embeddings.create(
-                model="text-embedding-3-small",
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            logger.error(f"Error generating OpenAI embedding: {str(e)}")
+        embedding = openai_embedding_service.embed(text)
+        if embedding is not None:
+            return embedding
     
     # Return a zero vector if embedding fails
     return [0.0] * 1536  # Standard OpenAI embedding size
 
+def generate_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Generate embedding vectors for several texts in batched requests
+    
+    Args:
+        texts: The texts to embed
+        
+    Returns:
+        List[List[float]]: One embedding vector per text (a zero vector where embedding failed)
+    """
+    embeddings = openai_embedding_service.embed_many(texts) if OPENAI_AVAILABLE else [None] * len(texts)
+    return [embedding if embedding is not None else [0.0] * 1536 for embedding in embeddings]
+
 def semantic_search(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
     """
     Perform semantic search using Pinecone
@@ -0,0 +1,191 @@
+"""
+Document Analysis Cache for SustainaTrend™
+
+Persistent cache for document processing results. Analysts often upload the
+same annual reports, so results are keyed by a hash of the file contents
+(not its upload name) plus the processor name, processor version and
+processing options. Structured results are stored as JSON and chunk
+embeddings as ``.npy`` matrices; both live in one directory that is kept
+under a byte budget by evicting the least recently used files. Bump the
+processor version whenever extraction logic changes so old results are no
+longer served.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_DIR = os.getenv(
+    'ANALYSIS_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'sustainatrend_analysis_cache')
+)
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv('ANALYSIS_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+RESULT_SUFFIX = '.json'
+EMBEDDINGS_SUFFIX = '.npy'
+
+
+def file_hash(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Size-bounded on-disk cache of analysis results and chunk embeddings"""
+
+    def __init__(self, cache_dir: str = ANALYSIS_CACHE_DIR, max_bytes: int = ANALYSIS_CACHE_MAX_BYTES):
+        self.directory = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'embedding_hits': 0, 'embedding_misses': 0,
+                      'writes': 0, 'evictions': 0}
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """Build a key from a content hash, processor name/version and options"""
+        payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result, or None on a miss"""
+        path = self._path(key, RESULT_SUFFIX)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            self._count('misses')
+            return None
+        self._touch(path)
+        self._count('hits')
+        return result
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a JSON-serializable result"""
+        data = json.dumps(result, default=str).encode('utf-8')
+        self._write(self._path(key, RESULT_SUFFIX), lambda f: f.write(data))
+
+    def get_embeddings(self, key: str) -> Optional[np.ndarray]:
+        """Return cached chunk embeddings (one row per chunk), or None on a miss"""
+        path = self._path(key, EMBEDDINGS_SUFFIX)
+        try:
+            embeddings = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            self._count('embedding_misses')
+            return None
+        self._touch(path)
+        self._count('embedding_hits')
+        return embeddings
+
+    def set_embeddings(self, key: str, embeddings: np.ndarray) -> None:
+        """Store chunk embeddings as a float32 matrix"""
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        self._write(self._path(key, EMBEDDINGS_SUFFIX), lambda f: np.save(f, matrix, allow_pickle=False))
+
+    def delete(self, key: str) -> None:
+        """Remove the result and embeddings stored under a key"""
+        for suffix in (RESULT_SUFFIX, EMBEDDINGS_SUFFIX):
+            try:
+                os.remove(self._path(key, suffix))
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        for entry in self._entries():
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters for this process plus the current size on disk"""
+        with self.lock:
+            stats = dict(self.stats)
+        entries = self._entries()
+        stats['entries'] = len(entries)
+        stats['bytes'] = sum(entry.stat().st_size for entry in entries)
+        stats['max_bytes'] = self.max_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['timestamp'] = datetime.now().isoformat()
+        return stats
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def _entries(self):
+        try:
+            return [entry for entry in os.scandir(self.directory)
+                    if entry.is_file() and entry.name.endswith((RESULT_SUFFIX, EMBEDDINGS_SUFFIX))]
+        except OSError:
+            return []
+
+    def _write(self, path: str, write) -> None:
+        """Write atomically so concurrent workers never read a partial file, then enforce the budget"""
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write analysis cache file {path}: {str(e)}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._count('writes')
+        self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used files until the cache fits its byte budget"""
+        files = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self._count('evictions')
+            logger.info(f"Evicted {os.path.basename(path)} from the analysis cache")
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        # The modification time doubles as the last access time for eviction
+        try:
+            now = time.time()
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+
+    def _count(self, name: str) -> None:
+        with self.lock:
+            self.stats[name] += 1
+
+
+# Create a global instance
+analysis_cache = AnalysisCache()
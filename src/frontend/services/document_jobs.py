@@ -0,0 +1,235 @@
+"""
+Document Processing Jobs for SustainaTrend™
+
+Runs document processing in the background, one page at a time, and
+publishes real progress to subscribers: every processed page emits the
+metrics, frameworks and KPIs found so far, followed by the compliance
+assessment and the final result once the whole document has been analyzed.
+The hits collected per page are reused for the final analysis, so pages are
+scanned only once. Events are kept on the job, so a subscriber that connects
+late (e.g. the SSE endpoint opened after the upload request returned) first
+receives everything published so far and then follows the live stream.
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .document_processor import document_processor
+    from .pdf_extraction import iter_pages
+    from .extraction_engine import METRIC, FRAMEWORK, KPI
+except ImportError:
+    from document_processor import document_processor
+    from pdf_extraction import iter_pages
+    from extraction_engine import METRIC, FRAMEWORK, KPI
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_JOB_WORKERS = int(os.getenv('DOCUMENT_JOB_WORKERS', '2'))
+# Finished jobs (and their events) are kept this many seconds for late subscribers
+DOCUMENT_JOB_RETENTION = int(os.getenv('DOCUMENT_JOB_RETENTION', '3600'))
+# Subscribers get a keepalive (None) when nothing was published for this long
+KEEPALIVE_INTERVAL = 15
+# KPIs of each page included in its progress event
+PAGE_KPI_LIMIT = 5
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+class DocumentJob:
+    """Processing state and published events of one document"""
+
+    def __init__(self, document_id: str, file_path: str, use_ocr: bool = False):
+        self.document_id = document_id
+        self.file_path = file_path
+        self.use_ocr = use_ocr
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.events: List[Event] = []
+        self.condition = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def publish(self, name: str, data: Dict[str, Any]) -> None:
+        with self.condition:
+            self.events.append((name, data))
+            self.condition.notify_all()
+
+    def finish(self, status: str, result: Optional[Dict[str, Any]] = None) -> None:
+        with self.condition:
+            self.status = status
+            self.result = result
+            self.finished_at = time.time()
+            self.condition.notify_all()
+
+    def stream(self, keepalive: float = KEEPALIVE_INTERVAL) -> Iterator[Optional[Event]]:
+        """
+        Every event published so far, then live events until the job ends.
+
+        Blocks between events without polling; yields None after ``keepalive``
+        seconds of silence so callers can keep idle connections open.
+        """
+        index = 0
+        while True:
+            with self.condition:
+                if index >= len(self.events) and not self.done:
+                    self.condition.wait(keepalive)
+                pending = self.events[index:]
+                done = self.done
+            index += len(pending)
+
+            if not pending and not done:
+                yield None
+            for event in pending:
+                yield event
+            if done and not pending:
+                return
+
+
+class DocumentJobRunner:
+    """Background, page-by-page document processing with published progress"""
+
+    def __init__(self, processor=None, max_workers: int = DOCUMENT_JOB_WORKERS,
+                 retention: int = DOCUMENT_JOB_RETENTION):
+        self.processor = processor or document_processor
+        self.retention = retention
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='document-job')
+        self.jobs: Dict[str, DocumentJob] = {}
+        self.lock = threading.Lock()
+
+    def submit(self, document_id: str, file_path: str, use_ocr: bool = False) -> DocumentJob:
+        """Queue a document for processing and return its job"""
+        job = DocumentJob(document_id, file_path, use_ocr)
+        with self.lock:
+            self._expire()
+            self.jobs[document_id] = job
+        self.executor.submit(self._run, job)
+        return job
+
+    def get(self, document_id: str) -> Optional[DocumentJob]:
+        with self.lock:
+            return self.jobs.get(document_id)
+
+    def _expire(self) -> None:
+        # Caller holds the lock
+        cutoff = time.time() - self.retention
+        for document_id in [d for d, job in self.jobs.items() if job.done and job.finished_at < cutoff]:
+            del self.jobs[document_id]
+
+    def _run(self, job: DocumentJob) -> None:
+        job.status = 'running'
+        try:
+            job.publish('extraction_started', {'message': 'Extracting text from document...'})
+            result = self.processor.get_cached_result(job.file_path, job.use_ocr)
+            if result is None:
+                result = self._process_pages(job)
+            else:
+                job.publish('extraction_complete', {'message': 'Text extraction complete',
+                                                    'page_count': result.get('page_count', 0)})
+                job.publish('processing_started', {'message': 'Loaded previous analysis of this document'})
+
+            self._publish_result(job, result)
+            job.finish('complete', result)
+        except Exception as e:
+            logger.error(f"Error processing document {job.document_id}: {str(e)}")
+            job.publish('analysis_error', {'message': f"Error processing document: {str(e)}"})
+            job.finish('failed')
+
+    def _pages(self, job: DocumentJob) -> Iterator[Tuple[int, int, str]]:
+        if job.file_path.lower().endswith('.pdf'):
+            return iter_pages(job.file_path, job.use_ocr)
+        if job.file_path.lower().endswith('.txt'):
+            with open(job.file_path, 'r', encoding='utf-8', errors='replace') as f:
+                return iter([(1, 1, f.read())])
+        raise ValueError(f"Unsupported document type: {os.path.splitext(job.file_path)[1] or 'unknown'}")
+
+    def _process_pages(self, job: DocumentJob) -> Dict[str, Any]:
+        engine = self.processor.extraction_engine
+        parts: List[str] = []
+        hits = []
+        offset = 0
+        page_count = 0
+        metrics_found = {category: 0 for category in self.processor.metrics_patterns}
+        frameworks_detected: Dict[str, int] = {}
+        kpis_found = 0
+
+        for number, page_count, page_text in self._pages(job):
+            # Same layout as PageExtraction.joined_text, so offsets match the final text
+            marker = f"\n--- Page {number} ---\n"
+            offset += len(marker)
+            page_hits = engine.scan_page(page_text, number, offset)
+            parts.extend((marker, page_text))
+            offset += len(page_text)
+            hits.extend(page_hits)
+
+            page_kpis = []
+            for hit in page_hits:
+                if hit.kind == METRIC:
+                    metrics_found[hit.label] += 1
+                elif hit.kind == FRAMEWORK:
+                    frameworks_detected[hit.label] = frameworks_detected.get(hit.label, 0) + 1
+                elif hit.kind == KPI:
+                    kpis_found += 1
+                    if len(page_kpis) < PAGE_KPI_LIMIT:
+                        page_kpis.append({'value': hit.value, 'unit': hit.label})
+
+            job.publish('page_processed', {
+                'page': number,
+                'page_count': page_count,
+                'progress': round(number / page_count * 100) if page_count else 100,
+                'metrics_found': dict(metrics_found),
+                'frameworks_detected': dict(frameworks_detected),
+                'kpis_found': kpis_found,
+                'page_kpis': page_kpis
+            })
+
+        text = ''.join(parts)
+        job.publish('extraction_complete', {'message': 'Text extraction complete', 'page_count': page_count})
+        job.publish('processing_started', {'message': 'Processing document content...'})
+        return self.processor.process_extracted_text(job.file_path, text, page_count, job.use_ocr,
+                                                     scan=engine.assemble(text, hits))
+
+    def _publish_result(self, job: DocumentJob, result: Dict[str, Any]) -> None:
+        metrics = {category: len(mentions) for category, mentions in result.get('metrics', {}).items()}
+        frameworks = {name: count for name, count in result.get('frameworks', {}).items() if count}
+        job.publish('processing_complete', {'message': 'Content processing complete',
+                                            'metrics_found': metrics, 'frameworks_detected': frameworks})
+
+        analysis = result.get('analysis', {})
+        compliance = analysis.get('compliance_assessment', {})
+        job.publish('assessment_started', {'message': 'Starting framework assessment...'})
+        for framework, score in compliance.get('framework_scores', {}).items():
+            job.publish('assessment_update', {'message': f"{framework} compliance: {round(score)}%",
+                                              'framework': framework, 'score': score})
+        job.publish('assessment_complete', {'message': 'Framework assessment complete'})
+
+        # The result goes out before insights_complete, which clients treat as the end of the stream
+        job.publish('result', {
+            'document_id': job.document_id,
+            'completion_time': datetime.now().isoformat(),
+            'cached': bool(result.get('cached')),
+            'page_count': result.get('page_count', 0),
+            'word_count': result.get('word_count', 0),
+            'metrics_found': metrics,
+            'frameworks_detected': frameworks,
+            'kpis': [{'value': kpi['value'], 'unit': kpi['unit'], 'page': kpi.get('page')}
+                     for kpi in result.get('kpis', [])[:50]],
+            'compliance_scores': compliance.get('framework_scores', {}),
+            'overall_compliance': compliance.get('overall_compliance'),
+            'summary': analysis.get('summary', ''),
+            'recommendations': compliance.get('key_recommendations', [])
+        })
+        job.publish('insights_complete', {'message': 'Insights generation complete'})
+
+
+# Create a global instance
+document_jobs = DocumentJobRunner()
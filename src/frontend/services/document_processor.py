@@ -9,6 +9,7 @@ import os
 import uuid
 import json
 import re
+import hashlib
 import numpy as np
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple, Union
@@ -138,6 +139,43 @@ except ImportError as e:
     COMPLIANCE_CHECK_AVAILABLE = False
     logging.warning(f"Compliance check functionality not available. Using mock implementations. Error: {str(e)}")
 
+# Page-parallel PDF extraction
+try:
+    from .pdf_extraction import extract_pages
+except ImportError:
+    from pdf_extraction import extract_pages
+
+# Single-pass metric, framework, KPI, reference and heading extraction
+try:
+    from .extraction_engine import (
+        ExtractionEngine, DocumentScan, METRIC, FRAMEWORK, KPI, REFERENCE, HEADING, TABLE_REFERENCE_TYPES
+    )
+except ImportError:
+    from extraction_engine import (
+        ExtractionEngine, DocumentScan, METRIC, FRAMEWORK, KPI, REFERENCE, HEADING, TABLE_REFERENCE_TYPES
+    )
+
+# Persistent cache of analysis results, keyed by file content
+try:
+    from .analysis_cache import analysis_cache, file_hash
+except ImportError:
+    from analysis_cache import analysis_cache, file_hash
+
+# Per-document chunk retrieval for RAG answers
+try:
+    from .retrieval_index import (
+        RetrievalIndex, HashingEmbedder, OpenAIEmbedder, RAG_EMBEDDER, RAG_TOP_K, RAG_CONTEXT_TOKENS,
+        document_indexes
+    )
+except ImportError:
+    from retrieval_index import (
+        RetrievalIndex, HashingEmbedder, OpenAIEmbedder, RAG_EMBEDDER, RAG_TOP_K, RAG_CONTEXT_TOKENS,
+        document_indexes
+    )
+
+# Bump whenever extraction or analysis output changes, so cached results are not reused
+PROCESSOR_VERSION = '2.0'
+
 # Create upload directory if it doesn't exist
 UPLOAD_DIR = os.path.join(os.path.dirname(__file__), 'uploads')
 if not os.path.exists(UPLOAD_DIR):
@@ -217,6 +255,16 @@ class DocumentProcessor:
             'IIRC': ['IIRC', 'International Integrated Reporting Council'],
             'ISO': ['ISO 14001', 'ISO 26000', 'ISO 50001']
         }
+        
+        # Compile all extraction patterns once
+        self.extraction_engine = ExtractionEngine(self.metrics_patterns, self.frameworks)
+        
+        # Results of previously processed files
+        self.analysis_cache = analysis_cache
+        
+        # Chunk embeddings for RAG retrieval; recently queried documents stay loaded in the shared registry
+        self.embedder = self._create_embedder()
+        self.retrieval_indexes = document_indexes
     
     def process_document(self, file_path: str, use_ocr: bool = False) -> Dict[str, Any]:
         """
@@ -230,50 +278,15 @@ class DocumentProcessor:
             Processing result with extracted text, metadata, and audit capabilities
         """
         try:
+            # Repeat uploads of the same file are served from the analysis cache
+            cached = self.get_cached_result(file_path, use_ocr)
+            if cached is not None:
+                return cached
+            
             # Extract text from document
             text, page_count = self.extract_text(file_path, use_ocr)
             
-            # Basic document analysis
-            word_count = len(text.split())
-            file_size = os.path.getsize(file_path)
-            
-            # Extract tables, figures and references
-            figures = self._extract_figures_and_tables_references(text)
-            tables = self._extract_table_references(text)
-            
-            # Identify metrics, standards and KPIs
-            metrics = self._identify_sustainability_metrics(text)
-            frameworks = self._identify_frameworks(text)
-            kpis = self._extract_numerical_kpis(text)
-            
-            # Prepare document structure for querying
-            document_structure = self._create_document_structure(text, page_count)
-            
-            # Chunk document for RAG processing
-            chunks = self.chunk_document(text)
-            
-            # Analyze and index document content
-            analysis_results = self.analyze_document(text)
-            
-            # Return the enhanced processing result
-            return {
-                'success': True,
-                'text': text,
-                'page_count': page_count,
-                'word_count': word_count,
-                'file_size': file_size,
-                'preview': text[:1000] + '...' if len(text) > 1000 else text,
-                'figures': figures,
-                'tables': tables,
-                'metrics': metrics,
-                'frameworks': frameworks,
-                'kpis': kpis,
-                'document_structure': document_structure,
-                'chunks': len(chunks),
-                'analysis': analysis_results,
-                'audit_ready': True,
-                'timestamp': datetime.now().isoformat()
-            }
+            return self.process_extracted_text(file_path, text, page_count, use_ocr)
         except Exception as e:
             self.logger.error(f"Error processing document: {str(e)}")
             return {
@@ -281,6 +294,89 @@ class DocumentProcessor:
                 'error': str(e)
             }
     
+    def get_cached_result(self, file_path: str, use_ocr: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Look up the processing result of an identical, previously processed file
+        
+        Args:
+            file_path: Path to the document file
+            use_ocr: Whether OCR was requested
+            
+        Returns:
+            Cached processing result, or None if the file has not been processed
+        """
+        cached = self.analysis_cache.get(self._cache_key(file_path, use_ocr))
+        if cached is not None:
+            self.logger.info(f"Serving cached analysis for {os.path.basename(file_path)}")
+            cached['cached'] = True
+        return cached
+    
+    def process_extracted_text(self, file_path: str, text: str, page_count: int,
+                               use_ocr: bool = False, scan: Optional[DocumentScan] = None) -> Dict[str, Any]:
+        """
+        Analyze already extracted document text and cache the result
+        
+        Args:
+            file_path: Path to the document file the text was extracted from
+            text: Extracted text with page markers
+            page_count: Number of pages in the document
+            use_ocr: Whether OCR was used during extraction
+            scan: Hit stream of the text, e.g. collected page by page, scanned here if not given
+            
+        Returns:
+            Processing result with extracted text, metadata, and audit capabilities
+        """
+        # Basic document analysis
+        word_count = len(text.split())
+        file_size = os.path.getsize(file_path)
+        
+        # Scan every page once; all extraction steps below read this hit stream
+        if scan is None:
+            scan = self.scan_document(text)
+        
+        # Extract tables, figures and references
+        figures = self._extract_figures_and_tables_references(text, scan)
+        tables = self._extract_table_references(text, scan)
+        
+        # Identify metrics, standards and KPIs
+        metrics = self._identify_sustainability_metrics(text, scan)
+        frameworks = self._identify_frameworks(text, scan)
+        kpis = self._extract_numerical_kpis(text, scan)
+        
+        # Prepare document structure for querying
+        document_structure = self._create_document_structure(text, page_count, scan)
+        
+        # Chunk and embed the document once, so questions only embed the query
+        retrieval_index = self.build_retrieval_index(text)
+        
+        # Analyze and index document content
+        analysis_results = self.analyze_document(text, scan)
+        
+        # Return the enhanced processing result
+        result = {
+            'success': True,
+            'text': text,
+            'page_count': page_count,
+            'word_count': word_count,
+            'file_size': file_size,
+            'preview': text[:1000] + '...' if len(text) > 1000 else text,
+            'figures': figures,
+            'tables': tables,
+            'metrics': metrics,
+            'frameworks': frameworks,
+            'kpis': kpis,
+            'document_structure': document_structure,
+            'chunks': len(retrieval_index.chunks),
+            'analysis': analysis_results,
+            'audit_ready': True,
+            'timestamp': datetime.now().isoformat()
+        }
+        self.analysis_cache.set(self._cache_key(file_path, use_ocr), result)
+        return result
+    
+    def _cache_key(self, file_path: str, use_ocr: bool) -> str:
+        return self.analysis_cache.key(file_hash(file_path), type(self).__name__, PROCESSOR_VERSION, use_ocr)
+    
     def extract_text(self, file_path: str, use_ocr: bool = False) -> Tuple[str, int]:
         """
         Extract text from a PDF document
@@ -296,51 +392,34 @@ class DocumentProcessor:
             return "PyMuPDF not available. Cannot extract text from PDF.", 0
         
         try:
-            doc = fitz.open(file_path)
-            text = ""
-            page_count = len(doc)
-            
-            for page_num in range(page_count):
-                page = doc[page_num]
-                page_text = page.get_text()
-                
-                # If page has minimal text and OCR is enabled, apply OCR
-                if len(page_text.strip()) < 50 and use_ocr and OCR_AVAILABLE and Image is not None and pytesseract is not None:
-                    try:
-                        pix = page.get_pixmap()
-                        img_data = pix.tobytes()
-                        
-                        # Create PIL Image from bytes - use tuple instead of list for dimensions
-                        img = Image.frombytes("RGB", (pix.width, pix.height), img_data)
-                        
-                        # Apply OCR
-                        page_text = pytesseract.image_to_string(img)
-                    except Exception as e:
-                        self.logger.warning(f"OCR processing failed: {str(e)}")
-                        # Keep the original text if OCR fails
-                
-                text += f"\n--- Page {page_num + 1} ---\n{page_text}"
-            
-            return text, page_count
+            # Pages are extracted (and OCR'd where needed) in parallel, then joined once in order
+            extraction = extract_pages(file_path, use_ocr)
+            if extraction.ocr_pages:
+                self.logger.info(f"Applied OCR to {len(extraction.ocr_pages)} of {extraction.page_count} pages")
+            return extraction.joined_text(), extraction.page_count
             
         except Exception as e:
             self.logger.error(f"Error extracting text: {str(e)}")
             raise
     
-    def analyze_document(self, text: str) -> Dict[str, Any]:
+    def analyze_document(self, text: str, scan: Optional[DocumentScan] = None) -> Dict[str, Any]:
         """
         Analyze the document text for sustainability metrics and insights
         
         Args:
             text: Extracted document text
+            scan: Hit stream of the text, scanned here if not given
             
         Returns:
             Analysis results with metrics, frameworks, and insights
         """
+        if scan is None:
+            scan = self.scan_document(text)
+        
         results = {
-            'metrics_identified': self._identify_sustainability_metrics(text),
-            'frameworks_mentioned': self._identify_frameworks(text),
-            'numerical_kpis': self._extract_numerical_kpis(text),
+            'metrics_identified': self._identify_sustainability_metrics(text, scan),
+            'frameworks_mentioned': self._identify_frameworks(text, scan),
+            'numerical_kpis': self._extract_numerical_kpis(text, scan),
             'summary': self._generate_executive_summary(text)
         }
         
@@ -505,187 +584,153 @@ class DocumentProcessor:
         
         return assessment_result
     
-    def _identify_sustainability_metrics(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
+    def scan_document(self, text: str) -> DocumentScan:
+        """
+        Scan the document text once for metrics, frameworks, KPIs, references and headings
+        
+        Args:
+            text: Document text with page markers
+            
+        Returns:
+            Hit stream with page numbers and offsets, shared by the extraction steps
+        """
+        return self.extraction_engine.scan(text)
+    
+    def _identify_sustainability_metrics(self, text: str, scan: Optional[DocumentScan] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
         Identify sustainability metrics mentioned in the text
         
         Args:
             text: Document text
+            scan: Hit stream of the text, scanned here if not given
             
         Returns:
             Dictionary of metrics by category
         """
-        text_lower = text.lower()
-        results = {}
-        
-        for category, patterns in self.metrics_patterns.items():
-            mentions = []
-            for pattern in patterns:
-                matches = re.finditer(pattern, text_lower)
-                for match in matches:
-                    # Get context (50 chars before and after)
-                    start = max(0, match.start() - 50)
-                    end = min(len(text_lower), match.end() + 50)
-                    context = text_lower[start:end]
-                    
-                    mentions.append({
-                        'pattern': pattern,
-                        'context': context,
-                        'position': match.start()
-                    })
-            
-            results[category] = mentions
+        if scan is None:
+            scan = self.scan_document(text)
+        results = {category: [] for category in self.metrics_patterns}
+        
+        for hit in scan.of_kind(METRIC):
+            results[hit.label].append({
+                'pattern': hit.value,
+                'context': scan.context(hit, 50).lower(),
+                'position': hit.start,
+                'page': hit.page
+            })
             
         return results
     
-    def _identify_frameworks(self, text: str) -> Dict[str, int]:
+    def _identify_frameworks(self, text: str, scan: Optional[DocumentScan] = None) -> Dict[str, int]:
         """
         Identify sustainability frameworks mentioned in the text
         
         Args:
             text: Document text
+            scan: Hit stream of the text, scanned here if not given
             
         Returns:
             Dictionary of framework mentions
         """
-        text_upper = text.upper()
-        results = {}
+        if scan is None:
+            scan = self.scan_document(text)
+        results = {framework: 0 for framework in self.frameworks}
         
-        for framework, keywords in self.frameworks.items():
-            mentions = []
-            for keyword in keywords:
-                positions = [m.start() for m in re.finditer(keyword.upper(), text_upper)]
-                mentions.extend(positions)
-            
-            results[framework] = len(mentions)
+        for hit in scan.of_kind(FRAMEWORK):
+            results[hit.label] += 1
             
         return results
     
-    def _extract_numerical_kpis(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_numerical_kpis(self, text: str, scan: Optional[DocumentScan] = None) -> List[Dict[str, Any]]:
         """
         Extract numerical KPIs with context from the text
         
         Args:
             text: Document text
+            scan: Hit stream of the text, scanned here if not given
             
         Returns:
             List of KPIs with values and context
         """
-        # Pattern to find numbers with units
-        patterns = [
-            r'(\d+(?:\.\d+)?)\s*(%)',  # Percentages
-            r'(\d+(?:\.\d+)?)\s*(tons?|t)\s+(?:of\s+)?(?:CO2|carbon)',  # Carbon tonnage
-            r'(\d+(?:\.\d+)?)\s*(GWh|kWh|MWh)',  # Energy units
-            r'(\d+(?:\.\d+)?)\s*(m3|cubic meters?|liters?|gallons?)',  # Water units
+        if scan is None:
+            scan = self.scan_document(text)
+        
+        return [
+            {
+                'value': hit.value,
+                'unit': hit.label,
+                'context': scan.context(hit, 100),
+                'page': hit.page,
+                'position': hit.start
+            }
+            for hit in scan.of_kind(KPI)
         ]
-        
-        kpis = []
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Get context (100 chars before and after)
-                start = max(0, match.start() - 100)
-                end = min(len(text), match.end() + 100)
-                context = text[start:end]
-                
-                kpis.append({
-                    'value': match.group(1),
-                    'unit': match.group(2),
-                    'context': context
-                })
-                
-        return kpis
     
-    def _extract_figures_and_tables_references(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_figures_and_tables_references(self, text: str, scan: Optional[DocumentScan] = None) -> List[Dict[str, Any]]:
         """
-        Extract references to figures and charts from the document
+        Extract references to figures, charts and tables from the document
         
         Args:
             text: Document text
+            scan: Hit stream of the text, scanned here if not given
             
         Returns:
             List of figure references with context
         """
-        # Patterns to match figure references
-        figure_patterns = [
-            r'(figure|fig\.?)\s+(\d+(?:\.\d+)?)',
-            r'(chart|graph|diagram)\s+(\d+(?:\.\d+)?)',
-            r'(table|tbl\.?)\s+(\d+(?:\.\d+)?)'
+        if scan is None:
+            scan = self.scan_document(text)
+        
+        return [
+            {
+                'type': hit.label,
+                'number': hit.value,
+                'page': hit.page,
+                'context': scan.context(hit, 100),
+                'position': hit.start
+            }
+            for hit in scan.of_kind(REFERENCE)
         ]
-        
-        figures = []
-        # Search for figures using regex
-        for pattern in figure_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Get page number from nearby text
-                page_match = re.search(r'page\s+(\d+)', text[max(0, match.start()-50):match.end()+50], re.IGNORECASE)
-                page = page_match.group(1) if page_match else "unknown"
-                
-                # Get context (100 chars before and after)
-                start = max(0, match.start() - 100)
-                end = min(len(text), match.end() + 100)
-                context = text[start:end]
-                
-                figures.append({
-                    'type': match.group(1).lower(),
-                    'number': match.group(2),
-                    'page': page,
-                    'context': context,
-                    'position': match.start()
-                })
-        
-        return figures
 
-    def _extract_table_references(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_table_references(self, text: str, scan: Optional[DocumentScan] = None) -> List[Dict[str, Any]]:
         """
         Extract references to tables from the document
         
         Args:
             text: Document text
+            scan: Hit stream of the text, scanned here if not given
             
         Returns:
             List of table references with context
         """
-        # Pattern to match table references
-        table_pattern = r'(table|tbl\.?)\s+(\d+(?:\.\d+)?)'
-        
-        tables = []
-        # Search for tables using regex
-        matches = re.finditer(table_pattern, text, re.IGNORECASE)
-        for match in matches:
-            # Get page number from nearby text
-            page_match = re.search(r'page\s+(\d+)', text[max(0, match.start()-50):match.end()+50], re.IGNORECASE)
-            page = page_match.group(1) if page_match else "unknown"
-            
-            # Get context (100 chars before and after)
-            start = max(0, match.start() - 100)
-            end = min(len(text), match.end() + 100)
-            context = text[start:end]
-            
-            tables.append({
-                'type': 'table',
-                'number': match.group(2),
-                'page': page,
-                'context': context,
-                'position': match.start()
-            })
+        if scan is None:
+            scan = self.scan_document(text)
         
-        return tables
+        return [
+            {
+                'type': 'table',
+                'number': hit.value,
+                'page': hit.page,
+                'context': scan.context(hit, 100),
+                'position': hit.start
+            }
+            for hit in scan.of_kind(REFERENCE)
+            if hit.label in TABLE_REFERENCE_TYPES
+        ]
         
-    def _create_document_structure(self, text: str, page_count: int) -> Dict[str, Any]:
+    def _create_document_structure(self, text: str, page_count: int, scan: Optional[DocumentScan] = None) -> Dict[str, Any]:
         """
         Create a structured representation of the document for querying
         
         Args:
             text: Document text
             page_count: Number of pages in the document
+            scan: Hit stream of the text, scanned here if not given
             
         Returns:
             Document structure with sections, headings, and page mappings
         """
-        # Extract headings using regex
-        heading_pattern = r'^\s*(#+|\d+(?:\.\d+)*)\s+(.+)$'
+        if scan is None:
+            scan = self.scan_document(text)
         
         structure = {
             'page_count': page_count,
@@ -693,79 +738,46 @@ class DocumentProcessor:
             'sections': []
         }
         
-        # Split text by pages (based on page markers we inserted during extraction)
-        pages = []
-        current_page_text = ""
-        current_page_num = 1
-        
-        for line in text.split('\n'):
-            page_marker_match = re.match(r'---\s+Page\s+(\d+)\s+---', line)
-            if page_marker_match:
-                if current_page_text:
-                    pages.append({
-                        'number': current_page_num,
-                        'text': current_page_text
-                    })
-                current_page_num = int(page_marker_match.group(1))
-                current_page_text = ""
-            else:
-                current_page_text += line + "\n"
-        
-        # Add the last page if it exists
-        if current_page_text:
-            pages.append({
-                'number': current_page_num,
-                'text': current_page_text
-            })
-            
-        structure['pages'] = pages
+        # Pages as delimited by the page markers inserted during extraction
+        structure['pages'] = [
+            {'number': number, 'text': page_text}
+            for number, page_text in scan.page_texts()
+        ]
         
-        # Extract headings and sections from text
-        lines = text.split('\n')
+        # Sections run from one heading line to the next
         current_section = {"title": "Document Start", "content": "", "level": 0, "page": 1}
-        
-        for line in lines:
-            # Check if this is a page marker
-            page_marker_match = re.match(r'---\s+Page\s+(\d+)\s+---', line)
-            if page_marker_match:
-                current_page = int(page_marker_match.group(1))
-                continue
-                
-            # Check if this is a heading
-            heading_match = re.match(heading_pattern, line)
-            if heading_match:
-                # Save previous section if it has content
-                if current_section["content"].strip():
-                    structure['sections'].append(current_section)
-                
-                # Start new section
-                level_marker = heading_match.group(1)
-                title = heading_match.group(2)
-                
-                # Determine heading level
-                if level_marker.startswith('#'):
-                    level = len(level_marker)
-                else:
-                    # For numbered headings, count the number of dots plus 1
-                    level = level_marker.count('.') + 1
-                
-                structure['headings'].append({
-                    'title': title,
-                    'level': level,
-                    'page': current_page
-                })
-                
-                current_section = {
-                    "title": title,
-                    "content": "",
-                    "level": level,
-                    "page": current_page
-                }
+        section_start = 0
+        
+        for hit in scan.of_kind(HEADING):
+            # Save previous section if it has content
+            current_section["content"] = scan.lines_text(section_start, hit.start)
+            if current_section["content"].strip():
+                structure['sections'].append(current_section)
+            
+            # Determine heading level
+            level_marker = hit.value
+            if level_marker.startswith('#'):
+                level = len(level_marker)
             else:
-                # Add line to current section
-                current_section["content"] += line + "\n"
+                # For numbered headings, count the number of dots plus 1
+                level = level_marker.count('.') + 1
+            
+            structure['headings'].append({
+                'title': hit.label,
+                'level': level,
+                'page': hit.page
+            })
+            
+            current_section = {
+                "title": hit.label,
+                "content": "",
+                "level": level,
+                "page": hit.page
+            }
+            section_start = min(hit.end + 1, len(text))
         
         # Add the last section
+        current_section["content"] = scan.lines_text(section_start, len(text))
         if current_section["content"].strip():
             structure['sections'].append(current_section)
             
@@ -855,9 +867,54 @@ class DocumentProcessor:
         # Add the last chunk if it's not empty
         if current_chunk:
             chunks.append(current_chunk)
-            
+
         return chunks
-    
+
+    def build_retrieval_index(self, text: str) -> RetrievalIndex:
+        """
+        Chunk a document and embed its chunks, or load them if already embedded
+
+        Embeddings are stored in the analysis cache keyed by the text and the
+        embedder, so each document is embedded once and later questions reuse it.
+        Built indexes stay in the shared retrieval index registry while in use.
+
+        Args:
+            text: Full document text
+
+        Returns:
+            Retrieval index of the document; keyword-only if embedding failed
+        """
+        key = self.analysis_cache.key(
+            hashlib.sha256(text.encode('utf-8')).hexdigest(), 'retrieval_index', self.embedder.name
+        )
+
+        def build() -> RetrievalIndex:
+            chunks = self.chunk_document(text)
+            embeddings = self.analysis_cache.get_embeddings(key)
+            if embeddings is None or len(embeddings) != len(chunks):
+                try:
+                    embeddings = self.embedder.embed(chunks)
+                    self.analysis_cache.set_embeddings(key, embeddings)
+                except Exception as e:
+                    self.logger.warning(f"Could not embed document chunks, using keyword retrieval: {str(e)}")
+                    embeddings = None
+            return RetrievalIndex(chunks, embeddings, self.embedder.name)
+
+        index, _ = self.retrieval_indexes.get_or_build(key, build)
+        if index.embeddings is None:
+            # Keyword-only fallback: let the next request try embedding again
+            self.retrieval_indexes.discard(key)
+        return index
+
+    def _create_embedder(self):
+        """OpenAI embeddings when configured (see RAG_EMBEDDER), otherwise the deterministic local embedder"""
+        api_key = os.environ.get("trendsense_openai_api") or os.environ.get("OPENAI_API_KEY")
+        if RAG_EMBEDDER != 'local' and OPENAI_AVAILABLE and api_key:
+            return OpenAIEmbedder(OpenAI(api_key=api_key))
+        if RAG_EMBEDDER == 'openai':
+            self.logger.warning("OpenAI embeddings requested but OpenAI is not available. Using local embeddings.")
+        return HashingEmbedder()
+
     def generate_rag_response(self, document_text: str, query: str) -> Dict[str, Any]:
         """
         Generate a RAG-enhanced response to a sustainability query
@@ -874,8 +931,9 @@ class DocumentProcessor:
             return self._generate_mock_rag_response(document_text, query)
             
         try:
-            # Chunk the document for processing
-            chunks = self.chunk_document(document_text)
+            # Most relevant chunks within the context budget; the index is normally built at processing time
+            index = self.build_retrieval_index(document_text)
+            selected, retrieval = index.select(query, self.embedder, RAG_TOP_K, RAG_CONTEXT_TOKENS)
             
             # Prepare system message with context about sustainability
             system_message = (
@@ -886,9 +944,8 @@ class DocumentProcessor:
                 "regulatory compliance, and industry benchmarks."
             )
             
-            # Build prompt with document chunks as context
-            # Use a simplified version without embeddings for now
-            context = "\n\n=====\n\n".join(chunks[:3])  # Include first few chunks for simplicity
+            # Build prompt with the selected chunks, in document order, as context
+            context = "\n\n=====\n\n".join(chunk.text for chunk in selected)
             
             user_prompt = f"""
             Please analyze the following sustainability report content and answer this question:
@@ -934,7 +991,10 @@ class DocumentProcessor:
                     'success': True,
                     'response': ai_response,
                     'metrics_extracted': metrics,
-                    'chunks_analyzed': len(chunks),
+                    'chunks_analyzed': len(index.chunks),
+                    'chunks_used': len(selected),
+                    'retrieval': retrieval,
+                    'sources': [{'chunk': chunk.index, 'score': round(chunk.score, 4)} for chunk in selected],
                     'query': query
                 }
             except Exception as e:
@@ -1287,13 +1347,24 @@ class DocumentProcessor:
     def _generate_mock_rag_response(self, document_text: str, query: str) -> Dict[str, Any]:
         """Generate a mock RAG response when OpenAI is not available"""
         # Extract sustainability metrics to use in the response
-        metrics = self._identify_sustainability_metrics(document_text)
-        frameworks = self._identify_frameworks(document_text)
-        kpis = self._extract_numerical_kpis(document_text)
+        scan = self.scan_document(document_text)
+        metrics = self._identify_sustainability_metrics(document_text, scan)
+        frameworks = self._identify_frameworks(document_text, scan)
+        kpis = self._extract_numerical_kpis(document_text, scan)
+        
+        # Passages most relevant to the question
+        index = self.build_retrieval_index(document_text)
+        selected, retrieval = index.select(query, self.embedder, RAG_TOP_K, RAG_CONTEXT_TOKENS)
         
         # Construct a reasonable mock response based on extracted data
         response_parts = ["## Sustainability Analysis\n\n"]
         
+        if selected:
+            response_parts.append("### Relevant Passages\n\n")
+            for chunk in sorted(selected, key=lambda chunk: -chunk.score)[:3]:
+                excerpt = ' '.join(chunk.text.split())
+                response_parts.append(f"> {excerpt[:300]}{'...' if len(excerpt) > 300 else ''}\n\n")
+        
         if "risk" in query.lower() or "risks" in query.lower():
             response_parts.append("### Key Sustainability Risks\n\n")
             response_parts.append("Based on the document analysis, the following sustainability risks were identified:\n\n")
@@ -1354,7 +1425,10 @@ class DocumentProcessor:
             'success': True,
             'response': ''.join(response_parts),
             'metrics_extracted': metrics,
-            'chunks_analyzed': 3,
+            'chunks_analyzed': len(index.chunks),
+            'chunks_used': len(selected),
+            'retrieval': retrieval,
+            'sources': [{'chunk': chunk.index, 'score': round(chunk.score, 4)} for chunk in selected],
             'query': query
         }
     
@@ -0,0 +1,382 @@
+"""
+Embedding Service for SustainaTrend™
+
+Shared embedding path for the AI connectors. Texts are embedded in batches,
+duplicates within a batch are embedded once, and every vector is kept in a
+persistent SQLite cache keyed by provider, model and a hash of the text, so
+the same chunk or query is not sent to a provider again - across documents,
+RAG calls, searches, connectors and restarts.
+
+Single-text requests are coalesced: concurrent ``embed`` calls that miss the
+cache wait a few milliseconds for each other and go to the provider as one
+micro-batch. Every service reports its cache hit rate, batch sizes and
+provider latency.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_PATH = os.getenv(
+    'EMBEDDING_CACHE_PATH',
+    os.path.join(tempfile.gettempdir(), 'sustainatrend_embeddings.sqlite3')
+)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '200000'))
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv('EMBEDDING_MAX_BATCH_SIZE', '64'))
+# How long a single-text request waits for others to share its provider call; 0 disables coalescing
+EMBEDDING_MAX_WAIT_MS = float(os.getenv('EMBEDDING_MAX_WAIT_MS', '10'))
+# Cache writes between checks of the entry limit
+EVICTION_CHECK_INTERVAL = 1000
+# Content hashes per SQLite lookup (SQLite limits bound parameters per statement)
+LOOKUP_BATCH_SIZE = 500
+# Seconds a coalesced request waits for its micro-batch before giving up
+REQUEST_TIMEOUT = 120
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of a text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent content-hash to vector cache, namespaced by provider and model, bounded by entry count"""
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.connection: Optional[sqlite3.Connection] = None
+        self.writes_since_check = 0
+        self.stats = {'reads': 0, 'writes': 0, 'evictions': 0, 'errors': 0}
+
+    def get_many(self, namespace: str, hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """
+        Look up cached vectors
+
+        Args:
+            namespace: Provider and model the vectors were computed with
+            hashes: Content hashes of the texts
+
+        Returns:
+            Vectors by content hash, for the hashes that are cached
+        """
+        found: Dict[str, List[float]] = {}
+        if not hashes:
+            return found
+        now = time.time()
+        try:
+            with self.lock:
+                connection = self._connect()
+                for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+                    batch = list(hashes[start:start + LOOKUP_BATCH_SIZE])
+                    placeholders = ','.join('?' * len(batch))
+                    rows = connection.execute(
+                        f"SELECT content_hash, vector FROM embeddings "
+                        f"WHERE namespace = ? AND content_hash IN ({placeholders})",
+                        [namespace] + batch
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+                if found:
+                    # The last use time drives eviction
+                    connection.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE namespace = ? AND content_hash = ?",
+                        [(now, namespace, key) for key in found]
+                    )
+                    connection.commit()
+                self.stats['reads'] += len(hashes)
+        except sqlite3.Error as e:
+            self._error(f"Could not read embedding cache: {str(e)}")
+        return found
+
+    def set_many(self, namespace: str, vectors: Dict[str, List[float]]) -> None:
+        """Store vectors by content hash"""
+        if not vectors:
+            return
+        now = time.time()
+        rows = [(namespace, key, len(vector), np.asarray(vector, dtype=np.float32).tobytes(), now)
+                for key, vector in vectors.items()]
+        try:
+            with self.lock:
+                connection = self._connect()
+                connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (namespace, content_hash, dimensions, vector, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                connection.commit()
+                self.stats['writes'] += len(rows)
+                self.writes_since_check += len(rows)
+                if self.writes_since_check >= EVICTION_CHECK_INTERVAL:
+                    self.writes_since_check = 0
+                    self._evict(connection)
+        except sqlite3.Error as e:
+            self._error(f"Could not write embedding cache: {str(e)}")
+
+    def clear(self) -> None:
+        """Remove every cached vector"""
+        try:
+            with self.lock:
+                connection = self._connect()
+                connection.execute("DELETE FROM embeddings")
+                connection.commit()
+        except sqlite3.Error as e:
+            self._error(f"Could not clear embedding cache: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        """Read/write counters for this process plus the current cache size"""
+        with self.lock:
+            stats = dict(self.stats)
+            try:
+                stats['entries'] = self._connect().execute("SELECT count(*) FROM embeddings").fetchone()[0]
+            except sqlite3.Error:
+                stats['entries'] = None
+        try:
+            stats['bytes'] = os.path.getsize(self.path)
+        except OSError:
+            stats['bytes'] = 0
+        stats['max_entries'] = self.max_entries
+        stats['path'] = self.path
+        return stats
+
+    def _connect(self) -> sqlite3.Connection:
+        # Called with the lock held; one connection is shared by all threads of the process
+        if self.connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            # WAL lets several worker processes read while one writes
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    namespace TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    dimensions INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (namespace, content_hash)
+                ) WITHOUT ROWID
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+            connection.commit()
+            self.connection = connection
+        return self.connection
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """Delete least recently used vectors until the cache fits its entry limit"""
+        excess = connection.execute("SELECT count(*) FROM embeddings").fetchone()[0] - self.max_entries
+        if excess <= 0:
+            return
+        connection.execute(
+            "DELETE FROM embeddings WHERE (namespace, content_hash) IN "
+            "(SELECT namespace, content_hash FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,)
+        )
+        connection.commit()
+        self.stats['evictions'] += excess
+        logger.info(f"Evicted {excess} vectors from the embedding cache")
+
+    def _error(self, message: str) -> None:
+        # The cache is best-effort: failures are logged and counted, and callers embed as if it missed
+        logger.warning(message)
+        with self.lock:
+            self.stats['errors'] += 1
+
+
+class EmbeddingService:
+    """Batched, deduplicated, cached embedding of texts with one provider and model"""
+
+    def __init__(self, provider: str, model: str, embed_batch: Callable[[List[str]], Optional[List[List[float]]]],
+                 source: str = '', cache: Optional[EmbeddingCache] = None,
+                 max_batch_size: int = EMBEDDING_MAX_BATCH_SIZE, max_wait_ms: float = EMBEDDING_MAX_WAIT_MS):
+        """
+        Initialize the service
+
+        Args:
+            provider: Embedding provider, e.g. "openai"
+            model: Embedding model
+            embed_batch: Embeds a list of texts with the provider, returning one vector per text
+            source: Component using the service, for metrics
+            cache: Vector cache shared with other services (the global cache by default)
+            max_batch_size: Texts per provider request
+            max_wait_ms: How long a single-text request waits to be batched with others
+        """
+        self.provider = provider
+        self.model = model
+        self.namespace = f"{provider}:{model}"
+        self.name = f"{source}:{self.namespace}" if source else self.namespace
+        self.embed_batch = embed_batch
+        self.cache = cache if cache is not None else embedding_cache
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.lock = threading.Lock()
+        self.pending = threading.Condition(self.lock)
+        self.queue: List[tuple] = []
+        self.worker: Optional[threading.Thread] = None
+        self.stats = {'requests': 0, 'texts': 0, 'duplicates': 0, 'cache_hits': 0, 'cache_misses': 0,
+                      'provider_batches': 0, 'provider_texts': 0, 'provider_errors': 0,
+                      'provider_seconds_total': 0.0, 'provider_seconds_max': 0.0, 'largest_batch': 0,
+                      'coalesced_requests': 0, 'micro_batches': 0,
+                      'request_seconds_total': 0.0}
+        _register(self)
+
+    def embed_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Embed texts, reusing cached vectors
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector per text, in order; None for texts the provider failed to embed
+        """
+        started = time.perf_counter()
+        hashes = [content_hash(text) for text in texts]
+        unique = dict(zip(hashes, texts))
+        vectors = self.cache.get_many(self.namespace, list(unique))
+        missing = [key for key in unique if key not in vectors]
+
+        for start in range(0, len(missing), self.max_batch_size):
+            batch = missing[start:start + self.max_batch_size]
+            embedded = self._call_provider([unique[key] for key in batch])
+            if embedded is not None:
+                new = dict(zip(batch, embedded))
+                self.cache.set_many(self.namespace, new)
+                vectors.update(new)
+
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['texts'] += len(texts)
+            self.stats['duplicates'] += len(texts) - len(unique)
+            self.stats['cache_hits'] += len(unique) - len(missing)
+            self.stats['cache_misses'] += len(missing)
+            self.stats['request_seconds_total'] += time.perf_counter() - started
+        return [vectors.get(key) for key in hashes]
+
+    def embed(self, text: str) -> Optional[List[float]]:
+        """
+        Embed one text; cache misses are coalesced with concurrent requests into one provider call
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector, or None if the provider failed
+        """
+        if self.max_wait <= 0:
+            return self.embed_many([text])[0]
+
+        future: Future = Future()
+        with self.lock:
+            self.queue.append((text, future))
+            self.stats['coalesced_requests'] += 1
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self._run_micro_batches,
+                                               name=f"embedding-{self.provider}", daemon=True)
+                self.worker.start()
+            self.pending.notify()
+        try:
+            return future.result(timeout=REQUEST_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Embedding request with {self.name} failed: {str(e)}")
+            return None
+
+    def get_stats(self) -> Dict:
+        """Cache hit rate, provider batch sizes and latency of this service"""
+        with self.lock:
+            stats = dict(self.stats)
+        lookups = stats['cache_hits'] + stats['cache_misses']
+        stats['hit_rate'] = stats['cache_hits'] / lookups if lookups else 0.0
+        stats['avg_batch_size'] = (stats['provider_texts'] / stats['provider_batches']
+                                   if stats['provider_batches'] else 0.0)
+        stats['avg_micro_batch_size'] = (stats['coalesced_requests'] / stats['micro_batches']
+                                         if stats['micro_batches'] else 0.0)
+        stats['provider_latency_ms_avg'] = (stats['provider_seconds_total'] / stats['provider_batches'] * 1000
+                                            if stats['provider_batches'] else 0.0)
+        stats['provider_latency_ms_max'] = stats.pop('provider_seconds_max') * 1000
+        stats['request_latency_ms_avg'] = (stats['request_seconds_total'] / stats['requests'] * 1000
+                                           if stats['requests'] else 0.0)
+        stats.pop('provider_seconds_total')
+        stats.pop('request_seconds_total')
+        stats['timestamp'] = datetime.now().isoformat()
+        return stats
+
+    def _call_provider(self, texts: List[str]) -> Optional[List[List[float]]]:
+        started = time.perf_counter()
+        try:
+            vectors = self.embed_batch(texts)
+            if vectors is None or len(vectors) != len(texts):
+                raise ValueError(f"expected {len(texts)} vectors, got {0 if vectors is None else len(vectors)}")
+        except Exception as e:
+            logger.warning(f"Embedding {len(texts)} texts with {self.namespace} failed: {str(e)}")
+            with self.lock:
+                self.stats['provider_errors'] += 1
+            return None
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.stats['provider_batches'] += 1
+            self.stats['provider_texts'] += len(texts)
+            self.stats['largest_batch'] = max(self.stats['largest_batch'], len(texts))
+            self.stats['provider_seconds_total'] += elapsed
+            self.stats['provider_seconds_max'] = max(self.stats['provider_seconds_max'], elapsed)
+        return [list(vector) for vector in vectors]
+
+    def _run_micro_batches(self) -> None:
+        """Worker thread: collect queued single-text requests and embed them together"""
+        while True:
+            with self.lock:
+                while not self.queue:
+                    self.pending.wait()
+                # Give concurrent callers a moment to join the batch
+                deadline = time.monotonic() + self.max_wait
+                while len(self.queue) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.pending.wait(remaining)
+                batch, self.queue = self.queue[:self.max_batch_size], self.queue[self.max_batch_size:]
+                self.stats['micro_batches'] += 1
+            try:
+                vectors = self.embed_many([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+
+_services: List[EmbeddingService] = []
+_services_lock = threading.Lock()
+
+
+def _register(service: EmbeddingService) -> None:
+    with _services_lock:
+        _services.append(service)
+
+
+def get_embedding_stats() -> Dict:
+    """Metrics of the shared vector cache and of every embedding service"""
+    with _services_lock:
+        services = list(_services)
+    return {
+        'cache': embedding_cache.get_stats(),
+        'services': {service.name: service.get_stats() for service in services}
+    }
+
+
+# Create a global instance
+embedding_cache = EmbeddingCache()
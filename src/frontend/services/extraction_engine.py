@@ -0,0 +1,211 @@
+"""
+Document Extraction Engine for SustainaTrend™
+
+Single-pass extraction of sustainability metric mentions, framework mentions,
+numerical KPIs, figure/table references and headings. All patterns are
+compiled once per processor, and each page of the extracted text (delimited
+by the ``--- Page N ---`` markers written during PDF extraction) is scanned
+once, yielding typed hits that carry their page number and offsets into the
+full text. The document processor builds its metrics, frameworks, KPIs,
+references and document structure from that hit stream instead of rescanning
+the whole text for each of them.
+
+Metric, framework and reference patterns match against the lower-cased page,
+which is much faster than case-insensitive matching; their offsets line up
+with the full text except for the rare characters whose lower case is longer.
+"""
+
+import re
+import logging
+from bisect import bisect_left
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Hit kinds
+METRIC = 'metric'
+FRAMEWORK = 'framework'
+KPI = 'kpi'
+REFERENCE = 'reference'
+HEADING = 'heading'
+
+# Page marker lines as written by PageExtraction.joined_text, including their newline
+PAGE_MARKER_PATTERN = re.compile(r'^---[^\S\n]+Page[^\S\n]+(\d+)[^\S\n]+---[^\n]*\n?', re.MULTILINE)
+
+# Numbers with units; the unit is the last group that took part in the match
+KPI_PATTERN = re.compile(
+    r'(\d+(?:\.\d+)?)\s*(?:'
+    r'(%)'                                              # Percentages
+    r'|(tons?|t)\s+(?:of\s+)?(?:CO2|carbon)'            # Carbon tonnage
+    r'|(GWh|kWh|MWh)'                                   # Energy units
+    r'|(m3|cubic meters?|liters?|gallons?)'             # Water units
+    r')',
+    re.IGNORECASE
+)
+
+# Figure, chart and table references, matched against the lower-cased page
+REFERENCE_PATTERN = re.compile(r'(figure|fig\.?|chart|graph|diagram|table|tbl\.?)\s+(\d+(?:\.\d+)?)')
+TABLE_REFERENCE_TYPES = ('table', 'tbl', 'tbl.')
+
+# Markdown-style (#) or numbered (1.2) headings on a line of their own
+HEADING_PATTERN = re.compile(r'^[^\S\n]*(#+|\d+(?:\.\d+)*)[^\S\n]+(.+)$', re.MULTILINE)
+
+
+class Hit(NamedTuple):
+    """
+    One match in the hit stream.
+
+    ``label`` and ``value`` depend on the kind: metric category and pattern,
+    framework and keyword, KPI unit and number, reference type and number,
+    or heading title and level marker.
+    """
+    kind: str
+    page: int
+    start: int
+    end: int
+    label: str
+    value: str
+
+
+class PageSpan(NamedTuple):
+    """Page number and text range of one page, excluding its marker line"""
+    number: int
+    start: int
+    end: int
+
+
+class DocumentScan:
+    """Hit stream of one document, in document order, with its page layout"""
+
+    def __init__(self, text: str, pages: List[PageSpan], markers: List[Tuple[int, int]], hits: List[Hit]):
+        self.text = text
+        self.pages = pages
+        self.markers = markers
+        self.hits = hits
+        self._by_kind: Dict[str, List[Hit]] = {}
+        for hit in hits:
+            self._by_kind.setdefault(hit.kind, []).append(hit)
+        self._marker_starts = [start for start, _ in markers]
+
+    def of_kind(self, kind: str) -> List[Hit]:
+        return self._by_kind.get(kind, [])
+
+    def context(self, hit: Hit, width: int) -> str:
+        """Text around a hit, ``width`` characters either side"""
+        return self.text[max(0, hit.start - width):hit.end + width]
+
+    def lines_text(self, start: int, end: int) -> str:
+        """
+        Lines in [start, end) without page marker lines, each ending in a newline.
+
+        ``start`` and ``end`` must be line boundaries.
+        """
+        parts = []
+        position = start
+        index = bisect_left(self._marker_starts, start)
+        while index < len(self.markers) and self.markers[index][0] < end:
+            marker_start, marker_end = self.markers[index]
+            parts.append(self.text[position:marker_start])
+            position = marker_end
+            index += 1
+        parts.append(self.text[position:end])
+        if end == len(self.text) and not self._ends_with_marker():
+            parts.append('\n')
+        return ''.join(parts)
+
+    def page_texts(self) -> Iterator[Tuple[int, str]]:
+        """Number and text of every page; whitespace before the first marker is skipped"""
+        for index, page in enumerate(self.pages):
+            page_text = self.lines_text(page.start, page.end)
+            if index == 0 and self.markers and not page_text.strip():
+                continue
+            if page_text:
+                yield page.number, page_text
+
+    def _ends_with_marker(self) -> bool:
+        return bool(self.markers) and self.markers[-1][1] == len(self.text) and not self.text.endswith('\n')
+
+
+def split_pages(text: str) -> Tuple[List[PageSpan], List[Tuple[int, int]]]:
+    """Page spans and marker line spans of extracted text; text before the first marker is page 1"""
+    pages, markers = [], []
+    number, start = 1, 0
+    for marker in PAGE_MARKER_PATTERN.finditer(text):
+        pages.append(PageSpan(number, start, marker.start()))
+        markers.append(marker.span())
+        number, start = int(marker.group(1)), marker.end()
+    pages.append(PageSpan(number, start, len(text)))
+    return pages, markers
+
+
+class ExtractionEngine:
+    """Precompiled metric, framework, KPI, reference and heading patterns"""
+
+    def __init__(self, metrics_patterns: Dict[str, List[str]], frameworks: Dict[str, List[str]]):
+        self.metric_patterns = [
+            (category, pattern, re.compile(pattern.lower()))
+            for category, patterns in metrics_patterns.items()
+            for pattern in patterns
+        ]
+        self.framework_patterns = [
+            (framework, re.compile(re.escape(keyword.lower())))
+            for framework, keywords in frameworks.items()
+            for keyword in keywords
+        ]
+
+    def scan(self, text: str) -> DocumentScan:
+        """Scan every page once and collect the hits in document order"""
+        pages, markers = split_pages(text)
+        hits: List[Hit] = []
+        for page in pages:
+            if page.start < page.end:
+                hits.extend(self._scan_page(text, page))
+        return DocumentScan(text, pages, markers, hits)
+
+    def scan_page(self, page_text: str, number: int, offset: int = 0) -> List[Hit]:
+        """
+        Scan a single page as it arrives, for incremental processing.
+
+        ``offset`` is where the page text will start in the full text, so the
+        hits of all pages can later be combined with ``assemble``.
+        """
+        hits = self._scan_page(page_text, PageSpan(number, 0, len(page_text)))
+        if offset:
+            hits = [hit._replace(start=hit.start + offset, end=hit.end + offset) for hit in hits]
+        return hits
+
+    @staticmethod
+    def assemble(text: str, hits: List[Hit]) -> DocumentScan:
+        """Scan of the full text from hits collected page by page with ``scan_page``"""
+        pages, markers = split_pages(text)
+        return DocumentScan(text, pages, markers, hits)
+
+    def _scan_page(self, text: str, page: PageSpan) -> List[Hit]:
+        number, start, end = page
+        hits = [
+            Hit(KPI, number, m.start(), m.end(), m.group(m.lastindex), m.group(1))
+            for m in KPI_PATTERN.finditer(text, start, end)
+        ]
+        hits.extend(
+            Hit(HEADING, number, m.start(), m.end(), m.group(2), m.group(1))
+            for m in HEADING_PATTERN.finditer(text, start, end)
+        )
+
+        lowered = text[start:end].lower()
+        hits.extend(
+            Hit(REFERENCE, number, start + m.start(), start + m.end(), m.group(1), m.group(2))
+            for m in REFERENCE_PATTERN.finditer(lowered)
+        )
+        for category, pattern, regex in self.metric_patterns:
+            hits.extend(
+                Hit(METRIC, number, start + m.start(), start + m.end(), category, pattern)
+                for m in regex.finditer(lowered)
+            )
+        for framework, regex in self.framework_patterns:
+            hits.extend(
+                Hit(FRAMEWORK, number, start + m.start(), start + m.end(), framework, m.group())
+                for m in regex.finditer(lowered)
+            )
+
+        hits.sort(key=lambda hit: hit.start)
+        return hits
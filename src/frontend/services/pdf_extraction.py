@@ -0,0 +1,215 @@
+"""
+PDF Extraction Engine for SustainaTrend™
+
+Page-parallel text extraction for large sustainability reports. Pages are
+split into contiguous ranges that worker processes extract independently:
+each worker opens the PDF itself (PyMuPDF documents cannot be shared across
+processes), reads the text layer and runs OCR only on pages whose text layer
+is empty or garbled, rendering them at a DPI derived from the page size.
+Results are reassembled in page order, and a per-document time budget stops
+further OCR once it is spent so one scanned report cannot pin the pool.
+"""
+
+import os
+import math
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+# For PDF text extraction
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+    fitz = None
+    logging.warning("PyMuPDF not available. PDF text extraction will be limited.")
+
+# For OCR support
+try:
+    from PIL import Image
+    import pytesseract
+    OCR_AVAILABLE = True
+except ImportError:
+    OCR_AVAILABLE = False
+    Image = None
+    pytesseract = None
+    logging.warning("PyTesseract or PIL not available. OCR support will be disabled.")
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', str(os.cpu_count() or 1)))
+EXTRACTION_TIME_BUDGET = float(os.getenv('PDF_EXTRACTION_TIME_BUDGET', '300'))
+
+# Documents below this many pages are extracted in-process
+PARALLEL_MIN_PAGES = 16
+# Page ranges per worker; more ranges balance uneven OCR load better
+RANGES_PER_WORKER = 4
+
+# A text layer is "poor" below this many characters or this share of letters/digits
+MIN_TEXT_CHARS = 50
+MIN_ALNUM_RATIO = 0.5
+
+# OCR renders the longer page side at about this many pixels, within the DPI bounds
+OCR_TARGET_PIXELS = 3000
+OCR_MIN_DPI = 150
+OCR_MAX_DPI = 300
+
+
+@dataclass
+class PageExtraction:
+    """Extracted page texts of one document, in page order"""
+    pages: List[str]
+    ocr_pages: List[int] = field(default_factory=list)
+    ocr_skipped_pages: List[int] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def joined_text(self) -> str:
+        """Full text with the page markers the rest of the pipeline relies on"""
+        return "".join(f"\n--- Page {number} ---\n{text}" for number, text in enumerate(self.pages, 1))
+
+
+def text_layer_is_poor(text: str) -> bool:
+    """Whether a page's text layer is too short or too garbled to trust"""
+    stripped = text.strip()
+    if len(stripped) < MIN_TEXT_CHARS:
+        return True
+    visible = [c for c in stripped if not c.isspace()]
+    alnum = sum(1 for c in visible if c.isalnum())
+    return alnum / len(visible) < MIN_ALNUM_RATIO
+
+
+def ocr_dpi(width_points: float, height_points: float) -> int:
+    """DPI that renders the longer page side at about OCR_TARGET_PIXELS"""
+    longest_inches = max(width_points, height_points) / 72.0
+    if longest_inches <= 0:
+        return OCR_MAX_DPI
+    return int(min(OCR_MAX_DPI, max(OCR_MIN_DPI, OCR_TARGET_PIXELS / longest_inches)))
+
+
+def ocr_page(page) -> str:
+    """Render a page at its OCR DPI and run Tesseract on it"""
+    dpi = ocr_dpi(page.rect.width, page.rect.height)
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    img = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    return pytesseract.image_to_string(img)
+
+
+def _page_text(page, page_number: int, use_ocr: bool, deadline: Optional[float]) -> Tuple[str, bool, bool]:
+    """Text of one page, with OCR where the text layer is poor; returns (text, OCR'd, OCR skipped)"""
+    page_text = page.get_text()
+    if not (use_ocr and OCR_AVAILABLE and text_layer_is_poor(page_text)):
+        return page_text, False, False
+    if deadline is not None and time.time() > deadline:
+        return page_text, False, True
+
+    try:
+        ocr_text = ocr_page(page)
+        if len(ocr_text.strip()) > len(page_text.strip()):
+            page_text = ocr_text
+        return page_text, True, False
+    except Exception as e:
+        logger.warning(f"OCR processing failed on page {page_number}: {str(e)}")
+        # Keep the original text if OCR fails
+        return page_text, False, False
+
+
+def extract_page_range(file_path: str, start: int, end: int, use_ocr: bool,
+                       deadline: Optional[float]) -> Tuple[int, List[str], List[int], List[int]]:
+    """
+    Extract pages [start, end) of a PDF; runs inside a worker process.
+
+    Returns (start, page texts, OCR'd page numbers, page numbers whose OCR
+    was skipped because the deadline had passed).
+    """
+    texts, ocr_pages, skipped = [], [], []
+    with fitz.open(file_path) as doc:
+        for page_num in range(start, end):
+            page_text, ocr_applied, ocr_skipped = _page_text(doc[page_num], page_num + 1, use_ocr, deadline)
+            if ocr_applied:
+                ocr_pages.append(page_num + 1)
+            if ocr_skipped:
+                skipped.append(page_num + 1)
+            texts.append(page_text)
+    return start, texts, ocr_pages, skipped
+
+
+def iter_pages(file_path: str, use_ocr: bool = False,
+               time_budget: Optional[float] = EXTRACTION_TIME_BUDGET) -> Iterator[Tuple[int, int, str]]:
+    """
+    Yield (page number, page count, page text) one page at a time, in order.
+
+    Used for incremental processing, where each page is handled as soon as
+    it is read; OCR follows the same rules and time budget as extract_pages.
+    """
+    if not PYMUPDF_AVAILABLE:
+        raise RuntimeError("PyMuPDF not available. Cannot extract text from PDF.")
+
+    deadline = time.time() + time_budget if time_budget else None
+    with fitz.open(file_path) as doc:
+        page_count = len(doc)
+        for page_num in range(page_count):
+            page_text, _, _ = _page_text(doc[page_num], page_num + 1, use_ocr, deadline)
+            yield page_num + 1, page_count, page_text
+
+
+def page_ranges(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    """Split [0, page_count) into at most ``parts`` contiguous ranges"""
+    size = max(1, math.ceil(page_count / max(1, parts)))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def extract_pages(file_path: str, use_ocr: bool = False, workers: Optional[int] = None,
+                  time_budget: Optional[float] = EXTRACTION_TIME_BUDGET) -> PageExtraction:
+    """
+    Extract every page of a PDF, in parallel for large documents.
+
+    Args:
+        file_path: Path to the PDF file
+        use_ocr: Whether to OCR pages with an empty or poor text layer
+        workers: Worker processes (defaults to PDF_EXTRACTION_WORKERS)
+        time_budget: Seconds after which no further pages are OCR'd
+
+    Returns:
+        PageExtraction with page texts in page order
+    """
+    if not PYMUPDF_AVAILABLE:
+        raise RuntimeError("PyMuPDF not available. Cannot extract text from PDF.")
+
+    started = time.time()
+    deadline = started + time_budget if time_budget else None
+    workers = workers or EXTRACTION_WORKERS
+
+    with fitz.open(file_path) as doc:
+        page_count = len(doc)
+
+    if workers <= 1 or page_count < PARALLEL_MIN_PAGES:
+        results = [extract_page_range(file_path, 0, page_count, use_ocr, deadline)]
+    else:
+        ranges = page_ranges(page_count, workers * RANGES_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            futures = [
+                pool.submit(extract_page_range, file_path, start, end, use_ocr, deadline)
+                for start, end in ranges
+            ]
+            results = [future.result() for future in futures]
+
+    extraction = PageExtraction(pages=[])
+    for _, texts, ocr_pages, skipped in sorted(results, key=lambda result: result[0]):
+        extraction.pages.extend(texts)
+        extraction.ocr_pages.extend(ocr_pages)
+        extraction.ocr_skipped_pages.extend(skipped)
+    extraction.elapsed = time.time() - started
+
+    if extraction.ocr_skipped_pages:
+        logger.warning(
+            f"OCR time budget of {time_budget}s spent; {len(extraction.ocr_skipped_pages)} pages "
+            f"of {file_path} kept their text layer only"
+        )
+    return extraction
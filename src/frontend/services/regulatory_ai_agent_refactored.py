@@ -21,6 +21,8 @@ import uuid
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
+
 # Flask imports
 try:
     from flask import Blueprint, render_template, request, jsonify, current_app, send_from_directory
@@ -87,23 +89,29 @@ regulatory_ai_bp = Blueprint('regulatory_ai_refactored', __name__, url_prefix='/
 
 # AI connector imports
 try:
-    from frontend.utils.ai_connector import get_generative_ai, generate_embedding, get_rag_system, is_pinecone_available
+    from frontend.utils.ai_connector import get_generative_ai, generate_embeddings, is_pinecone_available
     AI_CONNECTOR_AVAILABLE = True
-    RAG_AVAILABLE = is_pinecone_available()
     logger.info("AI connector module loaded successfully")
-    logger.info(f"Pinecone RAG system availability: {'Connected' if RAG_AVAILABLE else 'Using fallback'}")
+    logger.info(f"Pinecone availability: {'Connected' if is_pinecone_available() else 'Not connected'}")
 except ImportError:
     try:
         # Fallback to relative import
-        from utils.ai_connector import get_generative_ai, generate_embedding, get_rag_system, is_pinecone_available
+        from utils.ai_connector import get_generative_ai, generate_embeddings, is_pinecone_available
         AI_CONNECTOR_AVAILABLE = True
-        RAG_AVAILABLE = is_pinecone_available()
         logger.info("AI connector module loaded successfully from relative path")
     except ImportError as e:
         AI_CONNECTOR_AVAILABLE = False
-        RAG_AVAILABLE = False
         logger.warning(f"AI connector not available, using fallback regulatory assessment: {str(e)}")
 
+# Per-document chunk indexes, built once per document and shared by all questions about it
+try:
+    from frontend.services.retrieval_index import RetrievalIndex, document_indexes, document_key
+except ImportError:
+    from retrieval_index import RetrievalIndex, document_indexes, document_key
+
+# Chunks passed to the model as context for each question
+RAG_CONTEXT_CHUNKS = 5
+
 # Regulatory framework data
 REGULATORY_FRAMEWORKS = {
     "ESRS": {
@@ -251,10 +259,13 @@ def is_rag_available() -> bool:
     """
     Check if RAG system is available
     
+    RAG answers come from per-document chunk indexes, which only need the AI
+    connector (Pinecone is not involved).
+    
     Returns:
         Boolean indicating if RAG is available
     """
-    return RAG_AVAILABLE
+    return AI_CONNECTOR_AVAILABLE
 
 def assess_document_compliance(document_text: str, framework_id: str = "ESRS") -> Dict[str, Any]:
     """
@@ -468,51 +479,24 @@ def analyze_document_with_rag(document_text: str, query: str, framework_id: str
     Returns:
         RAG analysis results
     """
-    if not RAG_AVAILABLE:
+    if not AI_CONNECTOR_AVAILABLE:
         logger.warning("RAG system not available, using fallback")
         return {
             "success": False,
             "message": "RAG system not available",
-            "fallback_response": "The RAG system is currently unavailable. Please check your Pinecone configuration or try again later."
+            "fallback_response": "The RAG system is currently unavailable. Please check your AI configuration or try again later."
         }
     
     try:
         # Get framework details
         framework = REGULATORY_FRAMEWORKS.get(framework_id, {})
         
-        # Split document into chunks for RAG processing
-        chunks = split_document_into_chunks(document_text)
+        # Chunk index of the document; only the first question about it chunks and embeds the text
+        session_id, index, index_reused = get_document_index(document_text)
         
-        # Get RAG system
-        rag_system = get_rag_system()
-        
-        # Create embeddings for chunks and add to RAG system
-        session_id = str(uuid.uuid4())
-        
-        # Store chunks in RAG system
-        for i, chunk in enumerate(chunks):
-            embedding = generate_embedding(chunk)
-            metadata = {
-                "text": chunk,
-                "framework": framework_id,
-                "chunk_id": i,
-                "session_id": session_id
-            }
-            rag_system.upsert([(f"{session_id}_{i}", embedding, metadata)])
-        
-        # Query the RAG system
-        query_embedding = generate_embedding(query)
-        query_results = rag_system.query(
-            vector=query_embedding,
-            filter={"session_id": session_id},
-            top_k=5,
-            include_metadata=True
-        )
-        
-        # Process results
-        contexts = []
-        for match in query_results.matches:
-            contexts.append(match.metadata.get("text", ""))
+        # Select the chunks most relevant to the query
+        selected, retrieval = index.select(query, connector_embedder, top_k=RAG_CONTEXT_CHUNKS)
+        contexts = [chunk.text for chunk in selected]
         
         # Generate response with AI
         ai = get_generative_ai()
@@ -542,7 +526,9 @@ def analyze_document_with_rag(document_text: str, query: str, framework_id: str
             "framework_id": framework_id,
             "result": response.text if hasattr(response, "text") else str(response),
             "contexts": contexts,
-            "session_id": session_id
+            "session_id": session_id,
+            "retrieval": retrieval,
+            "index_reused": index_reused
         }
         
     except Exception as e:
@@ -553,6 +539,38 @@ def analyze_document_with_rag(document_text: str, query: str, framework_id: str
             "fallback_response": "An error occurred during document analysis. Please try again or contact support."
         }
 
+class ConnectorEmbedder:
+    """Batched embeddings from the AI connector, as normalized rows for a RetrievalIndex"""
+    
+    name = 'ai_connector'
+    
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.asarray(generate_embeddings(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+def get_document_index(document_text: str) -> Tuple[str, RetrievalIndex, bool]:
+    """
+    Chunk index of a document, built on first use and reused while it stays in the registry
+    
+    Args:
+        document_text: Document text
+        
+    Returns:
+        Document key (used as the RAG session ID), the index, and whether it was reused
+    """
+    key = document_key(document_text)
+    
+    def build() -> RetrievalIndex:
+        chunks = split_document_into_chunks(document_text)
+        embeddings = connector_embedder.embed(chunks) if chunks else None
+        logger.info(f"Built chunk index for document {key[:12]}: {len(chunks)} chunks")
+        return RetrievalIndex(chunks, embeddings, connector_embedder.name)
+    
+    index, reused = document_indexes.get_or_build(key, build)
+    return key, index, reused
+
 def split_document_into_chunks(text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
     """
     Split document text into chunks for RAG processing
@@ -592,6 +610,9 @@ def split_document_into_chunks(text: str, chunk_size: int = 1000, overlap: int =
         # Add chunk to list
         chunks.append(text[start:end])
         
+        if end >= len(text):
+            break
+        
         # Move start position for next chunk, considering overlap
         start = end - overlap
         
@@ -601,6 +622,9 @@ def split_document_into_chunks(text: str, chunk_size: int = 1000, overlap: int =
     
     return chunks
 
+# Create a global instance
+connector_embedder = ConnectorEmbedder()
+
 #############################################
 # Routes
 #############################################
@@ -849,11 +873,20 @@ def api_file_assessment():
         # Perform assessment
         assessment = assess_document_compliance(document_text, framework_id)
         
+        # Index the document now, so follow-up questions about it and later RAG analyses reuse the index
+        session_id = None
+        if AI_CONNECTOR_AVAILABLE:
+            try:
+                session_id, _, _ = get_document_index(document_text)
+            except Exception as e:
+                logger.warning(f"Could not index document for follow-up questions: {str(e)}")
+        
         # Return assessment result
         return jsonify({
             "filename": filename,
             "framework": framework_id,
-            "assessment": assessment
+            "assessment": assessment,
+            "session_id": session_id
         })
         
     except Exception as e:
@@ -869,39 +902,34 @@ def api_follow_up_question():
         data = request.json
         session_id = data.get('session_id', '')
         question = data.get('question', '')
+        # Optional: lets the index be rebuilt once the session's index has been evicted
+        document_text = data.get('document_text', '')
         
         if not question:
             return jsonify({"error": "No question provided"}), 400
         
-        if not RAG_AVAILABLE:
+        if not AI_CONNECTOR_AVAILABLE:
             return jsonify({
                 "success": False,
                 "message": "RAG system not available",
-                "response": "The RAG system is currently unavailable. Please check your Pinecone configuration or try again later."
+                "response": "The RAG system is currently unavailable. Please check your AI configuration or try again later."
             })
         
         try:
-            # Get RAG system
-            rag_system = get_rag_system()
-            
-            # Generate embedding for question
-            question_embedding = generate_embedding(question)
+            # Answer from the document's chunk index, rebuilding it from the document if it expired
+            index = document_indexes.get(session_id) if session_id else None
+            if index is None and document_text:
+                session_id, index, _ = get_document_index(document_text)
+            if index is None:
+                return jsonify({
+                    "success": False,
+                    "session_expired": True,
+                    "message": "Document session expired",
+                    "response": "This document is no longer loaded. Please upload it again, or send its text as document_text, to ask follow-up questions."
+                }), 410
             
-            # Query filter - if session_id provided, use it to filter results
-            filter_dict = {"session_id": session_id} if session_id else None
-            
-            # Query the RAG system
-            query_results = rag_system.query(
-                vector=question_embedding,
-                filter=filter_dict,
-                top_k=5,
-                include_metadata=True
-            )
-            
-            # Process results
-            contexts = []
-            for match in query_results.matches:
-                contexts.append(match.metadata.get("text", ""))
+            selected, _ = index.select(question, connector_embedder, top_k=RAG_CONTEXT_CHUNKS)
+            contexts = [chunk.text for chunk in selected]
             
             # Generate response with AI
             ai = get_generative_ai()
@@ -924,6 +952,7 @@ def api_follow_up_question():
             return jsonify({
                 "success": True,
                 "question": question,
+                "session_id": session_id,
                 "response": response.text if hasattr(response, "text") else str(response),
                 "contexts": contexts
             })
@@ -943,6 +972,11 @@ def api_follow_up_question():
             "error": str(e)
         }), 500
 
+@regulatory_ai_bp.route('/api/rag-index-stats', methods=['GET'])
+def api_rag_index_stats():
+    """API endpoint for document chunk index registry statistics"""
+    return jsonify(document_indexes.get_stats())
+
 # Removed unused test route
 
 @regulatory_ai_bp.route('/upload', methods=['GET'])
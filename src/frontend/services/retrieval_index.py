@@ -0,0 +1,367 @@
+"""
+Document Retrieval Index for SustainaTrend™
+
+Per-document chunk retrieval for RAG answers. A document is chunked and
+embedded once, at processing time, and the chunk embeddings are persisted
+with the analysis cache; every question then costs one query embedding plus
+a single completion whose context is the most relevant chunks that fit a
+token budget. Chunks are ranked by embedding similarity fused with keyword
+overlap; when embeddings are unavailable, or no chunk is similar enough to
+the question, keyword overlap alone decides.
+
+Two embedders are provided: the OpenAI embeddings API, and a deterministic
+local hashing embedder that needs no network access or API key (used for
+offline work and tests, and whenever OpenAI is not configured).
+"""
+
+import os
+import re
+import sys
+import math
+import time
+import hashlib
+import logging
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# "openai", "local", or "auto" (OpenAI when configured, otherwise local)
+RAG_EMBEDDER = os.getenv('RAG_EMBEDDER', 'auto').lower()
+RAG_TOP_K = int(os.getenv('RAG_TOP_K', '8'))
+RAG_CONTEXT_TOKENS = int(os.getenv('RAG_CONTEXT_TOKENS', '3000'))
+RAG_EMBEDDING_MODEL = os.getenv('RAG_EMBEDDING_MODEL', 'text-embedding-ada-002')
+# Chunks per embeddings API request
+EMBEDDING_BATCH_SIZE = 64
+# Below this cosine similarity no chunk is considered a semantic match
+MIN_SIMILARITY = 0.05
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'does', 'for', 'from', 'has', 'have', 'how',
+    'in', 'is', 'it', 'its', 'of', 'on', 'or', 'our', 'that', 'the', 'their', 'this', 'to',
+    'was', 'what', 'when', 'which', 'who', 'why', 'with', 'do', 'did', 'any', 'there', 'much', 'many'
+))
+# Words are compared by this many leading characters, a crude stemmer ("withdrawn" ~ "withdrawal")
+STEM_LENGTH = 6
+# Reciprocal rank fusion constant for combining semantic and keyword rankings
+RRF_K = 60
+# Lifetime and memory caps of the in-memory index registry
+RAG_INDEX_TTL_SECONDS = int(os.getenv('RAG_INDEX_TTL_SECONDS', '3600'))
+RAG_INDEX_MAX_DOCUMENTS = int(os.getenv('RAG_INDEX_MAX_DOCUMENTS', '32'))
+RAG_INDEX_MAX_BYTES = int(os.getenv('RAG_INDEX_MAX_BYTES', str(256 * 1024 * 1024)))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased, crudely stemmed word tokens without stopwords"""
+    return [token[:STEM_LENGTH] for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+@lru_cache(maxsize=65536)
+def _feature(term: str, dimensions: int) -> Tuple[int, float]:
+    digest = hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest()
+    value = int.from_bytes(digest, 'little')
+    return value % dimensions, 1.0 if value >> 63 else -1.0
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder: signed feature hashing of word unigrams
+    and bigrams with sublinear term frequency, L2-normalized.
+
+    Identical text always yields the identical vector, across processes and
+    machines, so it is suitable for tests and offline use.
+    """
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            counts = Counter(tokens)
+            counts.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+            for term, count in counts.items():
+                column, sign = _feature(term, self.dimensions)
+                matrix[row, column] += sign * (1.0 + math.log(count))
+        return _normalize(matrix)
+
+
+class OpenAIEmbedder:
+    """OpenAI embeddings, requested in batches"""
+
+    def __init__(self, client, model: str = RAG_EMBEDDING_MODEL, batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.client = client
+        self.model = model
+        self.batch_size = batch_size
+        self.name = f"openai-{model}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self.client.embeddings.create(model=self.model, input=list(texts[start:start + self.batch_size]))
+            vectors.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    if matrix.size == 0:
+        return matrix
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class RetrievedChunk(NamedTuple):
+    index: int
+    score: float
+    text: str
+
+
+class RetrievalIndex:
+    """Chunks of one document with their (optional) normalized embeddings"""
+
+    def __init__(self, chunks: List[str], embeddings: Optional[np.ndarray] = None, embedder_name: str = ''):
+        self.chunks = chunks
+        self.embeddings = embeddings
+        self.embedder_name = embedder_name
+        self._term_counts: Optional[List[Counter]] = None
+        self._document_frequency: Optional[Dict[str, int]] = None
+
+    def semantic_ranking(self, query_vector: np.ndarray) -> List[Tuple[int, float]]:
+        """Chunk indexes by descending cosine similarity"""
+        if self.embeddings is None or not len(self.chunks):
+            return []
+        scores = self.embeddings @ query_vector
+        order = np.argsort(-scores, kind='stable')
+        return [(int(i), float(scores[i])) for i in order]
+
+    def index_keywords(self) -> None:
+        """Count the chunk terms keyword ranking uses (done on first keyword query otherwise)"""
+        if self._term_counts is None:
+            self._term_counts = [Counter(tokenize(chunk)) for chunk in self.chunks]
+            self._document_frequency = Counter(term for counts in self._term_counts for term in counts)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the chunks, embeddings and keyword statistics"""
+        size = sum(sys.getsizeof(chunk) for chunk in self.chunks)
+        if self.embeddings is not None:
+            size += self.embeddings.nbytes
+        if self._term_counts is not None:
+            # Term strings are counted once per chunk; the document frequencies share them
+            size += sum(sys.getsizeof(counts) + sum(sys.getsizeof(term) for term in counts)
+                        for counts in self._term_counts)
+            size += sys.getsizeof(self._document_frequency)
+        return size
+
+    def keyword_ranking(self, query: str) -> List[Tuple[int, float]]:
+        """Chunk indexes by TF-IDF overlap with the query terms; chunks without any term are left out"""
+        self.index_keywords()
+
+        terms = set(tokenize(query))
+        total = len(self.chunks)
+        scored = []
+        for i, counts in enumerate(self._term_counts):
+            score = sum(
+                (1.0 + math.log(counts[term])) * math.log(1.0 + total / self._document_frequency[term])
+                for term in terms if term in counts
+            )
+            if score > 0:
+                scored.append((i, score))
+        return sorted(scored, key=lambda item: -item[1])
+
+    def select(self, query: str, embedder=None, top_k: int = RAG_TOP_K,
+               token_budget: int = RAG_CONTEXT_TOKENS) -> Tuple[List[RetrievedChunk], str]:
+        """
+        Pick the chunks to answer a query with.
+
+        Semantic and keyword rankings are combined by reciprocal rank fusion,
+        so exact terms (names, figures, units) still count when embeddings
+        miss them; either ranking alone is used when the other has nothing.
+        Returns up to ``top_k`` chunks that together fit ``token_budget``
+        (the best chunk is always included), in document order, plus the
+        retrieval method used: "hybrid", "semantic", "keyword" or "none".
+        """
+        semantic = []
+        if embedder is not None and self.embeddings is not None:
+            try:
+                semantic = self.semantic_ranking(embedder.embed([query])[0])
+            except Exception as e:
+                logger.warning(f"Query embedding failed, falling back to keyword retrieval: {str(e)}")
+        if semantic and semantic[0][1] < MIN_SIMILARITY:
+            semantic = []
+        keyword = self.keyword_ranking(query)
+
+        if semantic and keyword:
+            fused: Dict[int, float] = {}
+            for ranking in (semantic, keyword):
+                for rank, (i, _) in enumerate(ranking):
+                    fused[i] = fused.get(i, 0.0) + 1.0 / (RRF_K + rank + 1)
+            ranking, method = sorted(fused.items(), key=lambda item: -item[1]), 'hybrid'
+        elif semantic or keyword:
+            ranking, method = (semantic, 'semantic') if semantic else (keyword, 'keyword')
+        else:
+            # Nothing matched at all: answer from the start of the document
+            ranking, method = [(i, 0.0) for i in range(len(self.chunks))], 'none'
+
+        selected, used = [], 0
+        for i, score in ranking:
+            if len(selected) >= top_k:
+                break
+            cost = estimate_tokens(self.chunks[i])
+            if selected and used + cost > token_budget:
+                continue
+            selected.append(RetrievedChunk(i, score, self.chunks[i]))
+            used += cost
+        return sorted(selected, key=lambda chunk: chunk.index), method
+
+
+def document_key(text: str) -> str:
+    """Content hash identifying a document's index"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class RetrievalIndexRegistry:
+    """
+    Retrieval indexes of recently queried documents, keyed by document content.
+
+    Each document is chunked and embedded once; later questions about the same
+    text reuse its index. Indexes idle for longer than ``ttl_seconds`` expire,
+    and the least recently used ones are evicted whenever the registry holds
+    more than ``max_documents`` indexes or ``max_bytes`` of chunks, embeddings
+    and keyword statistics. Concurrent requests for the same missing index
+    build it once.
+    """
+
+    def __init__(self, ttl_seconds: int = RAG_INDEX_TTL_SECONDS, max_documents: int = RAG_INDEX_MAX_DOCUMENTS,
+                 max_bytes: int = RAG_INDEX_MAX_BYTES):
+        self.ttl_seconds = ttl_seconds
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._stats = {'builds': 0, 'reuses': 0, 'misses': 0, 'expired': 0, 'evicted': 0, 'build_seconds': 0.0}
+
+    def get(self, key: str) -> Optional[RetrievalIndex]:
+        """Index stored under ``key``, or None if it was never built or has been evicted"""
+        with self._lock:
+            index = self._lookup(key)
+            self._stats['reuses' if index is not None else 'misses'] += 1
+            return index
+
+    def get_or_build(self, key: str, build: Callable[[], RetrievalIndex]) -> Tuple[RetrievalIndex, bool]:
+        """
+        Index stored under ``key``, built with ``build`` if missing
+
+        Returns:
+            The index and whether an existing one was reused
+        """
+        with self._lock:
+            index = self._lookup(key)
+            if index is not None:
+                self._stats['reuses'] += 1
+                return index, True
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            # Another request may have built it while this one waited
+            with self._lock:
+                index = self._lookup(key)
+                if index is not None:
+                    self._stats['reuses'] += 1
+                    return index, True
+
+            try:
+                started = time.perf_counter()
+                index = build()
+                # Counted now so the byte cap covers them
+                index.index_keywords()
+                with self._lock:
+                    self._stats['builds'] += 1
+                    self._stats['build_seconds'] += time.perf_counter() - started
+                    self._store(key, index)
+            finally:
+                with self._lock:
+                    self._build_locks.pop(key, None)
+            return index, False
+
+    def discard(self, key: str) -> bool:
+        """Drop the index stored under ``key``; returns whether there was one"""
+        with self._lock:
+            return self._remove(key) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Registry size and how often indexes were reused rather than built"""
+        with self._lock:
+            self._expire(time.monotonic())
+            stats = dict(self._stats)
+            requests = stats['builds'] + stats['reuses']
+            stats.update(
+                documents=len(self._entries),
+                chunks=sum(len(entry['index'].chunks) for entry in self._entries.values()),
+                bytes=self._bytes,
+                reuse_rate=stats['reuses'] / requests if requests else 0.0,
+                build_seconds=round(stats['build_seconds'], 3),
+                ttl_seconds=self.ttl_seconds,
+                max_documents=self.max_documents,
+                max_bytes=self.max_bytes
+            )
+            return stats
+
+    def _lookup(self, key: str) -> Optional[RetrievalIndex]:
+        now = time.monotonic()
+        self._expire(now)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        entry['last_used'] = now
+        self._entries.move_to_end(key)
+        return entry['index']
+
+    def _store(self, key: str, index: RetrievalIndex) -> None:
+        self._remove(key)
+        size = index.nbytes
+        self._entries[key] = {'index': index, 'bytes': size, 'last_used': time.monotonic()}
+        self._bytes += size
+        # The newest index stays even when it alone exceeds the byte cap
+        while len(self._entries) > 1 and (len(self._entries) > self.max_documents or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self._stats['evicted'] += 1
+
+    def _expire(self, now: float) -> None:
+        # Entries are in least recently used order, so expired ones are at the front
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry['last_used'] <= self.ttl_seconds:
+                break
+            self._remove(key)
+            self._stats['expired'] += 1
+
+    def _remove(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry['bytes']
+        return entry
+
+
+# Create a global instance, shared by every RAG path so the memory caps and statistics cover all indexes
+document_indexes = RetrievalIndexRegistry()
@@ -398,6 +398,19 @@ document.addEventListener('DOMContentLoaded', function() {
       updateAnalysisProgress(10);
     });
     
+    evtSource.addEventListener("page_processed", function(e) {
+      const data = JSON.parse(e.data);
+      updateAnalysisProgress(10 + Math.round(data.progress * 0.15));
+      
+      // Report partial results every 10 pages and on the last page
+      if (data.page % 10 === 0 || data.page === data.page_count) {
+        const metricsFound = Object.values(data.metrics_found).reduce((sum, count) => sum + count, 0);
+        const frameworks = Object.keys(data.frameworks_detected);
+        addProgressMessage(`Processed page ${data.page} of ${data.page_count}: ${metricsFound} metric mentions, ${data.kpis_found} KPIs` +
+          (frameworks.length ? `, frameworks: ${frameworks.join(", ")}` : ""));
+      }
+    });
+    
     evtSource.addEventListener("extraction_complete", function(e) {
       setAnalysisStep('extraction', 'complete');
       setAnalysisStep('processing', 'pending');
@@ -468,6 +481,15 @@ document.addEventListener('DOMContentLoaded', function() {
       eventSource = null;
     });
     
+    evtSource.addEventListener("analysis_error", function(e) {
+      const data = JSON.parse(e.data);
+      addProgressMessage(data.message);
+      
+      // Close the event source
+      evtSource.close();
+      eventSource = null;
+    });
+    
     evtSource.addEventListener("error", function(e) {
       addProgressMessage("Error during analysis process");
       
@@ -12,6 +12,15 @@ import sys
 from typing import Dict, List, Any, Optional, Tuple, Union
 import time
 import uuid
+import threading
+
+import numpy as np
+
+# Shared, persistently cached embedding service
+try:
+    from frontend.services.embedding_service import EmbeddingService
+except ImportError:
+    from services.embedding_service import EmbeddingService
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -90,13 +99,46 @@ except ImportError:
     logger.warning("Pinecone package not available, using in-memory vector search fallback")
 
 # In-memory vector database fallback
+class ResultMatch:
+    """One query match, shaped like a Pinecone match"""
+    
+    def __init__(self, id, score, metadata=None):
+        self.id = id
+        self.score = score
+        self.metadata = metadata
+
+class QueryResult:
+    """Query matches, shaped like a Pinecone query response"""
+    
+    def __init__(self, matches):
+        self.matches = matches
+
 class InMemoryVectorDB:
-    """Simple in-memory vector database for fallback when Pinecone is not available"""
+    """
+    Simple in-memory vector database for fallback when Pinecone is not available
+    
+    Vectors are kept L2-normalized as rows of one growable float32 matrix, so
+    a query is a single matrix-vector product followed by a partial sort.
+    Metadata values are indexed by (key, value), so filtered queries and
+    deletes only touch the matching rows. Deleted rows are filled with the
+    last row, keeping the matrix dense.
+    """
+    
+    INITIAL_CAPACITY = 1024
     
     def __init__(self):
         """Initialize in-memory vector database"""
-        self.vectors = {}  # Dictionary to store vectors
-        self.metadata = {}  # Dictionary to store metadata
+        self.dimension = None
+        self.matrix = None  # Normalized vectors, one row per ID; rows past self.size are unused
+        self.size = 0
+        self.ids = []  # Row -> vector ID
+        self.rows = {}  # Vector ID -> row
+        self.metadata = {}  # Vector ID -> metadata
+        self.postings = {}  # (metadata key, value) -> IDs with that value
+        self.lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return self.size
     
     def upsert(self, vectors: List[Tuple[str, List[float], Dict[str, Any]]]) -> Dict[str, Any]:
         """
@@ -108,14 +150,37 @@ class InMemoryVectorDB:
         Returns:
             Status dictionary
         """
-        for vec_id, vector, metadata in vectors:
-            self.vectors[vec_id] = vector
-            self.metadata[vec_id] = metadata
+        if not vectors:
+            return {"upserted_count": 0}
+        
+        values = np.asarray([vector for _, vector, _ in vectors], dtype=np.float32)
+        if values.ndim != 2:
+            raise ValueError("Vectors must all have the same dimension")
+        norms = np.linalg.norm(values, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        values /= norms
+        
+        with self.lock:
+            if self.dimension is None:
+                self.dimension = values.shape[1]
+                self.matrix = np.zeros((self.INITIAL_CAPACITY, self.dimension), dtype=np.float32)
+            elif values.shape[1] != self.dimension:
+                raise ValueError(f"Vector dimension {values.shape[1]} does not match index dimension {self.dimension}")
+            
+            for (vec_id, _, metadata), value in zip(vectors, values):
+                row = self.rows.get(vec_id)
+                if row is None:
+                    row = self._append_row(vec_id)
+                else:
+                    self._unindex(vec_id)
+                self.matrix[row] = value
+                self.metadata[vec_id] = metadata or {}
+                self._index(vec_id)
         
         return {"upserted_count": len(vectors)}
     
     def query(self, vector: List[float], filter: Optional[Dict[str, Any]] = None, 
-              top_k: int =.5, include_metadata: bool = True) -> Any:
+              top_k: int = 5, include_metadata: bool = True) -> Any:
         """
         Query the database with a vector
         
@@ -128,56 +193,38 @@ class InMemoryVectorDB:
         Returns:
             Query results
         """
-        # Simple cosine similarity implementation
-        def cosine_similarity(vec1, vec2):
-            # Dot product
-            dot_product = sum(a * b for a, b in zip(vec1, vec2))
-            # Magnitudes
-            mag1 = sum(a * a for a in vec1) ** 0.5
-            mag2 = sum(b * b for b in vec2) ** 0.5
-            # Avoid division by zero
-            if mag1 * mag2 == 0:
-                return 0
-            return dot_product / (mag1 * mag2)
+        query_vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm > 0:
+            query_vector = query_vector / norm
         
-        # Calculate similarities
-        similarities = []
-        for vec_id, stored_vector in self.vectors.items():
-            # Skip if doesn't match filter
+        with self.lock:
+            if not self.size or top_k <= 0:
+                return QueryResult([])
+            if query_vector.shape != (self.dimension,):
+                raise ValueError(f"Query dimension {query_vector.shape[-1]} does not match index dimension {self.dimension}")
+            
             if filter:
-                metadata = self.metadata.get(vec_id, {})
-                match = True
-                for key, value in filter.items():
-                    if key not in metadata or metadata[key] != value:
-                        match = False
-                        break
-                if not match:
-                    continue
+                rows = np.fromiter((self.rows[vec_id] for vec_id in self._matching_ids(filter)), dtype=np.intp)
+                scores = self.matrix[rows] @ query_vector
+            else:
+                rows = None
+                scores = self.matrix[:self.size] @ query_vector
             
-            # Calculate similarity
-            similarity = cosine_similarity(vector, stored_vector)
-            similarities.append((vec_id, similarity))
-        
-        # Sort by similarity
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        
-        # Return top k results
-        class ResultMatch:
-            def __init__(self, id, score, metadata=None):
-                self.id = id
-                self.score = score
-                self.metadata = metadata
-        
-        class QueryResult:
-            def __init__(self, matches):
-                self.matches = matches
-        
-        matches = []
-        for i, (vec_id, score) in enumerate(similarities[:top_k]):
-            match = ResultMatch(vec_id, score)
-            if include_metadata:
-                match.metadata = self.metadata.get(vec_id, {})
-            matches.append(match)
+            # Partial sort: only the best top_k scores are ordered
+            if top_k < len(scores):
+                best = np.argpartition(-scores, top_k - 1)[:top_k]
+            else:
+                best = np.arange(len(scores))
+            best = best[np.argsort(-scores[best], kind='stable')]
+            
+            matches = []
+            for position in best:
+                vec_id = self.ids[rows[position] if rows is not None else position]
+                match = ResultMatch(vec_id, float(scores[position]))
+                if include_metadata:
+                    match.metadata = self.metadata.get(vec_id, {})
+                matches.append(match)
         
         return QueryResult(matches)
     
@@ -192,36 +239,193 @@ class InMemoryVectorDB:
         Returns:
             Status dictionary
         """
-        deleted_count = 0
-        
-        if ids:
-            for vec_id in ids:
-                if vec_id in self.vectors:
-                    del self.vectors[vec_id]
-                    del self.metadata[vec_id]
-                    deleted_count += 1
-        
-        if filter:
-            to_delete = []
-            for vec_id, metadata in self.metadata.items():
-                match = True
-                for key, value in filter.items():
-                    if key not in metadata or metadata[key] != value:
-                        match = False
-                        break
-                if match:
-                    to_delete.append(vec_id)
+        with self.lock:
+            to_delete = {vec_id for vec_id in ids or [] if vec_id in self.rows}
+            if filter:
+                to_delete |= self._matching_ids(filter)
             
             for vec_id in to_delete:
-                del self.vectors[vec_id]
+                self._unindex(vec_id)
                 del self.metadata[vec_id]
-                deleted_count += 1
+                self._remove_row(vec_id)
         
-        return {"deleted_count": deleted_count}
+        return {"deleted_count": len(to_delete)}
+    
+    def _append_row(self, vec_id: str) -> int:
+        if self.size == len(self.matrix):
+            grown = np.zeros((len(self.matrix) * 2, self.dimension), dtype=np.float32)
+            grown[:self.size] = self.matrix[:self.size]
+            self.matrix = grown
+        row = self.size
+        self.size += 1
+        self.ids.append(vec_id)
+        self.rows[vec_id] = row
+        return row
+    
+    def _remove_row(self, vec_id: str) -> None:
+        # Move the last row into the freed one
+        row = self.rows.pop(vec_id)
+        last = self.size - 1
+        if row != last:
+            moved_id = self.ids[last]
+            self.matrix[row] = self.matrix[last]
+            self.ids[row] = moved_id
+            self.rows[moved_id] = row
+        self.ids.pop()
+        self.size = last
+    
+    def _index(self, vec_id: str) -> None:
+        for key, value in self.metadata[vec_id].items():
+            try:
+                self.postings.setdefault((key, value), set()).add(vec_id)
+            except TypeError:
+                # Unhashable values (lists, dicts) are matched by scanning instead
+                pass
+    
+    def _unindex(self, vec_id: str) -> None:
+        for key, value in self.metadata[vec_id].items():
+            try:
+                posting = self.postings.get((key, value))
+            except TypeError:
+                continue
+            if posting is not None:
+                posting.discard(vec_id)
+                if not posting:
+                    del self.postings[(key, value)]
+    
+    def _matching_ids(self, filter: Dict[str, Any]) -> set:
+        """IDs whose metadata has every filter key with an equal value"""
+        candidates = None
+        unindexed = {}
+        # Intersect the smallest postings first
+        postings = []
+        for key, value in filter.items():
+            try:
+                postings.append(self.postings.get((key, value), set()))
+            except TypeError:
+                unindexed[key] = value
+        for posting in sorted(postings, key=len):
+            candidates = set(posting) if candidates is None else candidates & posting
+            if not candidates:
+                return set()
+        if candidates is None:
+            candidates = set(self.rows)
+        if unindexed:
+            candidates = {
+                vec_id for vec_id in candidates
+                if all(key in self.metadata[vec_id] and self.metadata[vec_id][key] == value
+                       for key, value in unindexed.items())
+            }
+        return candidates
 
 # Singleton instance of in-memory vector DB
 in_memory_vectordb = InMemoryVectorDB()
 
+#############################################
+# Local Embeddings
+#############################################
+
+# Bytes kept by the local embedder: digits, lower-case letters, non-ASCII (UTF-8) and the text separator;
+# everything else becomes a space
+_LOCAL_EMBEDDING_BYTES = bytes(
+    c if (48 <= c <= 57 or 97 <= c <= 122 or c >= 128 or c == 0) else 32 for c in range(256)
+)
+
+class LocalEmbedder:
+    """
+    Deterministic local embedder for when no embedding service is available
+    
+    Texts are lower-cased, punctuation is dropped and whitespace collapsed,
+    and every character n-gram (words padded with spaces, so n-grams also
+    mark word starts, ends and neighbours) is hashed into one of ``dim``
+    signed buckets. Counts are damped with log1p and rows L2-normalized, so
+    texts sharing words and word fragments get a high cosine similarity.
+    
+    All work on a batch happens in a few NumPy passes over its bytes, with
+    fixed hash constants: the same text gets the same vector in every
+    process and in every batch.
+    """
+    
+    BLOCK_SIZE = 256  # Texts hashed per pass, keeping the count matrix cache-sized
+    
+    def __init__(self, dim: int = 1536, ngram_sizes: Tuple[int, ...] = (4,)):
+        """
+        Initialize the local embedder
+        
+        Args:
+            dim: Dimensionality of the embeddings
+            ngram_sizes: Character n-gram lengths hashed into features
+        """
+        self.dim = dim
+        self.ngram_sizes = tuple(sorted(ngram_sizes))
+        self.name = f"local-char{'-'.join(map(str, self.ngram_sizes))}-{dim}"
+    
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            float32 matrix with one L2-normalized row per text (all zeros for texts without n-grams)
+        """
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self._embed_block(texts[start:start + self.BLOCK_SIZE])
+                          for start in range(0, len(texts), self.BLOCK_SIZE)])
+    
+    def _embed_block(self, texts: List[str]) -> np.ndarray:
+        # One byte string for the whole block: " text1 \0 text2 \0 ... " (NUL separates texts)
+        joined = " " + " \x00 ".join(text.replace("\x00", " ") for text in texts) + " "
+        raw = np.frombuffer(joined.lower().encode('utf-8').translate(_LOCAL_EMBEDDING_BYTES), dtype=np.uint8)
+        space = raw == 32
+        keep = ~space
+        keep[1:] |= ~space[:-1]
+        keep[0] = True
+        data = raw[keep].astype(np.uint32)
+        
+        # Counts of positive and negative buckets per text, plus one bucket for n-grams spanning texts
+        separators = np.flatnonzero(data == 0)
+        buckets = 2 * self.dim
+        segment_lengths = np.diff(np.concatenate(([0], separators, [len(data)])))
+        row_offsets = np.repeat(np.arange(len(texts), dtype=np.int64) * buckets, segment_lengths)
+        spanning = len(texts) * buckets
+        counts = np.zeros(spanning + 1, dtype=np.int64)
+        
+        hashes, hashed_length = None, 0
+        with np.errstate(over='ignore'):
+            for n in self.ngram_sizes:
+                positions = len(data) - n + 1
+                if positions <= 0:
+                    break
+                # FNV-style rolling hash, extended from the previous (shorter) n-gram length
+                if hashes is None:
+                    hashes, hashed_length = data[:positions].copy(), 1
+                else:
+                    hashes = hashes[:positions]
+                for offset in range(hashed_length, n):
+                    hashes *= np.uint32(0x01000193)
+                    hashes ^= data[offset:offset + positions]
+                hashed_length = n
+                
+                mixed = hashes * np.uint32(0x9E3779B1) + np.uint32(n)
+                mixed ^= mixed >> np.uint32(15)
+                index = row_offsets[:positions] + mixed % np.uint32(buckets)
+                starts = (separators[:, None] - np.arange(n)).ravel()
+                index[starts[(starts >= 0) & (starts < positions)]] = spanning
+                counts += np.bincount(index, minlength=spanning + 1)
+        
+        halves = counts[:spanning].reshape(len(texts), 2, self.dim)
+        matrix = (halves[:, 0] - halves[:, 1]).astype(np.float32)
+        matrix = np.copysign(np.log1p(np.abs(matrix)), matrix)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+# Singleton instance of the local embedder
+local_embedder = LocalEmbedder()
+
 #############################################
 # Core Functions
 #############################################
@@ -314,6 +518,30 @@ def get_generative_ai() -> Any:
     
     return MockAI()
 
+def _openai_embed_batch(texts: List[str]) -> List[List[float]]:
+    """Embed texts with one OpenAI request"""
+    response = openai.Embedding.create(
+        model="text-embedding-3-small",
+        input=texts
+    )
+    return [item['embedding'] for item in sorted(response['data'], key=lambda item: item['index'])]
+
+def _gemini_embed_batch(texts: List[str]) -> List[List[float]]:
+    """Embed texts with one Gemini request"""
+    result = genai.embed_content(
+        model="models/embedding-001",
+        content=texts,
+        task_type="retrieval_document"
+    )
+    return result["embedding"]
+
+# Embedding providers in order of preference, batched and cached by the shared embedding service
+embedding_services = []
+if OPENAI_AVAILABLE:
+    embedding_services.append(EmbeddingService('openai', 'text-embedding-3-small', _openai_embed_batch, source='utils'))
+if GEMINI_AVAILABLE:
+    embedding_services.append(EmbeddingService('gemini', 'models/embedding-001', _gemini_embed_batch, source='utils'))
+
 def generate_embedding(text: str) -> List[float]:
     """
     Generate embedding for text
@@ -324,34 +552,41 @@ def generate_embedding(text: str) -> List[float]:
     Returns:
         Embedding vector
     """
-    if OPENAI_AVAILABLE:
-        try:
-            # OpenAI embeddings
-            response = openai.Embedding.create(
-                model="text-embedding-3-small",
-                input=text
-            )
-            return response['data'][0]['embedding']
-        except Exception as e:
-            logger.warning(f"Error generating OpenAI embedding: {str(e)}")
-    
-    if GEMINI_AVAILABLE:
-        try:
-            # Try to use Embeddings API if available
-            embedding_model = "models/embedding-001"
-            result = genai.embed_content(
-                model=embedding_model,
-                content=text,
-                task_type="retrieval_document"
-            )
-            return result["embedding"]
-        except Exception as e:
-            logger.warning(f"Error generating Gemini embedding: {str(e)}")
+    for service in embedding_services:
+        embedding = service.embed(text)
+        if embedding is not None:
+            return embedding
     
     # Fallback to simple hashing-based vector
     logger.warning("No embedding service available, using fallback hash-based embedding")
     return simple_hash_embedding(text)
 
+def generate_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Generate embeddings for several texts in batched provider requests
+    
+    Args:
+        texts: Texts to embed
+        
+    Returns:
+        One embedding vector per text, in order
+    """
+    embeddings: List[Optional[List[float]]] = [None] * len(texts)
+    remaining = list(range(len(texts)))
+    for service in embedding_services:
+        if not remaining:
+            break
+        vectors = service.embed_many([texts[i] for i in remaining])
+        for i, vector in zip(remaining, vectors):
+            embeddings[i] = vector
+        remaining = [i for i in remaining if embeddings[i] is None]
+    
+    if remaining:
+        logger.warning(f"No embedding service available for {len(remaining)} texts, using fallback local embeddings")
+        for i, vector in zip(remaining, local_embedder.embed([texts[i] for i in remaining])):
+            embeddings[i] = vector.tolist()
+    return embeddings
+
 def simple_hash_embedding(text: str, dim: int = 1536) -> List[float]:
     """
     Generate a simple hash-based embedding for fallback use
@@ -363,36 +598,8 @@ def simple_hash_embedding(text: str, dim: int = 1536) -> List[float]:
     Returns:
         A simple embedding vector
     """
-    import hashlib
-    from math import sin, cos
-    
-    # Normalize the text
-    text = text.lower().strip()
-    
-    # Generate a base hash
-    text_hash = hashlib.sha256(text.encode()).digest()
-    
-    # Create a vector of the specified dimension
-    vector = []
-    for i in range(dim):
-        # Use different parts of the hash for different dimensions
-        byte_idx = i % len(text_hash)
-        value = text_hash[byte_idx] / 255.0  # Normalize to 0-1
-        
-        # Apply a transformation to distribute values
-        if i % 3 == 0:
-            value = sin(value * 6.28)
-        elif i % 3 == 1:
-            value = cos(value * 6.28)
-        
-        vector.append(value)
-    
-    # Normalize the vector to unit length
-    magnitude = sum(v*v for v in vector) ** 0.5
-    if magnitude > 0:
-        vector = [v/magnitude for v in vector]
-    
-    return vector
+    embedder = local_embedder if dim == local_embedder.dim else LocalEmbedder(dim)
+    return embedder.embed([text])[0].tolist()
 
 def get_rag_system():
     """